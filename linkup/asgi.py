@@ -2,6 +2,9 @@
 ASGI config for linkup project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by the `asgi` process in the procfile (gunicorn with uvicorn workers),
+with ASYNC_VIEWS=True so the feed, explore, profile and search pages use the
+async views in profiles/async_views.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'linkup.settings')
 
 application = get_asgi_application()
+
+# Compile templates before the first request rather than during it
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    from profiles.warmup import warm_up  # noqa: E402
+
+    warm_up()
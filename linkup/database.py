@@ -0,0 +1,79 @@
+# linkup/database.py
+
+"""
+DATABASES entries for every backend we run on, with the same connection
+reuse rules everywhere:
+
+* Persistent connections (CONN_MAX_AGE, DB_CONN_MAX_AGE seconds) with
+  CONN_HEALTH_CHECKS, so a worker reuses its connection across requests
+  and replaces one the server has dropped rather than failing a request.
+* PostgreSQL with psycopg 3 and psycopg_pool installed (psycopg[pool]):
+  Django's built-in connection pool instead, DB_POOL_MIN_SIZE to
+  DB_POOL_MAX_SIZE connections per process, waiting up to DB_POOL_TIMEOUT
+  seconds for a free one. The pool replaces CONN_MAX_AGE (Django refuses
+  both). DB_POOL=False turns it off.
+* Async views (ASYNC_VIEWS): no persistent connections, since each
+  request's sync work may run on a different thread and would leave a
+  connection open per thread; pooling still applies.
+
+QueryProfilerMiddleware reports new connections and pool usage per request
+(see profiles/profiling.py).
+"""
+
+import os
+from importlib.util import find_spec
+
+import dj_database_url
+
+POOL_BACKENDS = ('django.db.backends.postgresql',)
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+def pooling_available(engine):
+    """
+    True if this backend has driver-level pooling and its driver is installed
+    (Django's pool needs psycopg 3 with psycopg_pool, not psycopg2).
+    """
+    return engine in POOL_BACKENDS and find_spec('psycopg') is not None and find_spec('psycopg_pool') is not None
+
+
+def _with_connection_reuse(config, async_views=False):
+    """
+    Adds pooling or persistent connections (plus health checks) to one DATABASES entry.
+    """
+    config['CONN_HEALTH_CHECKS'] = True
+    if os.getenv('DB_POOL', 'True') == 'True' and pooling_available(config['ENGINE']):
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': _env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': _env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        }
+    else:
+        config['CONN_MAX_AGE'] = 0 if async_views else _env_int('DB_CONN_MAX_AGE', 600)
+    return config
+
+
+def database_config(url=None, async_views=False):
+    """
+    The DATABASES entry for a database URL, or for the local MySQL server
+    (MYSQL_* environment variables) without one.
+    """
+    if url:
+        config = dj_database_url.parse(url)
+    else:
+        config = {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.getenv('MYSQL_DATABASE', 'linkup_local_db'),
+            'USER': os.getenv('MYSQL_USER', 'root'),
+            'PASSWORD': os.getenv('MYSQL_PASSWORD', ''),
+            'HOST': os.getenv('MYSQL_HOST', '127.0.0.1'),
+            'PORT': os.getenv('MYSQL_PORT', '3306'),
+            'OPTIONS': {
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+            }
+        }
+    return _with_connection_reuse(config, async_views)
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
-import dj_database_url
+
+from linkup.database import database_config
 
 # Load environment variables from .env file (if it exists)
 load_dotenv()
@@ -34,9 +35,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Outermost after security so session/auth queries are counted too
+    'profiles.profiling.QueryProfilerMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'profiles.routing.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -49,7 +53,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -57,32 +60,99 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in memory for the life of the process;
+            # runserver's autoreloader clears them when a template file changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Compile every template (and build the URL resolver) when a worker loads
+# linkup.wsgi/linkup.asgi, instead of on the first request that needs them.
+# See profiles/warmup.py.
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', str(not DEBUG)) == 'True'
+
 WSGI_APPLICATION = 'linkup.wsgi.application'
+ASGI_APPLICATION = 'linkup.asgi.application'
+
+# Serve home/explore/profile/search with the async views in profiles/async_views.py.
+# Turn on together with an ASGI server (the `asgi` process in the procfile);
+# under WSGI, async views only add overhead.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
 # DATABASE CONFIGURATION
-if os.getenv('DATABASE_URL'):
-    DATABASES = {
-        'default': dj_database_url.config(default=os.getenv('DATABASE_URL'), conn_max_age=600)
+# DATABASE_URL, or the local MySQL server (MYSQL_* variables) without one. Every
+# database gets persistent connections with health checks, or psycopg's pool on
+# PostgreSQL when psycopg[pool] is installed (see linkup/database.py):
+#   DB_CONN_MAX_AGE (seconds, default 600), DB_POOL (default True),
+#   DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE (per process, default 2/10), DB_POOL_TIMEOUT (seconds, default 10)
+DATABASES = {
+    'default': database_config(os.getenv('DATABASE_URL'), async_views=ASYNC_VIEWS)
+}
+
+# READ REPLICAS
+# Comma-separated database URLs (same format as DATABASE_URL) for read replicas,
+# registered as replica_1, replica_2, ... Views marked @read_replica read from
+# them; a browser is pinned to the primary for REPLICA_PIN_SECONDS after its own
+# write (see profiles/routing.py). Locally, two SQLite files work:
+#   DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db
+#   manage.py sync_sqlite_replicas  (copies the primary into the replica files)
+REPLICA_DATABASES = []
+for index, replica_url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = database_config(replica_url.strip(), async_views=ASYNC_VIEWS)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['profiles.routing.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+# CACHES
+# Local memory by default (per process, no setup needed). Set CACHE_BACKEND=file
+# to share one cache between the workers on a host, or REDIS_URL to use Redis
+# (Django's built-in backend; requires the `redis` package).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'linkup',
+        }
+    }
+elif os.getenv('CACHE_BACKEND') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, '.django_cache')),
+        }
     }
 else:
-    DATABASES = {
+    CACHES = {
         'default': {
-            'ENGINE': 'django.db.backends.mysql',
-            'NAME': os.getenv('MYSQL_DATABASE', 'linkup_local_db'),
-            'USER': os.getenv('MYSQL_USER', 'root'),
-            'PASSWORD': os.getenv('MYSQL_PASSWORD', ''),
-            'HOST': os.getenv('MYSQL_HOST', '127.0.0.1'),
-            'PORT': os.getenv('MYSQL_PORT', '3306'),
-            'OPTIONS': {
-                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-            }
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'linkup',
         }
     }
 
+# Seconds anonymous feed pages and rendered fragments stay cached
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '60'))
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '600'))
+
+# SQL PROFILING
+# Every request reports its query count/time (Server-Timing header + JSON log line).
+# With QUERY_BUDGET_ENFORCE, views that exceed their @query_budget raise instead of logging.
+QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', 'True') == 'True'
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False') == 'True'
+
+# BACKGROUND JOBS
+# Post-write work is queued in the Job table and run by `manage.py run_jobs`.
+# When inline (default with DEBUG), jobs run in-process after the request's commit.
+JOBS_RUN_INLINE = os.getenv('JOBS_RUN_INLINE', str(DEBUG)) == 'True'
+
 # PASSWORD VALIDATION
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -105,6 +175,14 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Media is served by profiles.media.serve_media. Behind nginx set
+# MEDIA_SERVE_MODE=x-accel-redirect (with an `internal` location at
+# MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT), behind Apache/lighttpd x-sendfile;
+# unset, Django streams the files itself.
+MEDIA_SERVE_MODE = os.getenv('MEDIA_SERVE_MODE', '')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# Cache lifetime (seconds) of media without a content-hashed name; hashed uploads are immutable
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', str(60 * 60 * 24)))
 
 # DEFAULT PRIMARY KEY FIELD
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -125,4 +203,12 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'DEBUG' if DEBUG else 'ERROR',
     },
+    'loggers': {
+        # One JSON line per request from QueryProfilerMiddleware
+        'profiles.profiling': {
+            'handlers': ['console'],
+            'level': os.getenv('QUERY_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
 }
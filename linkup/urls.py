@@ -1,8 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from profiles.media import serve_media, media_url_prefix
+
 urlpatterns = [
     # Django Admin Interface
     path('admin/', admin.site.urls),
@@ -18,9 +20,14 @@ urlpatterns = [
     path('posts/', include('posts.urls')), 
 ]
 
-# Serving media and static files during development
+# User-uploaded media, with cache headers, ETags and Range support (see profiles/media.py);
+# skipped when MEDIA_URL points at another host
+if media_url_prefix():
+    urlpatterns += [
+        re_path(rf'^{media_url_prefix()}(?P<path>.+)$', serve_media, name='media'),
+    ]
+
+# Serving static files during development
 if settings.DEBUG:
-    # Handle user-uploaded media files
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     # Handle collected static files (optional but safe)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
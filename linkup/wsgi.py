@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'linkup.settings')
 
 application = get_wsgi_application()
+
+# Compile templates before the first request rather than during it
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    from profiles.warmup import warm_up  # noqa: E402
+
+    warm_up()
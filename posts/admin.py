@@ -1,3 +1,35 @@
+# posts/admin.py
+
 from django.contrib import admin
 
-# Register your models here.
+from .models import Post, Comment, Like
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    list_display = ('user', 'content', 'like_count', 'comment_count', 'created_at')
+    search_fields = ('user__username', 'content')
+    list_filter = ('created_at',)
+    list_select_related = ('user',)
+    # A <select> of every user would load the whole auth_user table
+    raw_id_fields = ('user',)
+    # Maintained by the like/comment write paths (see counters.py)
+    readonly_fields = ('like_count', 'comment_count')
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('author', 'post', 'content', 'created_at')
+    search_fields = ('author__username', 'content')
+    list_filter = ('created_at',)
+    list_select_related = ('author', 'post__user')
+    raw_id_fields = ('post', 'author')
+
+
+@admin.register(Like)
+class LikeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'post', 'created_at')
+    search_fields = ('user__username',)
+    list_filter = ('created_at',)
+    list_select_related = ('user', 'post__user')
+    raw_id_fields = ('post', 'user')
@@ -0,0 +1,71 @@
+# posts/comments.py
+
+"""
+Comment threads: keyset-paginated lists and per-card previews.
+
+A post's thread is read oldest first in pages of COMMENT_PAGE_SIZE,
+addressed by an ``?after=`` cursor over (created_at, id). Each page is one
+range scan of comment_post_created_idx, however long the thread is.
+
+Feed cards show the latest COMMENT_PREVIEW_COUNT comments of each post on
+the page. attach_comment_previews() loads them for the whole page in one
+windowed query (ROW_NUMBER() OVER (PARTITION BY post ...)), never more rows
+than it shows.
+"""
+
+from collections import defaultdict
+
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+from .pagination import encode_cursor, decode_cursor
+
+COMMENT_PAGE_SIZE = 20
+# Upper bound for the ?limit= a client may ask for
+COMMENT_PAGE_MAX = 50
+COMMENT_PREVIEW_COUNT = 2
+
+
+def comment_page(post_id, after=None, limit=COMMENT_PAGE_SIZE):
+    """
+    Returns (comments, next_cursor): up to ``limit`` comments of a post in
+    thread order, following the ``after`` cursor. next_cursor is None on the last page.
+    """
+    comments = Comment.objects.filter(post_id=post_id).select_related('author').order_by('created_at', 'pk')
+    position = decode_cursor(after, Comment._meta.get_field('created_at')) if after else None
+    if position:
+        created_at, pk = position
+        comments = comments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+    comments = list(comments[:limit + 1])
+    if len(comments) <= limit:
+        return comments, None
+    last = comments[limit - 1]
+    return comments[:limit], encode_cursor(last.created_at, last.pk)
+
+
+def attach_comment_previews(posts, count=COMMENT_PREVIEW_COUNT):
+    """
+    Sets ``post.preview_comments`` on each post to its latest ``count``
+    comments (oldest of them first), with one query for all the posts.
+    """
+    posts = list(posts)
+    if not posts:
+        return posts
+
+    latest = (
+        Comment.objects.filter(post_id__in=[post.pk for post in posts])
+        .annotate(rank=Window(
+            RowNumber(), partition_by=F('post_id'), order_by=[F('created_at').desc(), F('pk').desc()],
+        ))
+        .filter(rank__lte=count)
+        .select_related('author')
+        .order_by('post_id', 'created_at', 'pk')
+    )
+    previews = defaultdict(list)
+    for comment in latest:
+        previews[comment.post_id].append(comment)
+    for post in posts:
+        post.preview_comments = previews[post.pk]
+    return posts
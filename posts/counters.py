@@ -0,0 +1,47 @@
+# posts/counters.py
+
+"""
+Repair of the denormalized Post.like_count and Post.comment_count columns.
+The like/comment write paths keep them in sync with F() updates; this finds
+and fixes any drift against the real row counts.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, Like, Comment
+
+
+def reconcile_counters(batch_size=500):
+    """
+    Rewrites the counters of every post whose stored values disagree with the
+    Like/Comment tables. Returns the number of posts repaired.
+    """
+    like_counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+    comment_counts = Comment.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+
+    # Only posts whose stored counters disagree with the real row counts
+    drifted = (
+        Post.objects.annotate(
+            actual_likes=Coalesce(Subquery(like_counts), 0),
+            actual_comments=Coalesce(Subquery(comment_counts), 0),
+        )
+        .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+        .only('pk', 'like_count', 'comment_count')
+    )
+
+    batch = []
+    repaired = 0
+    for post in drifted.iterator(chunk_size=batch_size):
+        post.like_count = post.actual_likes
+        post.comment_count = post.actual_comments
+        batch.append(post)
+        if len(batch) >= batch_size:
+            Post.objects.bulk_update(batch, ['like_count', 'comment_count'])
+            repaired += len(batch)
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['like_count', 'comment_count'])
+        repaired += len(batch)
+
+    return repaired
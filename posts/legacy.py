@@ -0,0 +1,143 @@
+# posts/legacy.py
+
+"""
+Merging the legacy profiles_post/profiles_like/profiles_comment tables into
+the posts app's tables.
+
+The profiles app used to define its own Post, Like and Comment models. Rows
+written through them (the admin, older code paths) never reached the feeds,
+counters, timelines or trending scores, which all read the posts tables.
+Those models are gone now; profiles migration 0022 drops their tables, but
+only once `manage.py merge_legacy_posts` has moved every row across.
+
+The merge runs in batches of legacy posts (oldest first). Each batch copies
+the posts with their likes and comments, then deletes the legacy rows, in
+one transaction, so an interrupted run just continues where it stopped.
+Rows that already exist in the posts tables are not copied twice:
+
+- a post with the same author, timestamp and text is the same post;
+- a like is unique per (post, user);
+- a comment with the same post, author, timestamp and text is the same comment.
+"""
+
+from django.db import connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, Like, Comment
+
+MERGE_BATCH_SIZE = 500
+
+# The last migration state that still has the legacy models
+LEGACY_STATE = ('profiles', '0021_user_email_ci_unique')
+LEGACY_TABLE = 'profiles_post'
+
+
+def legacy_models(using='default'):
+    """
+    Returns the legacy (Post, Like, Comment) models as of LEGACY_STATE,
+    or None once their tables have been dropped.
+    """
+    connection = connections[using]
+    if LEGACY_TABLE not in connection.introspection.table_names():
+        return None
+    state = MigrationLoader(connection).project_state(LEGACY_STATE)
+    return tuple(state.apps.get_model('profiles', name) for name in ('Post', 'Like', 'Comment'))
+
+
+def _copy_posts(legacy_posts, using):
+    # Legacy post ID -> posts_post ID, creating only the posts that aren't there yet
+    key = lambda row: (row['user_id'], row['created_at'], row['content'])
+    candidates = Post.objects.using(using).filter(
+        user_id__in={row['user_id'] for row in legacy_posts},
+        created_at__in={row['created_at'] for row in legacy_posts},
+    ).values('pk', 'user_id', 'created_at', 'content')
+
+    existing = {key(row): row['pk'] for row in candidates}
+    missing = {}
+    for row in legacy_posts:
+        if key(row) not in existing:
+            missing.setdefault(key(row), row)  # Identical legacy posts merge into one
+    Post.objects.using(using).bulk_create([
+        Post(user_id=row['user_id'], content=row['content'], image=row['image'] or None, created_at=row['created_at'])
+        for row in missing.values()
+    ])
+    # Re-read for primary keys (not every backend returns them from bulk_create)
+    if missing:
+        existing = {key(row): row['pk'] for row in candidates.all()}
+    return {row['pk']: existing[key(row)] for row in legacy_posts}, len(missing)
+
+
+def _copy_likes(LegacyLike, post_ids, using):
+    rows = LegacyLike.objects.using(using).filter(post_id__in=post_ids).values_list('post_id', 'user_id', 'created_at')
+    existing = set(Like.objects.using(using).filter(post_id__in=post_ids.values()).values_list('post_id', 'user_id'))
+    likes = {}
+    for post_id, user_id, created_at in rows:
+        pair = (post_ids[post_id], user_id)
+        if pair not in existing:
+            likes.setdefault(pair, Like(post_id=pair[0], user_id=user_id, created_at=created_at))
+    # A like made through the live path meanwhile wins
+    Like.objects.using(using).bulk_create(likes.values(), ignore_conflicts=True)
+    return len(likes)
+
+
+def _copy_comments(LegacyComment, post_ids, using):
+    rows = LegacyComment.objects.using(using).filter(post_id__in=post_ids).values_list(
+        'post_id', 'author_id', 'created_at', 'content',
+    )
+    existing = set(
+        Comment.objects.using(using).filter(post_id__in=post_ids.values())
+        .values_list('post_id', 'author_id', 'created_at', 'content')
+    )
+    comments = {}
+    for post_id, author_id, created_at, content in rows:
+        row = (post_ids[post_id], author_id, created_at, content)
+        if row not in existing:
+            comments.setdefault(row, Comment(post_id=row[0], author_id=author_id, created_at=created_at, content=content))
+    Comment.objects.using(using).bulk_create(comments.values())
+    return len(comments)
+
+
+def _recount(post_ids, using):
+    like_counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+    comment_counts = Comment.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+    Post.objects.using(using).filter(pk__in=post_ids).update(
+        like_count=Coalesce(Subquery(like_counts), 0),
+        comment_count=Coalesce(Subquery(comment_counts), 0),
+    )
+
+
+def merge_legacy_posts(models, batch_size=MERGE_BATCH_SIZE, using='default'):
+    """
+    Moves the rows of the legacy (Post, Like, Comment) ``models`` into the
+    posts tables, one transaction per batch of ``batch_size`` legacy posts.
+    Yields (legacy posts merged, posts created, likes created, comments created)
+    after each batch.
+    """
+    LegacyPost, LegacyLike, LegacyComment = models
+    while True:
+        with transaction.atomic(using=using):
+            legacy_posts = list(
+                LegacyPost.objects.using(using).select_for_update()
+                .order_by('pk').values('pk', 'user_id', 'content', 'image', 'created_at')[:batch_size]
+            )
+            if not legacy_posts:
+                return
+            post_ids, posts = _copy_posts(legacy_posts, using)
+            likes = _copy_likes(LegacyLike, post_ids, using)
+            comments = _copy_comments(LegacyComment, post_ids, using)
+            # Merged posts' counters now include their copied likes and comments
+            _recount(set(post_ids.values()), using)
+
+            LegacyLike.objects.using(using).filter(post_id__in=post_ids).delete()
+            LegacyComment.objects.using(using).filter(post_id__in=post_ids).delete()
+            LegacyPost.objects.using(using).filter(pk__in=post_ids).delete()
+        yield len(legacy_posts), posts, likes, comments
+
+
+def legacy_row_counts(models, using='default'):
+    """
+    Returns the number of rows left in each legacy table, as (posts, likes, comments).
+    """
+    return tuple(model.objects.using(using).count() for model in models)
@@ -0,0 +1,64 @@
+# posts/likes.py
+
+"""
+Idempotent like/unlike.
+
+Setting a like to an explicit state is one conditional write: an
+INSERT ... ON CONFLICT DO NOTHING (INSERT IGNORE on MySQL) against the
+unique (post, user) index, or a DELETE of that one row. The statement's row
+count says whether anything changed, so repeating a request (double
+clicks, retries) never double-counts and the denormalized like_count and
+profile stats only move when a row really appeared or disappeared.
+"""
+
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from profiles.stats import adjust_stats
+
+from .models import Post, Like
+from .trending import schedule_update
+
+
+def _like_sql(connection, liked):
+    quote = connection.ops.quote_name
+    table = quote(Like._meta.db_table)
+    post, user, created_at = (quote(Like._meta.get_field(name).column) for name in ('post', 'user', 'created_at'))
+    if not liked:
+        return f'DELETE FROM {table} WHERE {post} = %s AND {user} = %s'
+    if connection.vendor == 'mysql':
+        return f'INSERT IGNORE INTO {table} ({post}, {user}, {created_at}) VALUES (%s, %s, %s)'
+    return f'INSERT INTO {table} ({post}, {user}, {created_at}) VALUES (%s, %s, %s) ON CONFLICT ({post}, {user}) DO NOTHING'
+
+
+def set_liked(post_id, user, liked):
+    """
+    Makes ``user``'s like on a post match ``liked``.
+    Returns (changed, like_count). Raises Post.DoesNotExist for unknown posts.
+    """
+    author_id = Post.objects.filter(pk=post_id).values_list('user_id', flat=True).first()
+    if author_id is None:
+        raise Post.DoesNotExist(f'Post {post_id} does not exist')
+
+    db = router.db_for_write(Like)
+    connection = connections[db]
+    params = [post_id, user.pk]
+    if liked:
+        params.append(connection.ops.adapt_datetimefield_value(timezone.now()))
+
+    with transaction.atomic(using=db):
+        with connection.cursor() as cursor:
+            cursor.execute(_like_sql(connection, liked), params)
+            changed = cursor.rowcount == 1
+
+        if changed:
+            delta = 1 if liked else -1
+            Post.objects.filter(pk=post_id).update(like_count=F('like_count') + delta)
+            adjust_stats(author_id, likes_received=delta)
+
+    if changed:
+        schedule_update()
+
+    like_count = Post.objects.using(db).filter(pk=post_id).values_list('like_count', flat=True).get()
+    return changed, like_count
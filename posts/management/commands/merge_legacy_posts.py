@@ -0,0 +1,55 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from posts.legacy import MERGE_BATCH_SIZE, legacy_models, legacy_row_counts, merge_legacy_posts
+from profiles.caching import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the posts, likes and comments left in the legacy profiles_* tables into the posts app's "
+        "tables, in resumable batches, skipping rows that already exist there. "
+        "Run it before migrating profiles past 0021."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=MERGE_BATCH_SIZE,
+            help="Legacy posts (with their likes and comments) moved per transaction.",
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Rebuild the derived tables (profile stats, timelines, trending) afterwards.",
+        )
+        parser.add_argument('--database', default='default', help="Database to merge in.")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        models = legacy_models(using)
+        if models is None:
+            self.stdout.write(self.style.SUCCESS("The legacy tables are gone; nothing to merge."))
+            return
+
+        posts, likes, comments = legacy_row_counts(models, using)
+        self.stdout.write(f"Legacy rows left: {posts} post(s), {likes} like(s), {comments} comment(s).")
+
+        totals = [0, 0, 0, 0]
+        for batch in merge_legacy_posts(models, options['batch_size'], using):
+            totals = [total + count for total, count in zip(totals, batch)]
+            self.stdout.write(f"  {totals[0]}/{posts} legacy post(s) merged")
+
+        merged, created, likes, comments = totals
+        if merged:
+            bump_version('feed')
+            if options['rebuild']:
+                for command, command_args in (
+                    ('recompute_profile_stats', []),
+                    ('rebuild_timelines', []),
+                    ('update_trending', ['--full']),
+                ):
+                    call_command(command, *command_args, stdout=self.stdout, stderr=self.stderr)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {merged} legacy post(s): created {created} post(s) ({merged - created} duplicate(s) of existing posts), "
+            f"{likes} like(s) and {comments} comment(s)."
+        ))
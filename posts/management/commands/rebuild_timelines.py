@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the precomputed home feed timelines from the follow graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help="Only rebuild the timelines of these users (default: everyone).",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        total_users = 0
+        total_entries = 0
+        for user in users.iterator(chunk_size=500):
+            total_entries += rebuild_timeline(user)
+            total_users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {total_users} timeline(s) with {total_entries} entries."
+        ))
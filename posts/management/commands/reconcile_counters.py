@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_counters
+from profiles.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = "Repairs drift in the denormalized Post.like_count and Post.comment_count columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of posts written per UPDATE batch.",
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help="Queue the repair for the job workers instead of running it now.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['enqueue']:
+            enqueue('posts.reconcile_counters', {'batch_size': batch_size})
+            self.stdout.write(self.style.SUCCESS("Queued counter reconciliation."))
+            return
+
+        repaired = reconcile_counters(batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Repaired counters on {repaired} post(s)."))
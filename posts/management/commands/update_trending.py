@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import update_trending, TRENDING_BATCH_SIZE
+from profiles.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescores the explore ranking for posts with new likes/comments since the last run "
+        "(normally queued automatically as engagement arrives). Use --full to rescore every post."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rescore every post, not only changed ones.")
+        parser.add_argument(
+            '--batch-size', type=int, default=TRENDING_BATCH_SIZE,
+            help="Number of posts scored per batch.",
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help="Queue the update for the job workers instead of running it now.",
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            enqueue('posts.update_trending', {'full': options['full']})
+            self.stdout.write(self.style.SUCCESS("Queued trending update."))
+            return
+
+        rescored = update_trending(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} post(s)."))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+# Kept in sync with posts/timeline.py (TIMELINE_MAX_LENGTH / TIMELINE_BATCH_SIZE)
+TIMELINE_MAX_LENGTH = 800
+TIMELINE_BATCH_SIZE = 1000
+
+
+def build_timelines(apps, schema_editor):
+    # Same as rebuild_timeline() for every user, so home feeds aren't empty after deploy
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+
+    for user_id in User.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=500):
+        following_user_ids = UserProfile.objects.filter(followers__user_id=user_id).values_list('user_id', flat=True)
+        recent_posts = (
+            Post.objects.filter(Q(user_id__in=following_user_ids) | Q(user_id=user_id))
+            .order_by('-created_at')
+            .values_list('pk', 'created_at')[:TIMELINE_MAX_LENGTH]
+        )
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=user_id, post_id=post_pk, created_at=created_at)
+                for post_pk, created_at in recent_posts
+            ],
+            batch_size=TIMELINE_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # build_timelines reads the follow graph
+        ('profiles', '0006_userprofile_following'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.post')),
+            ],
+            options={
+                'ordering': ['-created_at', '-post_id'],
+                'indexes': [models.Index(fields=['owner', '-created_at', '-post'], name='timeline_owner_recent_idx')],
+                'unique_together': {('owner', 'post')},
+            },
+        ),
+        migrations.RunPython(build_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('posts', 'Like')
+    Comment = apps.get_model('posts', 'Comment')
+
+    like_counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+    comment_counts = Comment.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('pk')).values('n')
+    Post.objects.update(
+        like_count=Coalesce(Subquery(like_counts), 0),
+        comment_count=Coalesce(Subquery(comment_counts), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:16
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Kept in sync with posts/trending.py (the scoring constants and decayed_score)
+TRENDING_HALF_LIFE = getattr(settings, 'TRENDING_HALF_LIFE', timedelta(hours=24))
+TRENDING_BATCH_SIZE = 500
+POST_WEIGHT = 1
+LIKE_WEIGHT = 1
+COMMENT_WEIGHT = 3
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decayed_score(events):
+    terms = [math.log2(weight) + (moment - EPOCH) / TRENDING_HALF_LIFE for weight, moment in events]
+    top = max(terms)
+    return top + math.log2(sum(2 ** (term - top) for term in terms))
+
+
+def score_all_posts(apps, schema_editor):
+    # update_trending(full=True), so explore isn't empty after deploy
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('posts', 'Like')
+    Comment = apps.get_model('posts', 'Comment')
+    TrendingScore = apps.get_model('posts', 'TrendingScore')
+
+    now = timezone.now()
+    post_ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(post_ids), TRENDING_BATCH_SIZE):
+        batch = post_ids[start:start + TRENDING_BATCH_SIZE]
+        events = defaultdict(list)
+        for pk, created_at in Post.objects.filter(pk__in=batch).values_list('pk', 'created_at'):
+            events[pk].append((POST_WEIGHT, created_at))
+        for post_id, created_at in Like.objects.filter(post_id__in=batch).values_list('post_id', 'created_at'):
+            events[post_id].append((LIKE_WEIGHT, created_at))
+        for post_id, created_at in Comment.objects.filter(post_id__in=batch).values_list('post_id', 'created_at'):
+            events[post_id].append((COMMENT_WEIGHT, created_at))
+        TrendingScore.objects.bulk_create([
+            TrendingScore(post_id=pk, score=decayed_score(post_events), computed_at=now)
+            for pk, post_events in events.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_feed_access_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='posts.post')),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-score', '-post_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['created_at'], name='like_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trendingscore',
+            index=models.Index(fields=['-score', '-post'], name='trending_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trendingscore',
+            index=models.Index(fields=['computed_at'], name='trending_computed_idx'),
+        ),
+        migrations.RunPython(score_all_posts, migrations.RunPython.noop),
+    ]
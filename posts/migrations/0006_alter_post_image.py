@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:41
+
+import profiles.media
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_trending_score'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=profiles.media.ContentHashedImageField(blank=True, null=True, upload_to='post_images'),
+        ),
+    ]
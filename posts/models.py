@@ -4,6 +4,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from profiles.media import ContentHashedImageField
+
 # -------------------------------
 # Post Model
 # -------------------------------
@@ -11,15 +13,29 @@ class Post(models.Model):
     # FIX: Changed related_name from 'posts' to 'user_posts'
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_posts')
     content = models.TextField()
-    image = models.ImageField(upload_to='post_images', blank=True, null=True)
+    # Stored as post_images/<content hash>.<ext> (see profiles/media.py)
+    image = ContentHashedImageField(upload_to='post_images', blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Denormalized counters, kept in sync with F() updates by like_post/add_comment
+    # (run `manage.py reconcile_counters` to repair drift)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's posts, newest first (profile pages, timeline backfill)
+            models.Index(fields=['user', '-created_at'], name='post_user_recent_idx'),
+            # Global newest-first feed (explore, anonymous home)
+            models.Index(fields=['-created_at'], name='post_recent_idx'),
+        ]
 
     def is_liked_by_user(self, user):
         if not user.is_authenticated:
             return False
+        # Feed querysets annotate is_liked for the viewer; use it instead of a query per post
+        if hasattr(self, 'is_liked'):
+            return self.is_liked
         return self.likes.filter(user=user).exists()
 
     def __str__(self):
@@ -37,6 +53,13 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ('post', 'user') 
+        indexes = [
+            # The unique (post, user) index serves per-post lookups; this one the
+            # viewer-side probes ("did this user like it", a user's likes)
+            models.Index(fields=['user', 'post'], name='like_user_post_idx'),
+            # Likes since the last trending update (see trending.py)
+            models.Index(fields=['created_at'], name='like_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} likes {self.post}'
@@ -53,6 +76,50 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # A post's comments in display order
+            models.Index(fields=['post', 'created_at'], name='comment_post_created_idx'),
+            # Comments since the last trending update (see trending.py)
+            models.Index(fields=['created_at'], name='comment_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Comment by {self.author.username} on {self.post}'
+
+# -------------------------------
+# Timeline Entry (fan-out-on-write home feed)
+# -------------------------------
+class TimelineEntry(models.Model):
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    # Copied from the post so the feed can be read without touching posts_post
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-post_id']
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-post'], name='timeline_owner_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f'Post {self.post_id} in {self.owner_id} timeline'
+
+# -------------------------------
+# Trending Score (materialized explore ranking)
+# -------------------------------
+class TrendingScore(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='trending_score')
+    # Time-decayed engagement in log2 space (see trending.py); only ever compared, never shown
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-score', '-post_id']
+        indexes = [
+            models.Index(fields=['-score', '-post'], name='trending_rank_idx'),
+            models.Index(fields=['computed_at'], name='trending_computed_idx'),
+        ]
 
     def __str__(self):
-        return f'Comment by {self.author.username} on {self.post}'
\ No newline at end of file
+        return f'Post {self.post_id} trending score {self.score:.3f}'
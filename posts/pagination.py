@@ -0,0 +1,155 @@
+# posts/pagination.py
+
+"""
+Keyset (cursor) pagination for post feeds.
+
+Pages are addressed by opaque ``?after=`` / ``?before=`` tokens that encode the
+sort key and id of the boundary row, (created_at, id) for feeds or (score, id)
+for the trending ranking, so every page is a single index range scan with no
+COUNT(*) and no OFFSET. The classic ``?page=`` style is still
+served through Django's Paginator so old links keep working.
+"""
+
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+def encode_cursor(key, pk):
+    """
+    Encodes a (sort key, id) pair into an opaque URL-safe token.
+    """
+    key = key.isoformat() if hasattr(key, 'isoformat') else repr(key)
+    raw = f'{key}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, key_field):
+    """
+    Decodes a token produced by encode_cursor, converting the key with the model
+    field it was read from. Returns None if it is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        key = key_field.to_python(key)
+        return (key, int(pk)) if key is not None else None
+    except (ValueError, ValidationError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated queryset.
+    Mirrors the parts of django.core.paginator.Page used by the templates.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginates a queryset in descending (key, id) order without counting it.
+
+    ``ordering`` names the two model fields that make up the key, e.g.
+    ``('created_at', 'post_id')`` for timeline rows or ``('score', 'post_id')``
+    for the trending ranking.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('created_at', 'pk')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key_field, self.id_field = ordering
+
+    def _cursor_for(self, obj):
+        return encode_cursor(getattr(obj, self.key_field), getattr(obj, self.id_field))
+
+    def _decode(self, token):
+        return decode_cursor(token, self.queryset.model._meta.get_field(self.key_field)) if token else None
+
+    def _older_than(self, key, pk):
+        return Q(**{f'{self.key_field}__lt': key}) | Q(
+            **{self.key_field: key, f'{self.id_field}__lt': pk}
+        )
+
+    def _newer_than(self, key, pk):
+        return Q(**{f'{self.key_field}__gt': key}) | Q(
+            **{self.key_field: key, f'{self.id_field}__gt': pk}
+        )
+
+    def get_page(self, after=None, before=None):
+        """
+        Returns the page following the ``after`` cursor, preceding the ``before``
+        cursor, or the first page. Malformed cursors fall back to the first page.
+        """
+        after = self._decode(after)
+        before = self._decode(before)
+
+        if before:
+            # Walk backwards (oldest-first) from the cursor, then restore feed order
+            rows = list(
+                self.queryset.filter(self._newer_than(*before))
+                .order_by(self.key_field, self.id_field)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after:
+                queryset = queryset.filter(self._older_than(*after))
+            rows = list(
+                queryset.order_by(f'-{self.key_field}', f'-{self.id_field}')[:self.per_page + 1]
+            )
+            has_next = len(rows) > self.per_page
+            has_previous = after is not None
+            rows = rows[:self.per_page]
+
+        if not rows:
+            return CursorPage(rows)
+        return CursorPage(
+            rows,
+            next_cursor=self._cursor_for(rows[-1]) if has_next else None,
+            previous_cursor=self._cursor_for(rows[0]) if has_previous else None,
+        )
+
+
+def paginate_posts(request, queryset, per_page, ordering=('created_at', 'pk')):
+    """
+    Paginates a post queryset for a feed view.
+    Uses keyset pagination unless the request carries a legacy ``?page=`` number.
+    """
+    if 'page' in request.GET:
+        return Paginator(queryset, per_page).get_page(request.GET.get('page'))
+
+    paginator = CursorPaginator(queryset, per_page, ordering=ordering)
+    return paginator.get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
@@ -0,0 +1,51 @@
+# posts/tasks.py
+
+"""
+Background tasks for the posts app (run by `manage.py run_jobs`, see profiles/jobs.py).
+Tasks take IDs rather than objects and re-read state, since it may have
+changed between enqueueing and running.
+"""
+
+from django.contrib.auth.models import User
+
+from profiles.jobs import task
+from profiles.models import UserProfile
+
+from . import timeline, trending
+from .counters import reconcile_counters as _reconcile_counters
+from .models import Post
+
+
+@task('posts.fan_out_post')
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:  # Deleted before the job ran
+        timeline.fan_out_post(post)
+
+
+def _is_following(follower_id, followed_id):
+    return UserProfile.objects.filter(user_id=follower_id, following__user_id=followed_id).exists()
+
+
+@task('posts.backfill_follow')
+def backfill_follow(follower_id, followed_id):
+    # Skipped if the follow was undone before the job ran
+    if _is_following(follower_id, followed_id):
+        timeline.backfill_follow(User(pk=follower_id), User(pk=followed_id))
+
+
+@task('posts.trim_unfollow')
+def trim_unfollow(follower_id, unfollowed_id):
+    # Skipped if the user followed again before the job ran
+    if not _is_following(follower_id, unfollowed_id):
+        timeline.trim_unfollow(User(pk=follower_id), User(pk=unfollowed_id))
+
+
+@task('posts.reconcile_counters', max_attempts=3)
+def reconcile_counters(batch_size=500):
+    _reconcile_counters(batch_size)
+
+
+@task('posts.update_trending', max_attempts=3)
+def update_trending(full=False):
+    trending.update_trending(full)
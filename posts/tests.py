@@ -1,3 +1,268 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Max
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from profiles.testing import LinkUpTestCase
+
+from .legacy import LEGACY_STATE, legacy_row_counts
+from .likes import set_liked
+from .models import Post, Like, TimelineEntry, TrendingScore
+from .pagination import CursorPaginator, decode_cursor, encode_cursor, paginate_posts
+from .timeline import rebuild_timeline, timeline_entries
+from .trending import TRENDING_HALF_LIFE, decayed_score, trending_scores, update_trending
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTests(LinkUpTestCase):
+    """
+    Exercises the @query_budget post views, so a view that goes over its
+    budget (an N+1 regression) fails with QueryBudgetExceeded.
+    """
+
+    def set_up_data(self):
+        self.author, *self.readers = self.create_users('bob', 'alice', 'carol', 'dave')
+
+        self.client.force_login(self.author)
+        self.client.post('/posts/create/', {'content': 'Shipping the new search today'})
+        self.post = Post.objects.get(user=self.author)
+        for reader in self.readers:
+            self.client.force_login(reader)
+            self.client.post(f'/posts/{self.post.pk}/like/', {'liked': '1'})
+            for n in range(3):
+                self.client.post(f'/posts/{self.post.pk}/comment/', {'content': f'Comment {n} by {reader.username}'})
+        self.client.force_login(self.readers[0])
+
+    def test_post_detail(self):
+        for _ in range(2):
+            response = self.client.get(f'/posts/{self.post.pk}/')
+            self.assertEqual(response.status_code, 200)
+        self.client.logout()
+        self.assertEqual(self.client.get(f'/posts/{self.post.pk}/').status_code, 200)
+
+    def test_comment_list(self):
+        response = self.client.get(f'/posts/{self.post.pk}/comments/?limit=4')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(f'/posts/{self.post.pk}/comments/?format=json&limit=4')
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(len(page['comments']), 4)
+
+        response = self.client.get(f'/posts/{self.post.pk}/comments/?format=json&after={page["next"]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['comments']), 5)
+
+    def test_like_views(self):
+        url = f'/posts/{self.post.pk}/like/state/'
+        response = self.client.post(url, {'liked': '0'})
+        self.assertEqual(response.json(), {'post': self.post.pk, 'liked': False, 'changed': True, 'like_count': 2})
+        response = self.client.post(url, {'liked': '0'})
+        self.assertFalse(response.json()['changed'])
+
+        response = self.client.post(f'/posts/{self.post.pk}/like/')
+        self.assertEqual(response.status_code, 302)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 3)
+
+
+class TimelineTests(LinkUpTestCase):
+    """
+    Home timelines: fan-out of new posts, backfill on follow, trim on unfollow.
+    """
+
+    def set_up_data(self):
+        self.alice, self.bob, self.carol = self.create_users('alice', 'bob', 'carol')
+        self.client.force_login(self.alice)
+        self.client.post('/profile/bob/follow/')
+        self.client.force_login(self.bob)
+        for n in range(3):
+            self.client.post('/posts/create/', {'content': f'Post {n} by bob'})
+
+    def timeline(self, user):
+        return list(timeline_entries(user).values_list('post__content', flat=True))
+
+    def test_new_post_fans_out_to_author_and_followers(self):
+        expected = ['Post 2 by bob', 'Post 1 by bob', 'Post 0 by bob']
+        self.assertEqual(self.timeline(self.bob), expected)
+        self.assertEqual(self.timeline(self.alice), expected)
+        self.assertEqual(self.timeline(self.carol), [])
+
+        self.client.force_login(self.alice)
+        response = self.client.get('/')
+        self.assertContains(response, 'Post 2 by bob')
+
+    def test_follow_backfills_recent_posts(self):
+        self.client.force_login(self.carol)
+        with mock.patch('posts.timeline.TIMELINE_BACKFILL_LIMIT', 2), self.committed():
+            self.client.post('/profile/bob/follow/')
+        self.assertEqual(self.timeline(self.carol), ['Post 2 by bob', 'Post 1 by bob'])
+
+    def test_unfollow_trims_the_timeline(self):
+        self.client.force_login(self.alice)
+        with self.committed():
+            self.client.post('/posts/create/', {'content': 'Post by alice'})
+            self.client.post('/profile/bob/follow/')  # Toggles the follow off
+        self.assertEqual(self.timeline(self.alice), ['Post by alice'])
+
+    def test_rebuild_matches_the_incremental_timeline(self):
+        incremental = self.timeline(self.alice)
+        TimelineEntry.objects.all().delete()
+        with mock.patch('posts.timeline.TIMELINE_MAX_LENGTH', 2):
+            self.assertEqual(rebuild_timeline(self.alice), 2)
+        self.assertEqual(self.timeline(self.alice), incremental[:2])
+
+
+class CursorPaginationTests(LinkUpTestCase):
+    """
+    Keyset pagination: opaque cursors and before/after pages in (created_at, id) order.
+    """
+
+    def set_up_data(self):
+        (self.author,) = self.create_users('bob')
+        start = timezone.now() - timedelta(hours=1)
+        # Three posts share a timestamp, so the id has to break the tie
+        moments = [start, start + timedelta(minutes=1), *[start + timedelta(minutes=2)] * 3, start + timedelta(minutes=3)]
+        for n, moment in enumerate(moments):
+            Post.objects.create(user=self.author, content=f'Post {n}', created_at=moment)
+        self.expected = list(Post.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def ids(self, page):
+        return [post.pk for post in page]
+
+    def test_cursor_round_trip(self):
+        created_at = Post._meta.get_field('created_at')
+        moment = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(moment, 42), created_at), (moment, 42))
+        score = TrendingScore._meta.get_field('score')
+        self.assertEqual(decode_cursor(encode_cursor(-3.25, 7), score), (-3.25, 7))
+
+        for token in ('', 'not base64!', encode_cursor('yesterday', 1), 'MTIz'):
+            with self.subTest(token=token):
+                self.assertIsNone(decode_cursor(token, created_at))
+
+    def test_after_and_before_pages(self):
+        paginator = CursorPaginator(Post.objects.all(), 2)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(after=pages[-1].next_cursor))
+        self.assertEqual([self.ids(page) for page in pages], [self.expected[i:i + 2] for i in range(0, 6, 2)])
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.get_page(before=pages[2].previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(pages[1]))
+        back = paginator.get_page(before=back.previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(pages[0]))
+        self.assertFalse(back.has_previous())
+
+        # A malformed cursor serves the first page
+        self.assertEqual(self.ids(paginator.get_page(after='garbage')), self.expected[:2])
+
+    def test_page_numbers_still_work(self):
+        request = RequestFactory().get('/', {'page': 2})
+        page = paginate_posts(request, Post.objects.order_by('-created_at', '-pk'), 4)
+        self.assertEqual(self.ids(page), self.expected[4:])
+
+
+class TrendingTests(LinkUpTestCase):
+    """
+    The materialized explore ranking and its incremental update.
+    """
+
+    def set_up_data(self):
+        self.author, self.fan = self.create_users('bob', 'alice')
+        now = timezone.now()
+        self.older = Post.objects.create(user=self.author, content='Older', created_at=now - timedelta(days=3))
+        self.newer = Post.objects.create(user=self.author, content='Newer', created_at=now - timedelta(days=2))
+        self.assertEqual(update_trending(full=True), 2)
+
+    def ranking(self):
+        return list(trending_scores().values_list('post__content', flat=True))
+
+    def test_score_halves_per_half_life(self):
+        moment = timezone.now()
+        self.assertAlmostEqual(
+            decayed_score([(1, moment)]) - decayed_score([(1, moment - TRENDING_HALF_LIFE)]), 1.0,
+        )
+        self.assertAlmostEqual(decayed_score([(1, moment), (1, moment)]) - decayed_score([(1, moment)]), 1.0)
+
+    def test_incremental_update_rescores_only_engaged_posts(self):
+        self.assertEqual(self.ranking(), ['Newer', 'Older'])
+        untouched = TrendingScore.objects.get(post=self.newer)
+
+        set_liked(self.older.pk, self.fan, True)
+        self.assertEqual(update_trending(), 1)
+        self.assertEqual(self.ranking(), ['Older', 'Newer'])
+        rescored = TrendingScore.objects.get(post=self.newer)
+        self.assertEqual((rescored.score, rescored.computed_at), (untouched.score, untouched.computed_at))
+
+    def test_new_post_is_ranked_at_once(self):
+        watermark = TrendingScore.objects.aggregate(last=Max('computed_at'))['last']
+        self.client.force_login(self.author)
+        self.client.post('/posts/create/', {'content': 'Brand new'})
+        self.assertEqual(self.ranking()[0], 'Brand new')
+        # The last run's watermark is unchanged, so the next run still picks the post up
+        self.assertEqual(TrendingScore.objects.aggregate(last=Max('computed_at'))['last'], watermark)
+        self.assertEqual(update_trending(), 1)
+
+
+class MergeLegacyPostsTests(TransactionTestCase):
+    """
+    merge_legacy_posts moves the legacy profiles Post/Like/Comment rows into
+    the posts tables once, without duplicating rows that are already there.
+    (A TransactionTestCase: the legacy tables are created with the schema editor.)
+    """
+
+    def setUp(self):
+        cache.clear()
+        state = MigrationLoader(connection).project_state(LEGACY_STATE)
+        self.legacy = tuple(state.apps.get_model('profiles', name) for name in ('Post', 'Like', 'Comment'))
+        with connection.schema_editor() as editor:
+            for model in self.legacy:
+                editor.create_model(model)
+        self.addCleanup(self.drop_legacy_tables)
+
+    def drop_legacy_tables(self):
+        with connection.schema_editor() as editor:
+            for model in reversed(self.legacy):
+                editor.delete_model(model)
+
+    def test_merge(self):
+        LegacyPost, LegacyLike, LegacyComment = self.legacy
+        bob = User.objects.create_user('bob', 'bob@example.com', 'pw12345!x')
+        alice = User.objects.create_user('alice', 'alice@example.com', 'pw12345!x')
+        moment = timezone.now() - timedelta(days=1)
+
+        live = Post.objects.create(user=bob, content='Hello', created_at=moment, like_count=1)
+        Like.objects.create(post=live, user=alice)
+        # The same post, written through the legacy models too
+        duplicate = LegacyPost.objects.create(user_id=bob.pk, content='Hello', created_at=moment)
+        LegacyLike.objects.create(post=duplicate, user_id=alice.pk, created_at=moment)
+        LegacyComment.objects.create(post=duplicate, author_id=alice.pk, content='Hi bob', created_at=moment)
+        legacy_only = LegacyPost.objects.create(user_id=bob.pk, content='Only in legacy', created_at=moment)
+        LegacyLike.objects.create(post=legacy_only, user_id=alice.pk, created_at=moment)
+        for n in range(2):
+            LegacyComment.objects.create(post=legacy_only, author_id=bob.pk, content=f'Note {n}', created_at=moment)
+
+        out = StringIO()
+        call_command('merge_legacy_posts', batch_size=1, stdout=out)
+        self.assertIn('created 1 post(s) (1 duplicate(s) of existing posts), 1 like(s) and 3 comment(s)', out.getvalue())
+
+        self.assertEqual(
+            sorted(Post.objects.values_list('content', 'like_count', 'comment_count')),
+            [('Hello', 1, 1), ('Only in legacy', 1, 2)],
+        )
+        self.assertEqual(legacy_row_counts(self.legacy), (0, 0, 0))
+
+        # Nothing is left to copy the second time
+        call_command('merge_legacy_posts', stdout=out)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Like.objects.count(), 2)
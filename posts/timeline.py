@@ -0,0 +1,108 @@
+# posts/timeline.py
+
+"""
+Fan-out-on-write timeline store for the home feed.
+
+Every post is copied into the timeline of its author and of each follower
+when it is created, so the home feed becomes a single indexed range scan on
+(owner, created_at) instead of an OR query over the whole posts table.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from profiles.models import UserProfile
+
+from .models import Post, TimelineEntry
+
+# Maximum number of entries kept per user when a timeline is (re)built
+TIMELINE_MAX_LENGTH = getattr(settings, 'TIMELINE_MAX_LENGTH', 800)
+# Number of recent posts copied into a timeline when a new follow happens
+TIMELINE_BACKFILL_LIMIT = getattr(settings, 'TIMELINE_BACKFILL_LIMIT', 50)
+TIMELINE_BATCH_SIZE = 1000
+
+
+def follower_ids(user_id):
+    """
+    Returns the user IDs of everyone following the given user.
+    """
+    return UserProfile.objects.filter(following__user_id=user_id).values_list('user_id', flat=True)
+
+
+def fan_out_post(post):
+    """
+    Writes a new post into the timeline of its author and all their followers.
+    """
+    owner_ids = [post.user_id, *follower_ids(post.user_id)]
+    entries = [
+        TimelineEntry(owner_id=owner_id, post_id=post.pk, created_at=post.created_at)
+        for owner_id in owner_ids
+    ]
+    TimelineEntry.objects.bulk_create(entries, batch_size=TIMELINE_BATCH_SIZE, ignore_conflicts=True)
+
+
+def backfill_follow(follower, followed):
+    """
+    Copies the most recent posts of a newly followed user into the follower's timeline.
+    """
+    recent_posts = (
+        Post.objects.filter(user=followed)
+        .order_by('-created_at')
+        .values_list('pk', 'created_at')[:TIMELINE_BACKFILL_LIMIT]
+    )
+    entries = [
+        TimelineEntry(owner_id=follower.pk, post_id=post_pk, created_at=created_at)
+        for post_pk, created_at in recent_posts
+    ]
+    TimelineEntry.objects.bulk_create(entries, batch_size=TIMELINE_BATCH_SIZE, ignore_conflicts=True)
+
+
+def trim_unfollow(follower, unfollowed):
+    """
+    Removes an unfollowed user's posts from the follower's timeline.
+    """
+    TimelineEntry.objects.filter(owner=follower, post__user=unfollowed).delete()
+
+
+def rebuild_timeline(user):
+    """
+    Rebuilds one user's timeline from scratch using the follow graph.
+    Returns the number of entries written.
+    """
+    following_user_ids = UserProfile.objects.filter(followers__user=user).values_list('user_id', flat=True)
+    recent_posts = (
+        Post.objects.filter(Q(user_id__in=following_user_ids) | Q(user=user))
+        .order_by('-created_at')
+        .values_list('pk', 'created_at')[:TIMELINE_MAX_LENGTH]
+    )
+    entries = [
+        TimelineEntry(owner_id=user.pk, post_id=post_pk, created_at=created_at)
+        for post_pk, created_at in recent_posts
+    ]
+
+    with transaction.atomic():
+        TimelineEntry.objects.filter(owner=user).delete()
+        TimelineEntry.objects.bulk_create(entries, batch_size=TIMELINE_BATCH_SIZE)
+
+    return len(entries)
+
+
+def timeline_entries(user):
+    """
+    Returns a user's timeline rows, newest first.
+    Served by a single range scan of the (owner, created_at) index.
+    """
+    return TimelineEntry.objects.filter(owner=user).order_by('-created_at', '-post_id')
+
+
+def hydrate_page(page, posts_queryset):
+    """
+    Replaces the timeline entries on a page with the matching posts from
+    ``posts_queryset`` (which carries the annotations and select_related the
+    feed needs), preserving timeline order.
+    """
+    post_ids = [entry.post_id for entry in page.object_list]
+    posts_by_id = posts_queryset.in_bulk(post_ids)
+    page.object_list = [posts_by_id[pk] for pk in post_ids if pk in posts_by_id]
+    return page
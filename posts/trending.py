@@ -0,0 +1,151 @@
+# posts/trending.py
+
+"""
+Materialized trending ranking for the explore page.
+
+A post's score is its time-decayed engagement: the post itself, each like
+and each comment (comments weigh more) count for half as much for every
+TRENDING_HALF_LIFE that has passed since they happened. Scores are stored in
+log2 space against a fixed epoch,
+
+    score = log2(sum(weight * 2 ** ((event_time - EPOCH) / TRENDING_HALF_LIFE)))
+
+so decay never has to be re-applied: with time, every score would drop by
+the same amount, which leaves the ranking unchanged. A score therefore only
+changes when its post gets new engagement, and update_trending() rescores
+just the posts created, liked or commented on since its previous run.
+Unlikes are not tracked as events; they are picked up at the post's next
+engagement or by a full rebuild (`manage.py update_trending --full`).
+"""
+
+import math
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from profiles.caching import bump_version
+from profiles.jobs import enqueue
+
+from .models import Post, Like, Comment, TrendingScore
+
+# Engagement loses half its weight every TRENDING_HALF_LIFE
+TRENDING_HALF_LIFE = getattr(settings, 'TRENDING_HALF_LIFE', timedelta(hours=24))
+# New engagement triggers at most one incremental update per interval (through the job queue)
+TRENDING_UPDATE_INTERVAL = getattr(settings, 'TRENDING_UPDATE_INTERVAL', timedelta(minutes=5))
+# Each run re-reads this far behind the previous one, to catch rows committed late
+TRENDING_OVERLAP = timedelta(minutes=1)
+TRENDING_BATCH_SIZE = 500
+
+POST_WEIGHT = 1
+LIKE_WEIGHT = 1
+COMMENT_WEIGHT = 3
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decayed_score(events):
+    """
+    Returns the log2 of the decayed sum of (weight, datetime) events.
+    Computed around the largest term, so recent events don't overflow.
+    """
+    terms = [math.log2(weight) + (moment - EPOCH) / TRENDING_HALF_LIFE for weight, moment in events]
+    top = max(terms)
+    return top + math.log2(sum(2 ** (term - top) for term in terms))
+
+
+def score_posts(post_ids, now=None):
+    """
+    Recomputes and stores the scores of the given posts. Returns the number stored.
+    """
+    events = defaultdict(list)
+    for pk, created_at in Post.objects.filter(pk__in=post_ids).values_list('pk', 'created_at'):
+        events[pk].append((POST_WEIGHT, created_at))
+    if not events:
+        return 0
+    for post_id, created_at in Like.objects.filter(post_id__in=events).values_list('post_id', 'created_at'):
+        events[post_id].append((LIKE_WEIGHT, created_at))
+    for post_id, created_at in Comment.objects.filter(post_id__in=events).values_list('post_id', 'created_at'):
+        events[post_id].append((COMMENT_WEIGHT, created_at))
+
+    now = now or timezone.now()
+    rows = [
+        TrendingScore(post_id=pk, score=decayed_score(post_events), computed_at=now)
+        for pk, post_events in events.items()
+    ]
+    # Upsert; MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+    unique_fields = ['post'] if connection.features.supports_update_conflicts_with_target else None
+    TrendingScore.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=unique_fields, update_fields=['score', 'computed_at'],
+    )
+    return len(rows)
+
+
+def score_new_post(post):
+    """
+    Stores the score of a post that was just created, so it shows on explore
+    right away instead of after the next update_trending() run.
+    """
+    score = decayed_score([(POST_WEIGHT, post.created_at)])
+    unique_fields = ['post'] if connection.features.supports_update_conflicts_with_target else None
+    # computed_at=EPOCH: Max(computed_at) marks update_trending()'s last run and must not move.
+    # The next run rescores the post anyway, as a post created since then.
+    TrendingScore.objects.bulk_create(
+        [TrendingScore(post_id=post.pk, score=score, computed_at=EPOCH)],
+        update_conflicts=True, unique_fields=unique_fields, update_fields=['score', 'computed_at'],
+    )
+
+
+def changed_post_ids(since):
+    """
+    Returns the IDs of posts created, liked or commented on at or after ``since``.
+    """
+    post_ids = set(Post.objects.filter(created_at__gte=since).values_list('pk', flat=True))
+    post_ids.update(Like.objects.filter(created_at__gte=since).values_list('post_id', flat=True))
+    post_ids.update(Comment.objects.filter(created_at__gte=since).values_list('post_id', flat=True))
+    return sorted(post_ids)
+
+
+def update_trending(full=False, batch_size=TRENDING_BATCH_SIZE):
+    """
+    Rescores the posts with engagement since the last run (every post when
+    ``full`` or on the first run). Returns the number of posts rescored.
+    """
+    now = timezone.now()
+    last_run = None if full else TrendingScore.objects.aggregate(last=Max('computed_at'))['last']
+    if last_run is None:
+        post_ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+    else:
+        post_ids = changed_post_ids(last_run - TRENDING_OVERLAP)
+
+    for start in range(0, len(post_ids), batch_size):
+        score_posts(post_ids[start:start + batch_size], now)
+
+    if post_ids:
+        bump_version('feed')  # The cached anonymous explore page shows the old order
+    return len(post_ids)
+
+
+def schedule_update():
+    """
+    Called after new engagement: queues one incremental update per
+    TRENDING_UPDATE_INTERVAL, however many likes/comments/posts arrive in it.
+    """
+    interval = TRENDING_UPDATE_INTERVAL.total_seconds()
+    bucket = int(time.time() // interval)
+    # The cache absorbs repeat calls so only the first one in a bucket touches the Job table
+    if not cache.add(f'trending:scheduled:{bucket}', True, interval):
+        return
+    run_in = (bucket + 1) * interval - time.time()
+    enqueue('posts.update_trending', key=f'trending:{bucket}', delay=timedelta(seconds=run_in))
+
+
+def trending_scores():
+    """
+    The explore ranking, highest score first (served by trending_rank_idx).
+    """
+    return TrendingScore.objects.order_by('-score', '-post_id')
@@ -1,24 +1,18 @@
-from django.contrib import admin
-from django.urls import path, include
+from django.urls import path
+from . import views
 
-# ✅ Restored for media file serving during development
-from django.conf import settings
-from django.conf.urls.static import static
+app_name = 'posts'
 
 urlpatterns = [
-    # Admin URL
-    path('admin/', admin.site.urls),
+    # The feed and post creation live in profiles/urls.py (home, posts/create/)
+    path('<int:post_pk>/', views.post_detail, name='post_detail'), # Using post_pk for consistency
 
-    # User Authentication URLs
-    path('accounts/', include('django.contrib.auth.urls')),
-
-    # Profiles and General App URLs
-    path('', include('profiles.urls')),
-
-    # Posts URLs
-    path('posts/', include('posts.urls')),
-]
-
-# ✅ Serve media files locally when DEBUG=True
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Interaction Views (Liking/Commenting)
+    path('<int:post_pk>/comment/', views.add_comment, name='add_comment'),
+    # Next page of a post's comments, as an HTML fragment or JSON (used by static/js/comments.js)
+    path('<int:post_pk>/comments/', views.comment_list, name='comment_list'),
+    # Use the name 'like_post' as planned in the previous step's view implementation
+    path('<int:post_pk>/like/', views.like_post, name='like_post'),
+    # JSON like/unlike with an explicit desired state (used by static/js/likes.js)
+    path('<int:post_pk>/like/state/', views.set_like_state, name='set_like_state'),
+]
\ No newline at end of file
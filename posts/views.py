@@ -1,68 +1,147 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect, HttpResponse
+from django.contrib import messages
+from django.db import transaction
+from django.db.models import F, Exists, OuterRef
+from django.http import HttpResponseRedirect, JsonResponse, Http404
+from django.views.decorators.http import require_POST
 
+from profiles.forms import CommentForm
+from profiles.profiling import query_budget
+from profiles.routing import read_replica
+from .comments import comment_page, COMMENT_PAGE_SIZE, COMMENT_PAGE_MAX
+from .likes import set_liked
 from .models import Post, Like, Comment  # Ensure these models exist
+from .trending import schedule_update
 
 # ------------------------------------------------------------------
-# 1. Post Feed View
+# 1. Post Detail View
 # ------------------------------------------------------------------
-def post_list(request):
+@read_replica
+@query_budget(8)
+def post_detail(request, post_pk):
     """
-    Displays the main post feed.
-    Replace this with a template and real post query later.
+    Displays a single post with the first page of its comments (or the page
+    after ``?after=``); further pages load through comment_list.
     """
-    return HttpResponse("<h1>Post Feed (post_list view)</h1><p>The server is now running successfully.</p>")
+    posts = Post.objects.select_related('user__userprofile')
+    if request.user.is_authenticated:
+        posts = posts.annotate(is_liked=Exists(Like.objects.filter(user=request.user, post=OuterRef('pk'))))
+    post = get_object_or_404(posts, pk=post_pk)
+    comments, next_cursor = comment_page(post.pk, after=request.GET.get('after'))
 
-# ------------------------------------------------------------------
-# 2. Create Post View
-# ------------------------------------------------------------------
-@login_required
-def create_post(request):
-    """
-    Handles the creation of a new post.
-    """
-    return HttpResponse("<h1>Create Post View</h1>")
+    return render(request, 'profiles/post_detail.html', {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'comment_form': CommentForm(),
+    })
 
-# ------------------------------------------------------------------
-# 3. Post Detail View
-# ------------------------------------------------------------------
-def post_detail(request, post_pk):
+
+@read_replica
+@query_budget(5)
+def comment_list(request, post_pk):
     """
-    Displays a single post with its comments.
+    The next ``limit`` comments after the ``after`` cursor, as an HTML
+    fragment for static/js/comments.js, or as JSON with ?format=json.
     """
-    return HttpResponse(f"<h1>Post Detail View</h1><p>Viewing post ID: {post_pk}</p>")
+    try:
+        limit = min(max(int(request.GET.get('limit', COMMENT_PAGE_SIZE)), 1), COMMENT_PAGE_MAX)
+    except ValueError:
+        limit = COMMENT_PAGE_SIZE
+    comments, next_cursor = comment_page(post_pk, after=request.GET.get('after'), limit=limit)
+    if not comments and not Post.objects.filter(pk=post_pk).exists():
+        raise Http404("Post not found.")
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'post': post_pk,
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'content': comment.content,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_cursor,
+        })
+    return render(request, 'profiles/_comments.html', {
+        'post_id': post_pk,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    })
 
 # ------------------------------------------------------------------
-# 4. Add Comment View
+# 2. Add Comment View
 # ------------------------------------------------------------------
 @login_required
 def add_comment(request, post_pk):
     """
     Handles POST requests to add a comment to a specific post.
+    Keeps the post's denormalized comment_count in sync in the same transaction.
     """
-    return HttpResponse(f"<h1>Add Comment View</h1><p>Adding comment to post ID: {post_pk}</p>")
+    post = get_object_or_404(Post, pk=post_pk)
+
+    if request.method == 'POST':
+        form = CommentForm(request.POST)
+        if form.is_valid():
+            with transaction.atomic():
+                comment = form.save(commit=False)
+                comment.post = post
+                comment.author = request.user
+                comment.save()
+                Post.objects.filter(pk=post.pk).update(comment_count=F('comment_count') + 1)
+            schedule_update()
+        else:
+            messages.error(request, "Your comment could not be posted.")
+
+    return_path = request.META.get('HTTP_REFERER')
+    return HttpResponseRedirect(return_path) if return_path else redirect('profiles:home')
 
 # ------------------------------------------------------------------
-# 5. Like Post View
+# 3. Like Post View
 # ------------------------------------------------------------------
 @login_required
+@query_budget(12)
 def like_post(request, post_pk):
     """
-    Toggles the like status for a post by the current user.
+    Form fallback for liking without JavaScript: sets the like to the posted
+    ``liked`` state (toggles when it is missing) and redirects back.
     """
     if request.method == 'POST':
         post = get_object_or_404(Post, pk=post_pk)
-        user = request.user
-
-        like_instance = Like.objects.filter(post=post, user=user).first()
-
-        if like_instance:
-            like_instance.delete()  # UNLIKE
+        liked = request.POST.get('liked')
+        if liked in ('0', '1'):
+            liked = liked == '1'
         else:
-            Like.objects.create(post=post, user=user)  # LIKE
+            liked = not Like.objects.filter(post=post, user=request.user).exists()
+        set_liked(post.pk, request.user, liked)
 
         return_path = request.META.get('HTTP_REFERER')
         return HttpResponseRedirect(return_path) if return_path else redirect('profiles:home')
 
     return redirect('profiles:home')
+
+# ------------------------------------------------------------------
+# 4. Like State (JSON) View
+# ------------------------------------------------------------------
+@login_required
+@require_POST
+@query_budget(12)
+def set_like_state(request, post_pk):
+    """
+    JSON endpoint behind the like buttons: POST liked=1 to like, liked=0 to unlike.
+    Idempotent; returns the resulting state and like count so the page can update in place.
+    """
+    liked = request.POST.get('liked')
+    if liked not in ('0', '1'):
+        return JsonResponse({'error': "'liked' must be '0' or '1'."}, status=400)
+
+    try:
+        changed, like_count = set_liked(post_pk, request.user, liked == '1')
+    except Post.DoesNotExist:
+        return JsonResponse({'error': 'Post not found.'}, status=404)
+
+    return JsonResponse({'post': post_pk, 'liked': liked == '1', 'changed': changed, 'like_count': like_count})
@@ -0,0 +1,157 @@
+# profiles/accounts.py
+
+"""
+Account creation: email uniqueness and bulk provisioning.
+
+Email addresses are unique regardless of case. The database enforces it
+with the auth_user_email_ci_uniq expression index on EmailKey(email) (see
+migration 0021); blank addresses map to NULL there, so accounts without an
+email (e.g. from createsuperuser) don't collide. Lookups compare the same
+expression, so they are served by that index instead of scanning auth_user.
+
+Signup creates one user row and, through the post_save signal, one profile
+row, in a single transaction (see signup_view). provision_users() creates
+accounts in bulk for organization imports, without per-user signals.
+"""
+
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import CharField, Func, Value
+
+from .jobs import enqueue
+from .models import UserProfile, ProfileSkill
+from .skills import get_or_create_skills, normalize_skill, parse_skills
+
+PROVISION_BATCH_SIZE = 500
+# Profile columns a provisioning row may set
+PROFILE_FIELDS = ('bio', 'location', 'skills', 'job_title', 'website', 'contact', 'education')
+
+
+class EmailKey(Func):
+    """
+    NULLIF(LOWER(email), ''): the case-insensitive uniqueness key of an address.
+    The literal '' (not a parameter) keeps the SQL identical to the index expression.
+    """
+    template = "NULLIF(LOWER(%(expressions)s), '')"
+    output_field = CharField()
+
+
+def email_taken(email):
+    """
+    True if another account already uses this address, ignoring case.
+    """
+    return User.objects.alias(email_key=EmailKey('email')).filter(email_key=EmailKey(Value(email))).exists()
+
+
+# ===============================
+# Bulk provisioning
+# ===============================
+
+def _build_profile_skills(profiles):
+    # One get_or_create_skills call for the whole batch instead of one sync per profile
+    names = {profile.pk: parse_skills(profile.skills) for profile in profiles if profile.skills}
+    skills = {
+        skill.normalized: skill
+        for skill in get_or_create_skills([name for batch in names.values() for name in batch])
+    }
+    return [
+        ProfileSkill(profile_id=profile_id, skill=skills[normalize_skill(name)], position=position)
+        for profile_id, profile_names in names.items()
+        for position, name in enumerate(profile_names)
+    ]
+
+
+def _provision_batch(accounts, skipped):
+    usernames = [account['username'] for account in accounts]
+    taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    taken_emails = set(
+        User.objects.alias(email_key=EmailKey('email'))
+        .filter(email_key__in=[account['email'].lower() for account in accounts if account['email']])
+        .values_list('email', flat=True)
+    )
+    taken_emails = {email.lower() for email in taken_emails}
+
+    users = []
+    for account in accounts:
+        if account['username'] in taken:
+            skipped.append((account['username'], "username already exists"))
+        elif account['email'] and account['email'].lower() in taken_emails:
+            skipped.append((account['username'], "email already registered"))
+        else:
+            users.append(User(
+                username=account['username'],
+                email=account['email'],
+                first_name=account.get('first_name', ''),
+                last_name=account.get('last_name', ''),
+                # Hashing is deliberately slow; accounts without one set theirs through password reset
+                password=make_password(account.get('password') or None),
+            ))
+    if not users:
+        return []
+
+    with transaction.atomic():
+        # A row that collides with a concurrent signup is skipped by the database
+        User.objects.bulk_create(users, ignore_conflicts=True)
+        # Re-read for primary keys (not every backend returns them from bulk_create)
+        emails = {user.username: user.email for user in users}
+        created = {
+            username: pk
+            for username, pk, email in User.objects.filter(username__in=emails).values_list('username', 'pk', 'email')
+            if email == emails[username]
+        }
+        for username in emails.keys() - created.keys():
+            skipped.append((username, "created concurrently by someone else"))
+        if not created:
+            return []
+
+        rows = {account['username']: account for account in accounts}
+        UserProfile.objects.bulk_create([
+            UserProfile(user_id=pk, **{
+                field: rows[username][field] for field in PROFILE_FIELDS if rows[username].get(field)
+            })
+            for username, pk in created.items()
+        ])
+        profiles = list(UserProfile.objects.filter(user_id__in=created.values()).only('pk', 'skills'))
+        ProfileSkill.objects.bulk_create(_build_profile_skills(profiles))
+        # One indexing job per batch rather than one per profile
+        enqueue('profiles.index_profiles', {'profile_ids': [profile.pk for profile in profiles]})
+
+    return list(created)
+
+
+def provision_users(accounts, batch_size=PROVISION_BATCH_SIZE):
+    """
+    Creates users and their profiles in bulk, for onboarding an organization.
+    ``accounts`` is an iterable of dicts with a username and email, and
+    optionally first_name, last_name, password and any of PROFILE_FIELDS.
+    Accounts whose username or email exists (or repeats an earlier row) are skipped.
+    Returns (created usernames, [(username, reason), ...] for the skipped ones).
+    """
+    created = []
+    skipped = []
+    seen_usernames = set()
+    seen_emails = set()
+
+    def cleaned(rows):
+        for account in rows:
+            account = dict(account)
+            account['username'] = (account.get('username') or '').strip()
+            account['email'] = User.objects.normalize_email((account.get('email') or '').strip())
+            if not account['username']:
+                skipped.append(('', "no username"))
+            elif account['username'] in seen_usernames:
+                skipped.append((account['username'], "duplicate username in input"))
+            elif account['email'] and account['email'].lower() in seen_emails:
+                skipped.append((account['username'], "duplicate email in input"))
+            else:
+                seen_usernames.add(account['username'])
+                seen_emails.add(account['email'].lower())
+                yield account
+
+    rows = cleaned(accounts)
+    while batch := list(islice(rows, batch_size)):
+        created += _provision_batch(batch, skipped)
+    return created, skipped
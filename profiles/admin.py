@@ -3,7 +3,7 @@
 from django.contrib import admin
 # Removed the redundant 'from django.contrib import admin' later in the file
 
-from .models import UserProfile, Post, Comment, Like
+from .models import UserProfile, Skill, Endorsement, Job
 
 # -----------------------------------------------------------------
 # Removed the following duplicate registrations:
@@ -19,24 +19,25 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'location', 'created_at')
     search_fields = ('user__username', 'location')
 
-@admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    # Fixed the PostAdmin list_display. Assuming the 'user' field is the author.
-    list_display = ('user', 'content', 'created_at') 
-    # Adjusted search_fields to match the ForeignKey to User (which is 'user' on the Post model)
-    search_fields = ('user__username', 'content') 
-    list_filter = ('created_at',)
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name', 'normalized')
+    # Prefix lookups on the unique 'normalized' column stay index-backed
+    search_fields = ('^normalized',)
 
-@admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('author', 'post', 'content', 'created_at')
-    # Adjusted search_fields to use 'author' (which is a ForeignKey to User)
-    search_fields = ('author__username', 'content') 
+@admin.register(Endorsement)
+class EndorsementAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'created_at')
     list_filter = ('created_at',)
+    search_fields = ('profile__user__username', 'endorser__user__username', '^skill__normalized')
+    # __str__ follows all three foreign keys
+    list_select_related = ('profile__user', 'endorser__user', 'skill')
+    raw_id_fields = ('profile', 'endorser', 'skill')
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('idempotency_key',)
 
-@admin.register(Like)
-class LikeAdmin(admin.ModelAdmin):
-    list_display = ('user', 'post', 'created_at')
-    # Adjusted search_fields to use 'user' (which is a ForeignKey to User)
-    search_fields = ('user__username',) 
-    list_filter = ('created_at',)
\ No newline at end of file
+# Post, Comment and Like are registered in posts/admin.py
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -6,3 +7,5 @@ class ProfilesConfig(AppConfig):
 
     def ready(self):
         from . import signals  # ✅ relative import
+        # Register every app's background tasks (tasks.py) with the job queue
+        autodiscover_modules('tasks')
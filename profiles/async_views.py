@@ -0,0 +1,189 @@
+# profiles/async_views.py
+
+"""
+Async versions of the read-heavy views (feed, explore, profile, search),
+used instead of the ones in views.py when ASYNC_VIEWS is on, i.e. when the
+site is served by an ASGI server (see linkup/asgi.py and the procfile).
+
+While a query runs, an async view yields the event loop to other requests
+instead of pinning a worker; that is the whole gain. A request's ORM calls,
+native (aget, async for) or through sync_to_async, all run one after another
+on its one thread-sensitive executor and database connection, so the steps
+of a view are simply awaited in turn: gathering them would not overlap them.
+Helpers that are synchronous (pagination, stats, suggestions, search,
+template rendering) are called through sync_to_async.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef, Value, BooleanField
+from django.shortcuts import render, aget_object_or_404
+
+from posts.models import Post, Like
+from posts.comments import attach_comment_previews
+from posts.pagination import paginate_posts
+from posts.timeline import timeline_entries, hydrate_page
+from posts.trending import trending_scores
+
+from .caching import cache_anonymous_page, attach_post_cache_versions, get_version
+from .forms import PostForm, CommentForm, SearchForm, EndorsementForm
+from .models import Endorsement
+from .profiling import query_budget
+from .routing import read_replica
+from . import graph
+from .search import search_profiles
+from .stats import get_stats
+from .suggestions import get_suggested_users
+
+
+def _annotate_liked(queryset, user):
+    # Whether the viewer liked each post, as one EXISTS subquery
+    if user.is_authenticated:
+        return queryset.annotate(is_liked=Exists(Like.objects.filter(user=user, post=OuterRef('pk'))))
+    return queryset.annotate(is_liked=Value(False, output_field=BooleanField()))
+
+
+def _timeline_page(request, user, posts_queryset):
+    posts = paginate_posts(request, timeline_entries(user), 50, ordering=('created_at', 'post_id'))
+    return hydrate_page(posts, posts_queryset)
+
+
+def _trending_page(request, posts_queryset):
+    posts = paginate_posts(request, trending_scores(), 20, ordering=('score', 'post_id'))
+    return hydrate_page(posts, posts_queryset)
+
+
+async def _viewer(request):
+    # Loads the lazy request.user rather than calling auser(): the auth context
+    # processor and the middleware then reuse this one lookup
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def _render(request, template_name, context):
+    # Templates may still touch lazy relations, which only sync code can load
+    return await sync_to_async(render)(request, template_name, context)
+
+
+# ===============================
+# Core Views (Feed/Home)
+# ===============================
+
+@cache_anonymous_page('feed')
+@read_replica
+@query_budget(15)
+async def home(request):
+    user = await _viewer(request)
+    posts_queryset = _annotate_liked(Post.objects.all().order_by('-created_at'), user)
+    posts_queryset = posts_queryset.select_related('user__userprofile')
+
+    if user.is_authenticated:
+        posts = await sync_to_async(_timeline_page)(request, user, posts_queryset)
+        suggested_users = await sync_to_async(get_suggested_users)(user, limit=5)
+    else:
+        posts = await sync_to_async(paginate_posts)(request, posts_queryset, 25)
+        suggested_users = User.objects.none()
+    await sync_to_async(attach_post_cache_versions)(posts)
+
+    return await _render(request, 'profiles/home.html', {
+        'posts': posts,
+        'post_form': PostForm(),
+        'comment_form': CommentForm(),
+        'suggested_users': suggested_users,
+    })
+
+
+# ===============================
+# 🛠️ PROFILE VIEWS
+# ===============================
+
+@read_replica
+@query_budget(22)
+async def profile_detail(request, username):
+    user_obj = await aget_object_or_404(User.objects.select_related('userprofile'), username=username)
+    profile = user_obj.userprofile
+    viewer = await _viewer(request)
+
+    posts_queryset = _annotate_liked(user_obj.user_posts.all().order_by('-created_at'), viewer)
+    endorsements = (
+        Endorsement.objects.filter(profile=profile)
+        .select_related('endorser__user', 'skill').order_by('-created_at')[:5]
+    )
+    skill_tags = profile.skill_tags.order_by('profile_skills__position')
+
+    def follow_status():
+        # From the cached follow graph (see graph.py)
+        if not viewer.is_authenticated or viewer.pk == user_obj.pk:
+            return False, 0
+        return graph.is_following(viewer.pk, user_obj.pk), len(graph.mutual_ids(viewer.pk, user_obj.pk))
+
+    posts = await sync_to_async(paginate_posts)(request, posts_queryset, 10)
+    stats = await sync_to_async(get_stats)(user_obj.pk)
+    following_profile, mutual_count = await sync_to_async(follow_status)()
+    endorsements = [endorsement async for endorsement in endorsements]
+    skill_tags = [skill async for skill in skill_tags]
+    await sync_to_async(attach_post_cache_versions)(posts)
+
+    endorsement_counts = stats['endorsement_counts']
+    return await _render(request, 'profiles/profile_detail.html', {
+        'profile': profile,
+        'posts': posts,
+        'endorsements': endorsements,
+        'skills': [(skill, endorsement_counts.get(skill.name, 0)) for skill in skill_tags],
+        'endorsement_form': EndorsementForm(),
+        'comment_form': CommentForm(),
+        'stats': stats,
+        'profile_cache_version': await sync_to_async(get_version)(f'profile:{user_obj.pk}'),
+        'following_profile': following_profile,
+        'mutual_count': mutual_count,
+    })
+
+
+# ===============================
+# Discovery & Search
+# ===============================
+
+@read_replica
+@query_budget(8)
+async def search_users(request):
+    form = SearchForm(request.GET)
+    results = []
+    per_page = 20
+
+    # Page numbers only; ranked results are fetched per_page + 1 at a time, never counted
+    try:
+        page_number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page_number = 1
+
+    if form.is_valid():
+        results = await sync_to_async(search_profiles)(
+            form.cleaned_data['query'], offset=(page_number - 1) * per_page, limit=per_page + 1,
+        )
+
+    return await _render(request, 'profiles/search_results.html', {
+        'form': form,
+        'results': results[:per_page],
+        'page_number': page_number,
+        'has_next': len(results) > per_page,
+        'has_previous': page_number > 1,
+    })
+
+
+@cache_anonymous_page('feed')
+@read_replica
+@query_budget(8)
+async def explore_posts(request):
+    user = await _viewer(request)
+    # Counts come from the denormalized counters
+    posts_queryset = _annotate_liked(Post.objects.all(), user).select_related('user__userprofile')
+
+    # Trending ranking page (see posts/trending.py), then that page's posts and their latest two comments
+    posts = await sync_to_async(_trending_page)(request, posts_queryset)
+    await sync_to_async(attach_comment_previews)(posts)
+    await sync_to_async(attach_post_cache_versions)(posts)
+
+    return await _render(request, 'profiles/explore.html', {
+        'posts': posts,
+        'comment_form': CommentForm(),
+    })
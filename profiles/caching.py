@@ -0,0 +1,150 @@
+# profiles/caching.py
+
+"""
+Caching helpers built on Django's cache framework.
+
+Cached entries are keyed by *versioned* keys: every namespace (e.g. ``feed``,
+``post:42``, ``profile:7``) has a version number stored in the cache, and
+bumping it makes every key built from the old version unreachable at once.
+The model signals in profiles/signals.py bump the affected namespaces, so
+nothing has to know which individual keys exist.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 10)
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def _initial_version():
+    # Seeded from the clock so a version evicted from the cache never restarts
+    # at a number whose keys might still be cached
+    return int(time.time())
+
+
+def get_version(namespace):
+    """
+    Returns the current version of a cache namespace.
+    """
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = _initial_version()
+        cache.add(_version_key(namespace), version, None)
+    return version
+
+
+def get_versions(namespaces):
+    """
+    Returns {namespace: version} for several namespaces with one cache round trip.
+    """
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for namespace in namespaces:
+        if namespace not in versions:
+            versions[namespace] = get_version(namespace)
+    return versions
+
+
+def bump_version(*namespaces):
+    """
+    Invalidates everything cached under the given namespaces.
+    """
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), _initial_version(), None)
+
+
+def versioned_key(namespace, *parts):
+    """
+    Builds a cache key that is invalidated when ``namespace`` is bumped.
+    """
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:v{get_version(namespace)}:{suffix}'
+
+
+def attach_post_cache_versions(posts):
+    """
+    Sets ``post.cache_version`` on each post for use in {% cache %} fragment keys.
+    The version changes whenever the post or its author's profile changes.
+    """
+    posts = list(posts)
+    namespaces = set()
+    for post in posts:
+        namespaces.add(f'post:{post.pk}')
+        namespaces.add(f'profile:{post.user_id}')
+    versions = get_versions(namespaces)
+    for post in posts:
+        post.cache_version = f"{versions[f'post:{post.pk}']}.{versions[f'profile:{post.user_id}']}"
+    return posts
+
+
+def _cached_page_key(request, namespace):
+    """
+    Returns the cache key for an anonymous GET page, or None when the request must not be cached.
+    """
+    if request.method != 'GET' or request.user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return versioned_key(namespace, 'page', path_hash)
+
+
+def _store_page(key, response, timeout):
+    if response.status_code == 200 and not response.cookies:
+        cache.set(key, response, timeout or PAGE_CACHE_TIMEOUT)
+
+
+def cache_anonymous_page(namespace='feed', timeout=None):
+    """
+    View decorator that caches whole GET responses for anonymous visitors,
+    who all see the same page. Authenticated requests are never cached, and
+    neither are responses that set cookies or carry flash messages.
+    Ordinary writes don't bump ``namespace``, so a page can be up to
+    ``timeout`` (PAGE_CACHE_TIMEOUT) seconds stale; bulk changes such as
+    imports and trending runs bump it. Works on sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapped(request, *args, **kwargs):
+                key = await sync_to_async(_cached_page_key)(request, namespace)
+                if key is None:
+                    return await view_func(request, *args, **kwargs)
+
+                response = await cache.aget(key)
+                if response is not None:
+                    return response
+
+                response = await view_func(request, *args, **kwargs)
+                await sync_to_async(_store_page)(key, response, timeout)
+                return response
+            return async_wrapped
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            key = _cached_page_key(request, namespace)
+            if key is None:
+                return view_func(request, *args, **kwargs)
+
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            _store_page(key, response, timeout)
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,225 @@
+# profiles/datasets.py
+
+"""
+Bulk export and import of the site's data, one dataset (table) at a time.
+
+A dataset is a fixed list of columns from one model, exported in primary
+key order as NDJSON (one JSON object per line) or CSV (header row first).
+Rows are read in primary key windows of `chunk_size` rows, each through
+.iterator(chunk_size=...), so memory stays flat however big the table is
+and no cursor stays open while a slow client downloads the stream.
+
+Imports go through bulk_create in batches. Rows whose key already exists
+are skipped, or overwritten with on_conflict='update', so an interrupted
+import can simply be run again. Derived tables (search index, profile
+stats, timelines, trending, suggestions) are not exported; rebuild them
+after an import (`manage.py import_data --rebuild`).
+
+Password hashes and staff flags are never exported: imported users get an
+unusable password and no admin access.
+"""
+
+import csv
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connections
+
+from posts.models import Post, Like, Comment
+
+from .models import UserProfile, Skill, ProfileSkill, Endorsement
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Dataset name -> (model, columns), in import order (referenced tables first)
+DATASETS = {
+    'users': (User, ['id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined']),
+    'skills': (Skill, ['id', 'name', 'normalized']),
+    'profiles': (UserProfile, [
+        'id', 'user_id', 'bio', 'image', 'location', 'skills', 'job_title',
+        'website', 'contact', 'education', 'created_at',
+    ]),
+    'profile_skills': (ProfileSkill, ['id', 'profile_id', 'skill_id', 'position']),
+    'follows': (UserProfile.following.through, ['id', 'from_userprofile_id', 'to_userprofile_id']),
+    'posts': (Post, ['id', 'user_id', 'content', 'image', 'created_at', 'like_count', 'comment_count']),
+    'likes': (Like, ['id', 'post_id', 'user_id', 'created_at']),
+    'comments': (Comment, ['id', 'post_id', 'author_id', 'content', 'created_at']),
+    'endorsements': (Endorsement, ['id', 'profile_id', 'endorser_id', 'skill_id', 'created_at']),
+}
+
+
+# ===============================
+# Export
+# ===============================
+
+def export_rows(name, chunk_size=EXPORT_CHUNK_SIZE, using='default'):
+    """
+    Yields the dataset's rows as tuples of its columns, in primary key order.
+    """
+    model, columns = DATASETS[name]
+    queryset = model.objects.using(using).order_by('pk').values_list(*columns)
+    window = queryset
+    while True:
+        count = 0
+        for row in window[:chunk_size].iterator(chunk_size=chunk_size):
+            count += 1
+            yield row
+        if count < chunk_size:
+            return
+        window = queryset.filter(pk__gt=row[0])  # `id` is always the first column
+
+
+class _Echo:
+    """
+    File-like object for csv.writer that hands each formatted line back instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _isoformat(value):
+    # Full precision; DjangoJSONEncoder would cut datetimes to milliseconds
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_dataset(name, fmt='ndjson', chunk_size=EXPORT_CHUNK_SIZE, using='default'):
+    """
+    Yields the dataset as text, one line (NDJSON object or CSV row) at a time.
+    """
+    columns = DATASETS[name][1]
+    rows = export_rows(name, chunk_size, using)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([_csv_value(value) for value in row])
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), default=_isoformat) + '\n'
+
+
+async def aiterate(iterator, batch=100):
+    """
+    Serves a synchronous stream from an async context, ``batch`` items per
+    thread hop. ASGI otherwise reads a sync StreamingHttpResponse whole into
+    memory before sending it.
+    """
+    take = sync_to_async(lambda: list(islice(iterator, batch)))
+    while items := await take():
+        for item in items:
+            yield item
+
+
+# ===============================
+# Import
+# ===============================
+
+def read_rows(lines, fmt='ndjson'):
+    """
+    Parses an iterable of text lines (e.g. an open file) into dicts, lazily.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+@contextmanager
+def _keep_timestamps(model):
+    # bulk_create would stamp auto_now/auto_now_add columns with the import time
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def import_rows(name, rows, batch_size=IMPORT_BATCH_SIZE, on_conflict='skip', using='default'):
+    """
+    Inserts dicts of a dataset's columns with batched bulk_create. Existing
+    rows are skipped, or updated in place with on_conflict='update'.
+    Returns the number of rows processed.
+    """
+    model, columns = DATASETS[name]
+    fields = {field.attname: field for field in model._meta.concrete_fields if field.attname in columns}
+    connection = connections[using]
+
+    if on_conflict == 'update':
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+        unique_fields = ['pk'] if connection.features.supports_update_conflicts_with_target else None
+        options = {
+            'update_conflicts': True,
+            'unique_fields': unique_fields,
+            'update_fields': [field.name for field in fields.values() if not field.primary_key],
+        }
+    else:
+        options = {'ignore_conflicts': True}
+
+    # Same unusable hash for every imported user, computed once
+    password = make_password(None) if model is User else None
+
+    def build(row):
+        values = {}
+        for attname, field in fields.items():
+            if attname not in row:
+                continue
+            value = row[attname]
+            # CSV has no null; an empty cell in a nullable column is one
+            if value == '' and field.null:
+                value = None
+            values[attname] = field.to_python(value)
+        instance = model(**values)
+        if password:
+            instance.password = password
+        return instance
+
+    count = 0
+    rows = iter(rows)
+    with _keep_timestamps(model):
+        while batch := [build(row) for row in islice(rows, batch_size)]:
+            model.objects.using(using).bulk_create(batch, **options)
+            count += len(batch)
+    return count
+
+
+def reset_sequences(names, using='default'):
+    """
+    Moves the primary key sequences past the imported IDs (PostgreSQL/Oracle; a no-op elsewhere).
+    """
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), [DATASETS[name][0] for name in names])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
-from .models import Post, UserProfile, Comment, Endorsement
+from posts.models import Post, Comment
+from .accounts import email_taken
+from .models import UserProfile, Endorsement
+from .skills import get_or_create_skill, normalize_skill
 
 # -------------------------------
 # Signup Form
@@ -17,7 +20,8 @@ class SignupForm(UserCreationForm):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        # Case-insensitive, through the auth_user_email_ci_uniq index (see accounts.py)
+        if email_taken(email):
             raise forms.ValidationError("This email is already registered.")
         return email
 
@@ -62,15 +66,22 @@ class CommentForm(forms.ModelForm):
 # Endorsement Form
 # -------------------------------
 class EndorsementForm(forms.ModelForm):
+    # Typed as free text, resolved to the shared Skill vocabulary in clean_skill()
+    skill = forms.CharField(
+        max_length=50,
+        help_text='Enter a skill listed on the user’s profile.',
+        widget=forms.TextInput(attrs={'placeholder': 'e.g. JavaScript'}),
+    )
+
     class Meta:
         model = Endorsement
         fields = ['skill']
-        help_texts = {
-            'skill': 'Enter a skill listed on the user’s profile.',
-        }
-        widgets = {
-            'skill': forms.TextInput(attrs={'placeholder': 'e.g. JavaScript'}),
-        }
+
+    def clean_skill(self):
+        name = self.cleaned_data.get('skill')
+        if not normalize_skill(name):
+            raise forms.ValidationError("Please enter a skill.")
+        return get_or_create_skill(name)
 
 # -------------------------------
 # Search Form
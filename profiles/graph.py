@@ -0,0 +1,208 @@
+# profiles/graph.py
+
+"""
+Follow graph service: follow/unfollow writes and cached adjacency reads.
+
+Each user's following and follower IDs are cached as sorted arrays of
+64-bit ints packed into bytes. They are user IDs, not profile IDs, so
+callers that only have request.user need no profile lookup. On a cache hit,
+"is following" (binary search), "mutual connections" (sorted intersection)
+and the counts are answered without touching the database.
+
+follow() and unfollow() write changes through to both cached arrays once
+the change commits. A writer that can't take an array's short lock, or
+finds nothing cached, bumps that array's version instead. A concurrent
+writer or a database read in flight then lands on a dead key rather than
+caching a stale list. Lists longer than GRAPH_MAX_CACHED_IDS (popular
+accounts' followers) are not cached; only their length is.
+
+Bulk writes that bypass follow()/unfollow() (the admin, management
+commands) must call invalidate_graph().
+"""
+
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .caching import bump_version, get_versions
+from .models import UserProfile
+
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+GRAPH_CACHE_TIMEOUT = getattr(settings, 'GRAPH_CACHE_TIMEOUT', 60 * 60 * 24)
+# Longer adjacency lists are read from the database; only their length is cached
+GRAPH_MAX_CACHED_IDS = getattr(settings, 'GRAPH_MAX_CACHED_IDS', 50000)
+# How long a write-through may hold an array's lock (seconds)
+GRAPH_LOCK_TIMEOUT = 5
+
+Follow = UserProfile.following.through
+
+
+def _namespace(user_id, direction):
+    return f'graph:{direction}:{user_id}'
+
+
+def _key(user_id, direction):
+    # 'graph' is bumped by invalidate_graph(), the per-array namespace by contended writes
+    namespace = _namespace(user_id, direction)
+    versions = get_versions(['graph', namespace])
+    return f"{namespace}:v{versions['graph']}.{versions[namespace]}"
+
+
+def _query(user_id, direction):
+    if direction == FOLLOWING:
+        return Follow.objects.filter(from_userprofile__user_id=user_id).values_list('to_userprofile__user_id', flat=True)
+    return Follow.objects.filter(to_userprofile__user_id=user_id).values_list('from_userprofile__user_id', flat=True)
+
+
+def _cached(user_id, direction):
+    """
+    Returns the sorted ID array, or the list's length (an int) when it is too long to cache.
+    """
+    key = _key(user_id, direction)
+    data = cache.get(key)
+    if data is None:
+        # From the primary: a lagging replica would cache a list missing recent follows
+        ids = array('q', sorted(_query(user_id, direction).using('default')))
+        data = ids.tobytes() if len(ids) <= GRAPH_MAX_CACHED_IDS else len(ids)
+        # add(), not set(): a write-through that landed meanwhile is newer than this read
+        cache.add(key, data, GRAPH_CACHE_TIMEOUT)
+        return ids if isinstance(data, bytes) else data
+    if isinstance(data, int):
+        return data
+    ids = array('q')
+    ids.frombytes(data)
+    return ids
+
+
+def _contains(ids, value):
+    i = bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+
+# ===============================
+# Reads
+# ===============================
+
+def following_ids(user_id):
+    """
+    Sorted array of the user IDs ``user_id`` follows.
+    """
+    ids = _cached(user_id, FOLLOWING)
+    return ids if not isinstance(ids, int) else array('q', sorted(_query(user_id, FOLLOWING)))
+
+
+def follower_ids(user_id):
+    """
+    Sorted array of the user IDs following ``user_id``.
+    """
+    ids = _cached(user_id, FOLLOWERS)
+    return ids if not isinstance(ids, int) else array('q', sorted(_query(user_id, FOLLOWERS)))
+
+
+def is_following(follower_id, followed_id):
+    """
+    True if ``follower_id`` follows ``followed_id`` (both user IDs).
+    """
+    ids = _cached(follower_id, FOLLOWING)
+    if isinstance(ids, int):
+        return _query(follower_id, FOLLOWING).filter(to_userprofile__user_id=followed_id).exists()
+    return _contains(ids, followed_id)
+
+
+def mutual_ids(user_id, other_id):
+    """
+    User IDs that ``user_id`` follows and that follow ``other_id`` ("followed by people you follow").
+    """
+    mine = following_ids(user_id)
+    theirs = _cached(other_id, FOLLOWERS)
+    if isinstance(theirs, int):
+        return list(_query(other_id, FOLLOWERS).filter(from_userprofile__user_id__in=list(mine)).order_by())
+    # Probe the longer array for each ID of the shorter one: O(m log n)
+    shorter, longer = sorted((mine, theirs), key=len)
+    return [value for value in shorter if _contains(longer, value)]
+
+
+def counts(user_id):
+    """
+    Returns (following count, follower count).
+    """
+    return tuple(
+        ids if isinstance(ids, int) else len(ids)
+        for ids in (_cached(user_id, FOLLOWING), _cached(user_id, FOLLOWERS))
+    )
+
+
+# ===============================
+# Writes
+# ===============================
+
+def _write_through(user_id, direction, other_id, added):
+    namespace = _namespace(user_id, direction)
+    lock = f'{namespace}:lock'
+    if not cache.add(lock, True, GRAPH_LOCK_TIMEOUT):
+        bump_version(namespace)  # Another writer holds the array: drop it rather than race
+        return
+    try:
+        key = _key(user_id, direction)
+        data = cache.get(key)
+        if data is None:
+            bump_version(namespace)  # A load may be reading the database right now
+        elif isinstance(data, int):
+            cache.set(key, data + (1 if added else -1), GRAPH_CACHE_TIMEOUT)
+        else:
+            ids = array('q')
+            ids.frombytes(data)
+            i = bisect_left(ids, other_id)
+            present = i < len(ids) and ids[i] == other_id
+            if added and not present:
+                ids.insert(i, other_id)
+            elif not added and present:
+                del ids[i]
+            data = ids.tobytes() if len(ids) <= GRAPH_MAX_CACHED_IDS else len(ids)
+            cache.set(key, data, GRAPH_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock)
+
+
+def _record(follower, followed, added):
+    def write():
+        _write_through(follower.user_id, FOLLOWING, followed.user_id, added)
+        _write_through(followed.user_id, FOLLOWERS, follower.user_id, added)
+    transaction.on_commit(write)
+
+
+def follow(follower, followed):
+    """
+    Makes ``follower`` follow ``followed`` (UserProfile instances).
+    Returns False if it already did.
+    """
+    try:
+        with transaction.atomic():
+            Follow.objects.create(from_userprofile=follower, to_userprofile=followed)
+    except IntegrityError:
+        return False
+    _record(follower, followed, added=True)
+    return True
+
+
+def unfollow(follower, followed):
+    """
+    Removes the follow. Returns False if there was none.
+    """
+    deleted, _ = Follow.objects.filter(from_userprofile=follower, to_userprofile=followed).delete()
+    if not deleted:
+        return False
+    _record(follower, followed, added=False)
+    return True
+
+
+def invalidate_graph():
+    """
+    Drops every cached adjacency list, after follows were changed in bulk.
+    """
+    bump_version('graph')
@@ -0,0 +1,192 @@
+# profiles/images.py
+
+"""
+Resized derivatives of uploaded images (profile avatars and post images).
+
+Uploads are kept as-is; templates ask for a named spec ("avatar", "feed")
+and get URLs of pre-sized copies re-encoded to AVIF/WebP with a JPEG
+fallback and with EXIF metadata stripped. Derivatives are written next to
+the media files under ``derivatives/`` by a background job, queued on upload
+and again whenever a template finds them missing; until then the original
+is served. `manage.py build_image_derivatives` generates them in bulk.
+"""
+
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# Target widths per spec. Avatars are square crops; feed images keep their
+# aspect ratio and are never upscaled.
+IMAGE_SPECS = {
+    'avatar': {'widths': (40, 80, 160), 'crop': True, 'sizes': '40px'},
+    'feed': {'widths': (480, 800, 1200), 'crop': False, 'sizes': '(max-width: 768px) 100vw, 720px'},
+}
+# Most compact first; JPEG is the fallback every browser understands
+IMAGE_FORMATS = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', ('avif', 'webp', 'jpeg'))
+IMAGE_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+DERIVATIVES_DIR = 'derivatives'
+# How long the URL set of a derivative is remembered before storage is checked again
+DERIVATIVE_CACHE_TIMEOUT = 60 * 60 * 24
+# How long a queued build stops further requests from queueing it again (seconds)
+DERIVATIVE_QUEUE_TIMEOUT = 60 * 5
+
+
+def available_formats():
+    """
+    The configured formats this Pillow build can encode (AVIF needs libavif).
+    """
+    return [fmt for fmt in IMAGE_FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+
+def derivative_name(source_name, spec, width, fmt):
+    """
+    Storage path of one derivative, e.g. derivatives/feed/800/post_images/cat.webp
+    """
+    stem = os.path.splitext(source_name)[0]
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{DERIVATIVES_DIR}/{spec}/{width}/{stem}.{extension}'
+
+
+def _load(source_name):
+    with default_storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def _resize(image, width, crop):
+    if crop:
+        return ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS)
+    if image.width <= width:
+        return image.copy()
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no alpha channel: flatten onto white
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'PA', 'P') else 'RGB')
+
+    buffer = BytesIO()
+    # No exif= argument, so no metadata is written to the derivative
+    image.save(buffer, format=fmt.upper(), quality=IMAGE_QUALITY[fmt], optimize=fmt == 'jpeg')
+    return buffer.getvalue()
+
+
+def _target_widths(source_width, spec):
+    """
+    Widths worth generating for a source image: feed images skip widths larger
+    than the original, but always get at least the smallest one.
+    """
+    widths = IMAGE_SPECS[spec]['widths']
+    if IMAGE_SPECS[spec]['crop']:
+        return list(widths)
+    fitting = [width for width in widths if width <= source_width]
+    return fitting or [widths[0]]
+
+
+def build_derivatives(source_name, spec, force=False):
+    """
+    Generates the missing derivatives of one image for a spec.
+    Returns {format: [(width, storage name), ...]}.
+    """
+    formats = available_formats()
+    result = {fmt: [] for fmt in formats}
+
+    # Decoded once and shared by every width and format
+    image = _load(source_name)
+    for width in _target_widths(image.width, spec):
+        resized = None
+        for fmt in formats:
+            name = derivative_name(source_name, spec, width, fmt)
+            if force or not default_storage.exists(name):
+                if resized is None:
+                    resized = _resize(image, width, IMAGE_SPECS[spec]['crop'])
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                default_storage.save(name, ContentFile(_encode(resized, fmt)))
+            result[fmt].append((width, name))
+    return result
+
+
+def _cache_key(source_name, spec):
+    return f'image-derivatives:{spec}:{source_name}'
+
+
+def existing_derivatives(source_name, spec):
+    """
+    Returns {format: [(width, storage name), ...]} for the derivatives already in storage.
+    """
+    result = {}
+    for fmt in available_formats():
+        names = [
+            (width, derivative_name(source_name, spec, width, fmt))
+            for width in IMAGE_SPECS[spec]['widths']
+        ]
+        present = [(width, name) for width, name in names if default_storage.exists(name)]
+        if present:
+            result[fmt] = present
+    return result
+
+
+def forget_derivatives(source_name, spec):
+    """
+    Drops the cached URL set of an image so the next request re-reads storage.
+    """
+    cache.delete(_cache_key(source_name, spec))
+
+
+def mark_undecodable(source_name, spec):
+    """
+    Remembers that an image can't be resized, so requests stop queueing builds for it.
+    """
+    cache.set(_cache_key(source_name, spec), {}, DERIVATIVE_CACHE_TIMEOUT)
+
+
+def get_derivatives(image_field, spec):
+    """
+    Returns {format: [(width, url), ...]} for an ImageField value, or None
+    while the derivatives don't exist yet (a build job is queued and callers
+    fall back to the original upload).
+    """
+    if not image_field or not image_field.name:
+        return None
+
+    key = _cache_key(image_field.name, spec)
+    urls = cache.get(key)
+    if urls is not None:
+        # An empty dict marks a source that can't be decoded
+        return urls or None
+
+    derivatives = existing_derivatives(image_field.name, spec)
+    if 'jpeg' not in derivatives:
+        # Once per file until the worker gets to it, not once per card (the default avatar is on most)
+        if cache.add(f'{key}:queued', True, DERIVATIVE_QUEUE_TIMEOUT):
+            # Imported here: tasks.py imports this module
+            from .tasks import queue_derivatives
+            queue_derivatives(image_field.name, spec)
+        return None
+
+    urls = {
+        fmt: [(width, default_storage.url(name)) for width, name in names]
+        for fmt, names in derivatives.items()
+    }
+    cache.set(key, urls, DERIVATIVE_CACHE_TIMEOUT)
+    return urls
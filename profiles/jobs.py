@@ -0,0 +1,240 @@
+# profiles/jobs.py
+
+"""
+Lightweight database-backed job queue.
+
+Views enqueue slow post-write work (image derivatives, timeline fan-out,
+search indexing, counter reconciliation) as Job rows instead of running it
+inside the request; `manage.py run_jobs` executes them in worker processes.
+
+* Tasks are plain functions registered with @task('app.name') in each app's
+  tasks.py and called with the job's JSON payload as keyword arguments.
+* Workers claim a job with a conditional UPDATE (pending -> running), so any
+  number of processes can poll the same table without running a job twice.
+* Failures are retried with exponential backoff up to ``max_attempts``.
+* While a worker runs, a heartbeat thread keeps ``locked_at`` of its jobs
+  fresh; a job whose lock goes stale belongs to a dead worker and is requeued.
+* An idempotency key makes repeated enqueues of the same work a no-op.
+* With JOBS_RUN_INLINE (the default when DEBUG is on) jobs run right after
+  the surrounding transaction commits, so no worker is needed locally.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS_RUN_INLINE = getattr(settings, 'JOBS_RUN_INLINE', False)
+# Retry delay is JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1), capped at JOB_RETRY_MAX_DELAY
+JOB_RETRY_BASE_DELAY = getattr(settings, 'JOB_RETRY_BASE_DELAY', 10)
+JOB_RETRY_MAX_DELAY = getattr(settings, 'JOB_RETRY_MAX_DELAY', 60 * 60)
+# A running job whose worker has been silent this long is assumed dead and requeued
+JOB_LOCK_TIMEOUT = getattr(settings, 'JOB_LOCK_TIMEOUT', timedelta(minutes=10))
+# How often a live worker refreshes locked_at on the jobs it holds
+JOB_HEARTBEAT_INTERVAL = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', JOB_LOCK_TIMEOUT / 4)
+# Finished jobs (and their idempotency keys) are kept this long
+JOB_RETENTION = getattr(settings, 'JOB_RETENTION', timedelta(days=7))
+
+TASKS = {}
+
+
+def task(name, max_attempts=5):
+    """
+    Registers a function as a background task under ``name``.
+    """
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task_name, payload=None, key=None, delay=None):
+    """
+    Queues a registered task. ``payload`` must be JSON-serializable.
+    When ``key`` is given and a job with that key already exists, nothing new
+    is queued. Returns the Job (None when run inline).
+    """
+    payload = payload or {}
+    func = TASKS[task_name]
+
+    if JOBS_RUN_INLINE:
+        transaction.on_commit(lambda: _run_inline(func, payload))
+        return None
+
+    fields = {
+        'name': task_name,
+        'payload': payload,
+        'max_attempts': func.max_attempts,
+        'run_after': timezone.now() + (delay or timedelta()),
+    }
+    if key is None:
+        return Job.objects.create(**fields)
+    job, _ = Job.objects.get_or_create(idempotency_key=key, defaults=fields)
+    return job
+
+
+def _run_inline(func, payload):
+    # Like a worker, a failing job must not break the request that queued it
+    try:
+        func(**payload)
+    except Exception:
+        logger.exception("Inline job %s failed", func.task_name)
+
+
+# ===============================
+# Worker side
+# ===============================
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with up to 20% jitter, so failed jobs don't retry in lockstep.
+    """
+    delay = min(JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1), JOB_RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(1.0, 1.2))
+
+
+def heartbeat(worker):
+    """
+    Marks the jobs ``worker`` holds as still alive, however long they run.
+    """
+    return Job.objects.filter(status=Job.RUNNING, locked_by=worker).update(locked_at=timezone.now())
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Calls heartbeat() every JOB_HEARTBEAT_INTERVAL until stopped, on its own
+    database connection, so a long job never looks like a dead worker's.
+    """
+
+    def __init__(self, worker):
+        super().__init__(name=f'job-heartbeat:{worker}', daemon=True)
+        self.worker = worker
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(JOB_HEARTBEAT_INTERVAL.total_seconds()):
+                try:
+                    heartbeat(self.worker)
+                except Exception:
+                    logger.exception("Job heartbeat for %s failed", self.worker)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def release_stale_jobs():
+    """
+    Puts jobs left running by a crashed worker (one whose heartbeat stopped)
+    back in the queue.
+    """
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=timezone.now() - JOB_LOCK_TIMEOUT,
+    ).update(status=Job.PENDING, locked_by='', locked_at=None)
+
+
+def purge_finished_jobs():
+    """
+    Deletes completed jobs older than JOB_RETENTION. Failed jobs are kept for inspection.
+    """
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished_at__lt=timezone.now() - JOB_RETENTION,
+    ).delete()
+    return deleted
+
+
+def claim_jobs(worker, limit=10):
+    """
+    Claims up to ``limit`` due jobs for ``worker``. Each claim is a conditional
+    UPDATE, so a job another worker took first is simply skipped.
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        .order_by('run_after', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidate_ids:
+        won = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'pk'))
+
+
+def run_job(job):
+    """
+    Executes one claimed job and records the outcome (done, retry or failed).
+    """
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task '{job.name}'")
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s (%s) failed on attempt %s", job.pk, job.name, job.attempts)
+        if job.attempts >= job.max_attempts or func is None:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, last_error=error, finished_at=timezone.now(), locked_by='', locked_at=None,
+            )
+            return False
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.PENDING, last_error=error, run_after=timezone.now() + retry_delay(job.attempts),
+            locked_by='', locked_at=None,
+        )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, finished_at=timezone.now(), locked_by='', locked_at=None,
+    )
+    return True
+
+
+def work(batch_size=10, poll_interval=1.0, once=False):
+    """
+    Worker loop: claims and runs due jobs, sleeping when the queue is empty.
+    With ``once``, returns as soon as no due job is left.
+    Returns the number of jobs processed.
+    """
+    worker = worker_name()
+    processed = 0
+    pulse = _Heartbeat(worker)
+    pulse.start()
+    try:
+        while True:
+            release_stale_jobs()
+            jobs = claim_jobs(worker, batch_size)
+            for job in jobs:
+                run_job(job)
+                processed += 1
+            if not jobs:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+    finally:
+        pulse.stop()
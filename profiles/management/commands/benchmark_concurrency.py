@@ -0,0 +1,203 @@
+import asyncio
+import importlib
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from profiles.management.commands.benchmark_views import percentile
+from profiles.models import Skill
+
+SCENARIOS = ('home', 'explore_posts', 'profile_detail', 'search_users')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the sync views behind a fixed pool of WSGI workers with the async views "
+        "(profiles/async_views.py) served by linkup.asgi on one event loop, under simulated "
+        "database latency added to every query. Run it against a database filled by generate_social_graph."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight at once.")
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help="Sync workers in WSGI mode (like gunicorn --workers with the default sync worker class).",
+        )
+        parser.add_argument('--db-latency', type=float, default=20, help="Milliseconds added to every query.")
+        parser.add_argument('--views', nargs='*', choices=SCENARIOS, default=list(SCENARIOS), help="Views to request.")
+        parser.add_argument('--viewers', type=int, default=10, help="Number of distinct logged-in users.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for picking users and queries.")
+
+    def handle(self, *args, **options):
+        logging.getLogger('profiles.profiling').setLevel(logging.WARNING)
+        rng = random.Random(options['seed'])
+
+        usernames = list(User.objects.filter(userprofile__isnull=False).values_list('username', flat=True)[:1000])
+        if len(usernames) < 2:
+            raise CommandError("Not enough users to benchmark; run generate_social_graph first.")
+        search_terms = list(Skill.objects.values_list('name', flat=True)[:50]) or usernames[:50]
+
+        # Logged-in sessions, shared by both modes
+        cookies = []
+        for username in rng.sample(usernames, min(len(usernames), options['viewers'])):
+            client = Client()
+            client.force_login(User.objects.get(username=username))
+            cookies.append(f"sessionid={client.cookies['sessionid'].value}")
+
+        requests = []
+        for _ in range(options['requests']):
+            name = rng.choice(options['views'])
+            if name == 'profile_detail':
+                path = reverse('profiles:profile_detail', args=[rng.choice(usernames)])
+            elif name == 'search_users':
+                path = f"{reverse('profiles:search_users')}?query={rng.choice(search_terms)}"
+            else:
+                path = reverse(f'profiles:{name}')
+            requests.append((path, rng.choice(cookies)))
+
+        # The profiler's per-request wrappers would interleave with the latency wrapper
+        with override_settings(QUERY_PROFILER_ENABLED=False), self.simulated_latency(options['db_latency'] / 1000):
+            with self.views_mode(async_views=False):
+                self.run_wsgi(requests[:options['viewers']], options['workers'])  # Warm caches
+                wsgi = self.run_wsgi(requests, options['workers'])
+            with self.views_mode(async_views=True):
+                asgi = asyncio.run(self.run_asgi(requests, options['concurrency']))
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['db_latency']:g} ms per query, "
+            f"{options['workers']} WSGI workers vs {options['concurrency']} concurrent ASGI requests"
+        )
+        self.stdout.write(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for mode, result in (('wsgi', wsgi), ('asgi', asgi)):
+            self.stdout.write(
+                f"{mode:<8}{result['throughput']:>10.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['errors']:>8}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"ASGI throughput: {asgi['throughput'] / wsgi['throughput']:.1f}x WSGI"))
+
+    # ===============================
+    # Setup
+    # ===============================
+
+    @contextmanager
+    def simulated_latency(self, seconds):
+        """
+        Adds ``seconds`` of blocking wait to every query on every connection,
+        including those opened later by other threads or requests.
+        """
+        def wrapper(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            if wrapper not in connection.execute_wrappers:
+                connection.execute_wrappers.append(wrapper)
+
+        connection_created.connect(install, weak=False)
+        for connection in connections.all():
+            install(connection)
+        try:
+            yield
+        finally:
+            connection_created.disconnect(install)
+            for connection in connections.all():
+                if wrapper in connection.execute_wrappers:
+                    connection.execute_wrappers.remove(wrapper)
+
+    @contextmanager
+    def views_mode(self, async_views):
+        """
+        Reloads the URLconf with ASYNC_VIEWS switched, so both modes run in one process.
+        """
+        def reload():
+            importlib.reload(importlib.import_module('profiles.urls'))
+            importlib.reload(importlib.import_module('linkup.urls'))
+            clear_url_caches()
+
+        try:
+            with override_settings(ASYNC_VIEWS=async_views):
+                reload()
+                yield
+        finally:
+            reload()
+
+    # ===============================
+    # Modes
+    # ===============================
+
+    def summarize(self, timings, errors, elapsed):
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50_ms': percentile(timings, 50) * 1000,
+            'p95_ms': percentile(timings, 95) * 1000,
+            'errors': errors,
+        }
+
+    def run_wsgi(self, requests, workers):
+        """
+        Each worker thread handles one request at a time, like a sync gunicorn worker.
+        """
+        def get(item):
+            path, cookie = item
+            start = time.perf_counter()
+            response = Client(HTTP_HOST='localhost', HTTP_COOKIE=cookie).get(path)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(get, requests))
+        elapsed = time.perf_counter() - start
+        return self.summarize([t for t, _ in results], sum(status >= 400 for _, status in results), elapsed)
+
+    async def run_asgi(self, requests, concurrency):
+        """
+        Drives linkup.asgi.application directly, with up to ``concurrency`` requests in flight.
+        """
+        from linkup.asgi import application
+
+        limit = asyncio.Semaphore(concurrency)
+
+        async def get(item):
+            path, cookie = item
+            path, _, query = path.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': query.encode(), 'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+                'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+            }
+            body_sent = False
+            status = None
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await asyncio.Event().wait()  # No disconnect; the handler cancels this when done
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+
+            async with limit:
+                start = time.perf_counter()
+                await application(scope, receive, send)
+                return time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(get(item) for item in requests))
+        elapsed = time.perf_counter() - start
+        return self.summarize([t for t, _ in results], sum(status >= 400 for _, status in results), elapsed)
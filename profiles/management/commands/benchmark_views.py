@@ -0,0 +1,185 @@
+import json
+import logging
+import math
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from posts.models import Post
+from profiles.models import Skill
+from profiles.profiling import QueryRecorder
+
+SCENARIOS = ('home', 'explore_posts', 'profile_detail', 'search_users', 'like_post', 'follow_user')
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the main views through the test client and reports p50/p95/p99 latency and "
+        "query counts per view, compared against a stored baseline. Run it against a database "
+        "filled by generate_social_graph: like/follow requests write to it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Requests per view.")
+        parser.add_argument('--views', nargs='*', choices=SCENARIOS, default=list(SCENARIOS), help="Views to benchmark.")
+        parser.add_argument('--viewers', type=int, default=20, help="Number of distinct logged-in users to rotate through.")
+        parser.add_argument('--cold', action='store_true', help="Clear the cache before every request.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for picking users, posts and queries.")
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file to compare against.")
+        parser.add_argument('--save-baseline', action='store_true', help="Write this run's results as the new baseline.")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help="Allowed relative p95 slowdown before a view counts as regressed.",
+        )
+        parser.add_argument('--fail-on-regression', action='store_true', help="Exit with an error if any view regressed.")
+
+    def handle(self, *args, **options):
+        try:
+            setup_test_environment()  # Lets the test client through ALLOWED_HOSTS
+        except RuntimeError:
+            pass  # Already set up: run from the test suite
+        # The per-request JSON lines of the profiler would drown the report
+        logging.getLogger('profiles.profiling').setLevel(logging.WARNING)
+        self.rng = random.Random(options['seed'])
+
+        user_ids = list(User.objects.filter(userprofile__isnull=False).values_list('pk', flat=True))
+        if len(user_ids) < 2:
+            raise CommandError("Not enough users to benchmark; run generate_social_graph first.")
+        sampled_ids = self.rng.sample(user_ids, min(len(user_ids), 500))
+        self.usernames = list(User.objects.filter(pk__in=sampled_ids).values_list('username', flat=True))
+        recent_post_ids = list(Post.objects.order_by('-pk').values_list('pk', flat=True)[:5000])
+        self.post_ids = self.rng.sample(recent_post_ids, min(len(recent_post_ids), 500))
+        self.search_terms = list(Skill.objects.values_list('name', flat=True)[:50]) or self.usernames[:50]
+
+        viewers = User.objects.filter(pk__in=self.rng.sample(user_ids, min(len(user_ids), options['viewers'])))
+        self.clients = []
+        for viewer in viewers:
+            client = Client()
+            client.force_login(viewer)
+            self.clients.append(client)
+
+        results = {}
+        for name in options['views']:
+            results[name] = self.run_scenario(name, options['iterations'], options['cold'])
+
+        baseline = self.load_baseline(options['baseline'])
+        regressions = self.report(results, baseline, options['tolerance'])
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']) or '.', exist_ok=True)
+            with open(options['baseline'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Saved baseline to {options['baseline']}.")
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regressed: {', '.join(regressions)}")
+
+    # ===============================
+    # Scenarios
+    # ===============================
+
+    def request_for(self, name):
+        """
+        Returns (method, url, data) for one request of a scenario.
+        """
+        if name == 'home':
+            return 'get', reverse('profiles:home'), None
+        if name == 'explore_posts':
+            return 'get', reverse('profiles:explore_posts'), None
+        if name == 'profile_detail':
+            return 'get', reverse('profiles:profile_detail', args=[self.rng.choice(self.usernames)]), None
+        if name == 'search_users':
+            return 'get', reverse('profiles:search_users'), {'query': self.rng.choice(self.search_terms)}
+        if name == 'like_post':
+            return 'post', reverse('posts:like_post', args=[self.rng.choice(self.post_ids)]), None
+        if name == 'follow_user':
+            return 'post', reverse('profiles:follow_user', args=[self.rng.choice(self.usernames)]), None
+        raise CommandError(f"Unknown scenario '{name}'")
+
+    def run_scenario(self, name, iterations, cold):
+        timings = []
+        query_counts = []
+        for _ in range(iterations):
+            method, url, data = self.request_for(name)
+            client = self.rng.choice(self.clients)
+            if cold:
+                cache.clear()
+
+            recorder = QueryRecorder()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            if response.status_code >= 400:
+                raise CommandError(f"{name}: {method.upper()} {url} returned {response.status_code}")
+            query_counts.append(len(recorder.queries))
+
+        return {
+            'requests': iterations,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries_avg': round(sum(query_counts) / len(query_counts), 1),
+            'queries_max': max(query_counts),
+        }
+
+    # ===============================
+    # Reporting
+    # ===============================
+
+    def load_baseline(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path) as handle:
+            return json.load(handle)
+
+    def report(self, results, baseline, tolerance):
+        """
+        Prints one row per view and returns the names of regressed views.
+        A view regresses when its p95 grows beyond the tolerance or it runs more queries.
+        """
+        regressions = []
+        self.stdout.write(f"{'view':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'max':>6}  vs baseline")
+        for name, result in results.items():
+            line = (
+                f"{name:<16}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+                f"{result['queries_avg']:>10}{result['queries_max']:>6}"
+            )
+            previous = baseline.get(name)
+            if previous is None:
+                self.stdout.write(f"{line}  (no baseline)")
+                continue
+
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0
+            slower = change > tolerance
+            more_queries = result['queries_max'] > previous['queries_max']
+            comparison = f"p95 {change:+.0%}, queries max {previous['queries_max']} -> {result['queries_max']}"
+            if slower or more_queries:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSED ({comparison})"))
+            else:
+                self.stdout.write(f"{line}  ok ({comparison})")
+        return regressions
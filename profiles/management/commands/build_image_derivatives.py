@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from profiles.images import IMAGE_SPECS, build_derivatives
+from profiles.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Generates resized AVIF/WebP/JPEG derivatives for avatars and post images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Re-encode derivatives that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        # Many profiles share the default avatar, so each file is processed once
+        sources = {
+            'avatar': set(UserProfile.objects.exclude(image='').values_list('image', flat=True)),
+            'feed': set(Post.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)),
+        }
+
+        count = failed = 0
+        for spec in IMAGE_SPECS:
+            for name in sorted(sources[spec]):
+                try:
+                    build_derivatives(name, spec, force=options['force'])
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    self.stderr.write(f"Skipped {name}: {exc}")
+                    continue
+                count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {count} image(s), {failed} skipped."))
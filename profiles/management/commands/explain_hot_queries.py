@@ -0,0 +1,127 @@
+import json
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import BooleanField, Count, Exists, OuterRef, Value
+from django.utils import timezone
+
+from posts.models import Post, Like, Comment
+from posts.timeline import timeline_entries
+from posts.trending import trending_scores
+from profiles.models import UserProfile, Endorsement, Suggestion, ProfileSkill, SearchTerm
+from profiles.search import PREFIX_UPPER_BOUND
+
+
+def sequential_scans(plan):
+    """
+    Returns the tables a query plan reads in full, for the current database vendor.
+    """
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    if vendor == 'mysql':
+        return [
+            table['table_name']
+            for table in _mysql_tables(json.loads(plan))
+            if table.get('access_type') == 'ALL'
+        ]
+    # SQLite: "SCAN <table>" without "USING ... INDEX" is a full table scan
+    return [
+        match.group(1)
+        for line in plan.splitlines()
+        if 'USING' not in line
+        for match in [re.search(r'\bSCAN (?:TABLE )?(\S+)', line)] if match
+    ]
+
+
+def _mysql_tables(node):
+    if isinstance(node, dict):
+        if 'table' in node:
+            yield node['table']
+        for value in node.values():
+            yield from _mysql_tables(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _mysql_tables(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAINs the queries behind the hot views (feed, profile, likes, follows, search) and "
+        "flags full table scans. Run it against realistically sized data (see generate_social_graph): "
+        "planners legitimately prefer scans on tiny tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="User whose feed/profile queries are explained (default: most followed).")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not only flagged ones.")
+        parser.add_argument('--fail-on-scan', action='store_true', help="Exit with an error if any query scans a table.")
+
+    def handle(self, *args, **options):
+        user = self.pick_user(options['username'])
+        profile = user.userprofile
+        post = Post.objects.filter(user=user).first() or Post.objects.first()
+        if post is None:
+            raise CommandError("No posts to explain against; run generate_social_graph first.")
+
+        liked = Like.objects.filter(user=user, post=OuterRef('pk'))
+        feed = Post.objects.annotate(is_liked=Exists(liked)).select_related('user__userprofile')
+        recently = timezone.now() - timedelta(minutes=5)
+        timeline_ids = list(timeline_entries(user).values_list('post_id', flat=True)[:50]) or [post.pk]
+
+        queries = {
+            'home: timeline page': timeline_entries(user)[:51],
+            'home: hydrate posts': feed.filter(pk__in=timeline_ids),
+            'explore: trending page': trending_scores()[:21],
+            'trending: recent likes': Like.objects.filter(created_at__gte=recently).values_list('post_id'),
+            'trending: recent comments': Comment.objects.filter(created_at__gte=recently).values_list('post_id'),
+            'anonymous home: newest posts': Post.objects.annotate(
+                is_liked=Value(False, output_field=BooleanField()),
+            ).order_by('-created_at')[:26],
+            'profile: user posts': feed.filter(user=user).order_by('-created_at')[:11],
+            'like: viewer liked post': Like.objects.filter(user=user, post=post),
+            'like: post likes': Like.objects.filter(post=post),
+            'stats: likes received': Like.objects.filter(post__user=user).values('post__user').annotate(n=Count('pk')),
+            'comments: post thread': Comment.objects.filter(post=post).order_by('created_at')[:20],
+            'follow: followers of user': UserProfile.objects.filter(following=profile),
+            'follow: user is following': UserProfile.objects.filter(followers=profile),
+            'follow: is following check': profile.followers.filter(user=user),
+            'endorsements: recent': Endorsement.objects.filter(profile=profile).order_by('-created_at')[:5],
+            'suggestions: sidebar': Suggestion.objects.filter(owner=profile).order_by('-score')[:5],
+            'skills: profiles with skill': ProfileSkill.objects.filter(skill__normalized='python'),
+            'search: prefix terms': SearchTerm.objects.filter(term__gte='py', term__lt='py' + PREFIX_UPPER_BOUND),
+        }
+
+        flagged = []
+        for name, queryset in queries.items():
+            plan = queryset.explain(format='JSON') if connection.vendor == 'mysql' else queryset.explain()
+            scans = sequential_scans(plan)
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f"SCAN  {name}: {', '.join(sorted(set(scans)))}"))
+            else:
+                self.stdout.write(f"ok    {name}")
+            if scans or options['verbose_plans']:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+
+        summary = f"{len(flagged)} of {len(queries)} queries scan a table."
+        if flagged and options['fail_on_scan']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not flagged else summary)
+
+    def pick_user(self, username):
+        if username:
+            try:
+                return User.objects.select_related('userprofile').get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{username}'.")
+        profile = (
+            UserProfile.objects.annotate(follower_total=Count('followers'))
+            .order_by('-follower_total').select_related('user').first()
+        )
+        if profile is None:
+            raise CommandError("No profiles to explain against; run generate_social_graph first.")
+        return profile.user
@@ -0,0 +1,56 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.datasets import DATASETS, FORMATS, EXPORT_CHUNK_SIZE, stream_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports users, profiles, skills, the follow graph, posts, likes, comments and endorsements "
+        "as NDJSON or CSV, one file per dataset, streaming rows so memory use stays flat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*', metavar='dataset',
+            help=f"Datasets to export (default: all). One of: {', '.join(DATASETS)}.",
+        )
+        parser.add_argument(
+            '--output', required=True,
+            help="Directory to write <dataset>.<format> files into, or '-' to write one dataset to stdout.",
+        )
+        parser.add_argument('--format', choices=FORMATS, default='ndjson', help="Output format.")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows read per query.")
+        parser.add_argument('--database', default='default', help="Database alias to read from (e.g. a replica).")
+
+    def handle(self, *args, **options):
+        names = options['datasets'] or list(DATASETS)
+        unknown = set(names) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown dataset(s): {', '.join(sorted(unknown))}.")
+        fmt = options['format']
+
+        def lines(name):
+            return stream_dataset(name, fmt, options['chunk_size'], options['database'])
+
+        if options['output'] == '-':
+            if len(names) != 1:
+                raise CommandError("Writing to stdout needs exactly one dataset.")
+            sys.stdout.writelines(lines(names[0]))
+            return
+
+        os.makedirs(options['output'], exist_ok=True)
+        for name in names:
+            path = os.path.join(options['output'], f'{name}.{fmt}')
+            count = 0
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                for line in lines(name):
+                    f.write(line)
+                    count += 1
+            if fmt == 'csv':
+                count -= 1  # Header row
+            self.stdout.write(f"{name}: {count} row(s) -> {path}")
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(names)} dataset(s) to {options['output']}."))
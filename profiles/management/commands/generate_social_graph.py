@@ -0,0 +1,184 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.counters import reconcile_counters
+from posts.models import Post, Like, Comment
+from posts.timeline import rebuild_timeline
+from posts.trending import update_trending
+from profiles.graph import invalidate_graph
+from profiles.models import UserProfile, Endorsement
+from profiles.search import rebuild_index
+from profiles.skills import get_or_create_skills, sync_profile_skills
+from profiles.stats import recompute_stats
+
+SKILLS = [
+    'Python', 'Django', 'JavaScript', 'TypeScript', 'React', 'Vue', 'Go', 'Rust', 'Java', 'Kotlin',
+    'SQL', 'PostgreSQL', 'MySQL', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'GCP', 'Azure', 'Linux',
+    'Machine Learning', 'Data Analysis', 'Pandas', 'NumPy', 'TensorFlow', 'PyTorch', 'Figma', 'UX Design',
+    'Product Management', 'Agile', 'Scrum', 'Marketing', 'SEO', 'Copywriting', 'Sales', 'Leadership',
+    'Public Speaking', 'Accounting', 'Excel', 'Project Management',
+]
+JOB_TITLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Scientist', 'Product Manager',
+    'Designer', 'DevOps Engineer', 'Marketing Lead', 'Sales Manager', 'Student', 'CTO', 'Analyst',
+]
+LOCATIONS = ['Nairobi', 'Mombasa', 'Kisumu', 'Lagos', 'Accra', 'Kampala', 'Kigali', 'Cape Town', 'London', 'Berlin', 'Remote']
+WORDS = (
+    'just shipped a new feature today learning about databases and caching looking for collaborators '
+    'great meetup last night hiring engineers our team is growing excited to share my latest project '
+    'thoughts on remote work performance matters write tests first coffee and code open source release'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generates a synthetic social graph (users, profiles, power-law follows, posts, "
+        "likes, comments, endorsements) for benchmarking, then rebuilds the derived tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Number of users to create.")
+        parser.add_argument('--posts', type=float, default=10, help="Average posts per user.")
+        parser.add_argument('--follows', type=float, default=30, help="Average accounts followed per user.")
+        parser.add_argument('--likes', type=float, default=5, help="Average likes per post.")
+        parser.add_argument('--comments', type=float, default=1.5, help="Average comments per post.")
+        parser.add_argument('--endorsements', type=float, default=3, help="Average endorsements received per user.")
+        parser.add_argument('--prefix', default='bench', help="Username prefix for generated users.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed (same seed, same graph).")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per bulk INSERT.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = self.prefix = options['prefix']
+
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f"Users prefixed '{prefix}_' already exist; pass a different --prefix.")
+
+        # 1. Users and profiles (bulk_create skips the post_save signal, so profiles are created here)
+        profiles = self.create_users(prefix, options['users'])
+        self.stdout.write(f"Created {len(profiles)} users.")
+
+        # 2. Popularity follows a power law: a few accounts attract most follows, likes and comments
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(len(profiles))]
+        self.rng.shuffle(weights)
+        popularity = dict(zip((profile.pk for profile in profiles), weights))
+
+        follows = self.create_follows(profiles, weights, options['follows'])
+        self.stdout.write(f"Created {follows} follows.")
+
+        posts = self.create_posts(profiles, popularity, options['posts'])
+        self.stdout.write(f"Created {len(posts)} posts.")
+
+        likes, comments = self.create_engagement(profiles, posts, popularity, options['likes'], options['comments'])
+        self.stdout.write(f"Created {likes} likes and {comments} comments.")
+
+        endorsements = self.create_endorsements(profiles, weights, options['endorsements'])
+        self.stdout.write(f"Created {endorsements} endorsements.")
+
+        # 3. Derived tables normally maintained by the write paths
+        self.rebuild_derived(profiles)
+        self.stdout.write(self.style.SUCCESS("Rebuilt skills, search index, counters, trending scores, stats and timelines."))
+
+    def bulk(self, model, rows):
+        model.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+        return len(rows)
+
+    def create_users(self, prefix, count):
+        password = make_password('benchmark')  # Hashed once; hashing per user dominates otherwise
+        self.bulk(User, [
+            User(username=f'{prefix}_{i}', email=f'{prefix}_{i}@example.com', password=password)
+            for i in range(count)
+        ])
+        # Re-read for primary keys (not every backend returns them from bulk_create)
+        users = list(User.objects.filter(username__startswith=f'{prefix}_').order_by('pk'))
+
+        self.bulk(UserProfile, [
+            UserProfile(
+                user=user,
+                job_title=self.rng.choice(JOB_TITLES),
+                location=self.rng.choice(LOCATIONS),
+                skills=', '.join(self.rng.sample(SKILLS, self.rng.randint(2, 6))),
+                bio=' '.join(self.rng.choices(WORDS, k=12)),
+            )
+            for user in users
+        ])
+        return list(UserProfile.objects.filter(user__username__startswith=f'{prefix}_').select_related('user').order_by('pk'))
+
+    def create_follows(self, profiles, weights, average):
+        through = UserProfile.following.through
+        pairs = set()
+        for profile in profiles:
+            # Out-degree is heavy-tailed too (a few users follow many accounts)
+            degree = min(int(self.rng.paretovariate(1.5) * average / 3), len(profiles) - 1)
+            for target in self.rng.choices(profiles, weights=weights, k=degree):
+                if target.pk != profile.pk:
+                    pairs.add((profile.pk, target.pk))
+        return self.bulk(through, [
+            through(from_userprofile_id=source, to_userprofile_id=target) for source, target in pairs
+        ])
+
+    def create_posts(self, profiles, popularity, average):
+        now = timezone.now()
+        top = max(popularity.values())
+        rows = []
+        for profile in profiles:
+            # Popular accounts also post more
+            count = self.rng.randint(0, max(1, int(2 * average * (0.5 + popularity[profile.pk] / top))))
+            for _ in range(count):
+                rows.append(Post(
+                    user_id=profile.user_id,
+                    content=' '.join(self.rng.choices(WORDS, k=self.rng.randint(5, 40))),
+                    created_at=now - timedelta(seconds=self.rng.randint(0, 90 * 24 * 3600)),
+                ))
+        self.bulk(Post, rows)
+        return list(Post.objects.filter(user__username__startswith=f'{self.prefix}_').values_list('pk', 'user_id'))
+
+    def create_engagement(self, profiles, posts, popularity, average_likes, average_comments):
+        user_ids = [profile.user_id for profile in profiles]
+        popularity_by_user = {profile.user_id: popularity[profile.pk] for profile in profiles}
+        mean_popularity = sum(popularity.values()) / len(popularity)
+        now = timezone.now()
+
+        likes = []
+        comments = []
+        for post_id, author_id in posts:
+            boost = popularity_by_user[author_id] / mean_popularity
+            like_count = min(int(self.rng.expovariate(1 / (average_likes * boost))), len(user_ids))
+            for user_id in self.rng.sample(user_ids, like_count):
+                likes.append(Like(post_id=post_id, user_id=user_id, created_at=now))
+            for _ in range(int(self.rng.expovariate(1 / (average_comments * boost)))):
+                comments.append(Comment(
+                    post_id=post_id,
+                    author_id=self.rng.choice(user_ids),
+                    content=' '.join(self.rng.choices(WORDS, k=self.rng.randint(3, 20))),
+                    created_at=now - timedelta(seconds=self.rng.randint(0, 30 * 24 * 3600)),
+                ))
+        return self.bulk(Like, likes), self.bulk(Comment, comments)
+
+    def create_endorsements(self, profiles, weights, average):
+        skills = {skill.name: skill for skill in get_or_create_skills(SKILLS)}
+        rows = {}
+        for endorser in profiles:
+            for profile in self.rng.choices(profiles, weights=weights, k=int(average)):
+                if profile.pk == endorser.pk:
+                    continue
+                skill = skills[self.rng.choice(profile.skills.split(', '))]
+                rows[(profile.pk, endorser.pk, skill.pk)] = Endorsement(profile=profile, endorser=endorser, skill=skill)
+        return self.bulk(Endorsement, list(rows.values()))
+
+    def rebuild_derived(self, profiles):
+        invalidate_graph()  # The follows were bulk-inserted past graph.follow()
+        for profile in profiles:
+            sync_profile_skills(profile)
+        rebuild_index()
+        reconcile_counters(self.batch_size)
+        update_trending(full=True, batch_size=self.batch_size)
+        for profile in profiles:
+            recompute_stats(profile.user_id)
+            rebuild_timeline(profile.user)
@@ -0,0 +1,71 @@
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.caching import bump_version
+from profiles.datasets import DATASETS, FORMATS, IMPORT_BATCH_SIZE, read_rows, import_rows, reset_sequences
+from profiles.graph import invalidate_graph
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports files written by export_data (e.g. to seed staging from a production dump) "
+        "with batched bulk_create. Rows whose ID already exists are skipped unless --on-conflict=update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help="Export directories or <dataset>.<format> files. Datasets are imported in dependency order.",
+        )
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Rows per INSERT.")
+        parser.add_argument(
+            '--on-conflict', choices=('skip', 'update'), default='skip',
+            help="What to do with rows whose ID already exists.",
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Rebuild the derived tables (counters, stats, search, timelines, trending, suggestions) afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        files = {}
+        for path in options['paths']:
+            if os.path.isdir(path):
+                candidates = [os.path.join(path, f'{name}.{fmt}') for name in DATASETS for fmt in FORMATS]
+                candidates = [candidate for candidate in candidates if os.path.exists(candidate)]
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                name, _, fmt = os.path.basename(candidate).partition('.')
+                if name not in DATASETS or fmt not in FORMATS:
+                    raise CommandError(f"Can't tell the dataset and format of {candidate}; expected <dataset>.<format>.")
+                files[name] = (candidate, fmt)
+        if not files:
+            raise CommandError("No dataset files found.")
+
+        names = [name for name in DATASETS if name in files]  # Referenced tables first
+        for name in names:
+            path, fmt = files[name]
+            with open(path, newline='', encoding='utf-8') as f:
+                count = import_rows(
+                    name, read_rows(f, fmt), batch_size=options['batch_size'], on_conflict=options['on_conflict'],
+                )
+            self.stdout.write(f"{name}: {count} row(s) from {path}")
+        reset_sequences(names)
+        bump_version('feed')
+        invalidate_graph()
+
+        if options['rebuild']:
+            for command, command_args in (
+                ('reconcile_counters', []),
+                ('recompute_profile_stats', []),
+                ('rebuild_search_index', []),
+                ('rebuild_timelines', []),
+                ('update_trending', ['--full']),
+                ('refresh_suggestions', []),
+            ):
+                call_command(command, *command_args, stdout=self.stdout, stderr=self.stderr)
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(names)} dataset(s)."))
@@ -0,0 +1,25 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from profiles.accounts import PROFILE_FIELDS, PROVISION_BATCH_SIZE, provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates accounts and profiles in bulk from a CSV file (columns: username, email, and optionally "
+        f"first_name, last_name, password, {', '.join(PROFILE_FIELDS)}). Existing usernames/emails are skipped. "
+        "Accounts without a password get an unusable one and set theirs through password reset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row.")
+        parser.add_argument('--batch-size', type=int, default=PROVISION_BATCH_SIZE, help="Accounts per transaction.")
+
+    def handle(self, *args, **options):
+        with open(options['path'], newline='', encoding='utf-8') as f:
+            created, skipped = provision_users(csv.DictReader(f), batch_size=options['batch_size'])
+
+        for username, reason in skipped:
+            self.stderr.write(f"Skipped {username or '(blank)'}: {reason}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} account(s), skipped {len(skipped)}."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from profiles.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the user search index (search documents and inverted index terms)."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} profile(s)."))
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from profiles.stats import recompute_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes the cached profile header aggregates (ProfileStats) from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help="Only recompute these users (default: everyone).",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(userprofile__isnull=False).order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        count = 0
+        for user_id in users.values_list('pk', flat=True).iterator(chunk_size=500):
+            recompute_stats(user_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed stats for {count} profile(s)."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from profiles.models import UserProfile
+from profiles.suggestions import is_stale, refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = "Precomputes the \"People You May Know\" suggestions for every profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-only', action='store_true',
+            help="Skip profiles whose suggestions are still within PYMK_TTL.",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = 0
+        stored = 0
+        for profile in UserProfile.objects.order_by('pk').iterator(chunk_size=500):
+            if options['stale_only'] and not is_stale(profile):
+                continue
+            stored += refresh_suggestions(profile)
+            refreshed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed suggestions for {refreshed} profile(s) ({stored} stored)."
+        ))
@@ -0,0 +1,61 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from profiles.jobs import purge_finished_jobs, work
+
+
+def _worker(batch_size, poll_interval, once):
+    # Each process opens its own database connections
+    connections.close_all()
+    work(batch_size=batch_size, poll_interval=poll_interval, once=once)
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (see profiles/jobs.py) in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help="Number of worker processes polling the queue.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10,
+            help="Jobs claimed per poll by each worker.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help="Seconds a worker sleeps when the queue is empty.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit once no due job is left instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_finished_jobs()
+        if purged:
+            self.stdout.write(f"Purged {purged} finished job(s).")
+
+        args = (options['batch_size'], options['poll_interval'], options['once'])
+        if options['processes'] <= 1:
+            processed = work(*args)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)."))
+            return
+
+        # Children must not share the parent's open connections
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_worker, args=args, daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            for process in workers:
+                process.terminate()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,39 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from profiles.routing import REPLICA_DATABASES
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the SQLite primary database into every configured SQLite replica "
+        "(DATABASE_REPLICA_URLS), to simulate replication when testing read-replica routing locally."
+    )
+
+    def handle(self, *args, **options):
+        if not REPLICA_DATABASES:
+            raise CommandError("No replicas configured; set DATABASE_REPLICA_URLS.")
+
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("Only SQLite primaries can be copied; real replicas replicate on their own.")
+
+        for alias in REPLICA_DATABASES:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f"Replica '{alias}' is not SQLite.")
+            replica.close()  # Don't copy over a file this process has open
+
+            # The backup API takes a consistent snapshot even while the primary is in use
+            source = sqlite3.connect(primary.settings_dict['NAME'])
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f"Copied primary into {alias} ({replica.settings_dict['NAME']}).")
+
+        self.stdout.write(self.style.SUCCESS(f"Synced {len(REPLICA_DATABASES)} replica(s)."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles every template and builds the URL resolver, as worker startup does when "
+        "TEMPLATE_WARMUP is on. Fails if any template doesn't compile, so it can run as a deploy check."
+    )
+
+    def handle(self, *args, **options):
+        compiled, failed = warm_up()
+        if failed:
+            raise CommandError(f"{failed} template(s) failed to compile; see the log for details.")
+        self.stdout.write(self.style.SUCCESS(f"Compiled {compiled} template(s)."))
@@ -0,0 +1,215 @@
+# profiles/media.py
+
+"""
+Uploaded media: content-hashed file names and the view that serves them.
+
+ContentHashedImageField (UserProfile.image, Post.image) stores each upload
+as <upload_to>/<hash>.<ext>, named after a SHA-256 of its bytes. A name
+therefore never changes content, so browsers and CDNs may cache it for a
+year without revalidating, and uploading the same file again reuses the
+stored copy. Derivatives (see images.py) and files uploaded before hashed
+names get MEDIA_CACHE_MAX_AGE and are revalidated by ETag.
+
+serve_media() answers conditional requests (ETag / Last-Modified) and
+single byte ranges itself. Depending on MEDIA_SERVE_MODE it then hands the
+body to the front proxy (X-Accel-Redirect for nginx, X-Sendfile for Apache
+and lighttpd), or streams it with FileResponse when no proxy is present.
+Media is not compressed: the image formats we accept already are.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.db.models.fields.files import ImageField, ImageFieldFile
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .images import DERIVATIVES_DIR
+
+# Hex digits of the SHA-256 kept in the file name (64 bits)
+HASH_LENGTH = 16
+HASH_CHUNK_SIZE = 64 * 1024
+# A year, the longest lifetime caches honour
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24)
+# '' (stream from Django), 'x-accel-redirect' or 'x-sendfile'
+MEDIA_SERVE_MODE = getattr(settings, 'MEDIA_SERVE_MODE', '')
+# nginx `internal` location aliased to MEDIA_ROOT, for X-Accel-Redirect
+MEDIA_ACCEL_PREFIX = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_HASHED_NAME_RE = re.compile(rf'(^|/)[0-9a-f]{{{HASH_LENGTH}}}\.[a-z0-9]+$')
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# ===============================
+# Content-hashed uploads
+# ===============================
+
+def content_hash(content):
+    """
+    Short SHA-256 hex digest of a File's bytes.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):  # chunks() starts from the beginning
+        digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def is_content_hashed(name):
+    """
+    True for upload names made by ContentHashedImageField (their content never changes).
+    Derivatives keep their source's name but may be re-encoded (build_image_derivatives --force).
+    """
+    return bool(_HASHED_NAME_RE.search(name)) and not name.startswith(DERIVATIVES_DIR + '/')
+
+
+class ContentHashedImageFieldFile(ImageFieldFile):
+
+    def save(self, name, content, save=True):
+        name = content_hash(content) + os.path.splitext(name)[1].lower()
+        stored_name = self.field.generate_filename(self.instance, name)
+        if not self.storage.exists(stored_name):
+            return super().save(name, content, save)
+        # Same bytes as an earlier upload: point at that file instead of writing a copy
+        self.name = stored_name
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+
+class ContentHashedImageField(ImageField):
+    """
+    ImageField that names each upload after its content (see the module docstring).
+    """
+    attr_class = ContentHashedImageFieldFile
+
+
+# ===============================
+# Serving
+# ===============================
+
+def _cache_control(name):
+    if is_content_hashed(name):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={MEDIA_CACHE_MAX_AGE}'
+
+
+def _byte_range(header, size):
+    """
+    Parses a single-range Range header into (start, end) inclusive.
+    Returns None to serve the whole file, or False when unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # Malformed or several ranges: the full file is a valid answer
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _body_response(request, name, path, size, byte_range):
+    if MEDIA_SERVE_MODE == 'x-accel-redirect':
+        # nginx sends the file, applying the Range itself
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + name
+        return response
+    if MEDIA_SERVE_MODE == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse()
+        response['Content-Length'] = size
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_stream_range(path, start, end), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        # Uses the server's wsgi.file_wrapper (sendfile) where available
+        response = FileResponse(open(path, 'rb'))
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves one file under MEDIA_ROOT with cache headers, conditional GET and Range support.
+    """
+    # A path escaping MEDIA_ROOT raises SuspiciousFileOperation (a 400 response)
+    full_path = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(full_path):
+        raise Http404("Media file not found.")
+    name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+    stat = os.stat(full_path)
+    etag = quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    headers = {
+        'Cache-Control': _cache_control(name),
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+    }
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # If-Range: only honour the range if the client's copy is still current
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _byte_range(range_header, stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    response = _body_response(request, name, full_path, stat.st_size, byte_range)
+    content_type, _ = mimetypes.guess_type(name)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def media_url_prefix():
+    """
+    MEDIA_URL as a URL pattern prefix ('media/'), or None when media lives on another host (a CDN).
+    """
+    if '://' in settings.MEDIA_URL or settings.MEDIA_URL.startswith('//'):
+        return None
+    return settings.MEDIA_URL.lstrip('/')
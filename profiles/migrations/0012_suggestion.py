@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0011_alter_comment_author_alter_like_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Suggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mutual_count', models.PositiveIntegerField(default=0)),
+                ('shared_skills', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='profiles.userprofile')),
+                ('suggested', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggested_to', to='profiles.userprofile')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['owner', '-score'], name='suggestion_owner_score_idx')],
+                'unique_together': {('owner', 'suggested')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0012_suggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='profiles.userprofile')),
+                ('username', models.CharField(blank=True, max_length=150)),
+                ('job_title', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('skills', models.TextField(blank=True)),
+                ('bio', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('field', models.CharField(max_length=20)),
+                ('weight', models.FloatField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='profiles.userprofile')),
+            ],
+            options={
+                'unique_together': {('term', 'profile', 'field')},
+            },
+        ),
+    ]
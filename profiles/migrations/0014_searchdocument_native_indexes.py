@@ -0,0 +1,96 @@
+import re
+from itertools import islice
+
+from django.db import migrations
+
+# Kept in sync with profiles/search.py (PG_VECTOR_SQL / MYSQL_ALL_COLUMNS)
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(username, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(job_title, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'D')"
+)
+
+
+def create_native_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE INDEX profiles_searchdocument_fts ON profiles_searchdocument USING GIN (({PG_VECTOR_SQL}))"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            "ALTER TABLE profiles_searchdocument "
+            "ADD FULLTEXT INDEX profiles_searchdocument_ft (username, job_title, skills, location, bio)"
+        )
+        schema_editor.execute(
+            "ALTER TABLE profiles_searchdocument ADD FULLTEXT INDEX profiles_searchdocument_username_ft (username)"
+        )
+
+
+def drop_native_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS profiles_searchdocument_fts")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE profiles_searchdocument DROP INDEX profiles_searchdocument_ft")
+        schema_editor.execute("ALTER TABLE profiles_searchdocument DROP INDEX profiles_searchdocument_username_ft")
+
+
+# Kept in sync with profiles/search.py (FIELD_WEIGHTS / tokenize)
+FIELD_WEIGHTS = {
+    'username': 4.0,
+    'job_title': 3.0,
+    'skills': 3.0,
+    'location': 2.0,
+    'bio': 1.0,
+}
+MAX_TERM_LENGTH = 64
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+BATCH_SIZE = 500
+
+
+def tokenize(text):
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or '').lower())]
+
+
+def build_search_documents(apps, schema_editor):
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    SearchDocument = apps.get_model('profiles', 'SearchDocument')
+    SearchTerm = apps.get_model('profiles', 'SearchTerm')
+    # Without a native full-text engine, search reads the inverted index (SearchTerm rows)
+    inverted_index = schema_editor.connection.vendor not in ('postgresql', 'mysql')
+
+    profiles = UserProfile.objects.select_related('user').order_by('pk').iterator(chunk_size=BATCH_SIZE)
+    while batch := list(islice(profiles, BATCH_SIZE)):
+        documents = []
+        terms = []
+        for profile in batch:
+            fields = {
+                'username': profile.user.username,
+                'job_title': profile.job_title,
+                'location': profile.location,
+                'skills': profile.skills,
+                'bio': profile.bio,
+            }
+            documents.append(SearchDocument(profile_id=profile.pk, **fields))
+            if inverted_index:
+                terms += [
+                    SearchTerm(term=term, profile_id=profile.pk, field=field, weight=FIELD_WEIGHTS[field])
+                    for term, field in {(term, field) for field, value in fields.items() for term in tokenize(value)}
+                ]
+        SearchDocument.objects.bulk_create(documents)
+        SearchTerm.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0013_searchdocument_searchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_native_indexes, drop_native_indexes),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0014_searchdocument_native_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('normalized', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['normalized'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfileSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_skills', to='profiles.userprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_skills', to='profiles.skill')),
+            ],
+            options={
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['skill', 'profile'], name='profileskill_skill_idx')],
+                'unique_together': {('profile', 'skill')},
+            },
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='profiles', through='profiles.ProfileSkill', to='profiles.skill'),
+        ),
+        # Endorsement.skill: free text -> foreign key to the shared vocabulary
+        migrations.AddField(
+            model_name='endorsement',
+            name='skill_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.skill'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+import re
+
+from django.db import migrations
+
+
+def normalize(name):
+    return re.sub(r'\s+', ' ', name).strip().lower()[:50]
+
+
+def populate_skills(apps, schema_editor):
+    """
+    Parses the comma-separated UserProfile.skills strings and the free-text
+    Endorsement.skill values into the shared Skill vocabulary.
+    """
+    Skill = apps.get_model('profiles', 'Skill')
+    ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    Endorsement = apps.get_model('profiles', 'Endorsement')
+
+    skills = {}
+
+    def get_skill(raw_name):
+        display = re.sub(r'\s+', ' ', raw_name).strip()[:50]
+        key = normalize(raw_name)
+        if key not in skills:
+            skills[key], _ = Skill.objects.get_or_create(normalized=key, defaults={'name': display})
+        return skills[key]
+
+    profile_skills = []
+    for profile in UserProfile.objects.exclude(skills='').iterator(chunk_size=500):
+        seen = set()
+        for raw_name in profile.skills.split(','):
+            if not raw_name.strip():
+                continue
+            skill = get_skill(raw_name)
+            if skill.pk in seen:
+                continue
+            seen.add(skill.pk)
+            profile_skills.append(ProfileSkill(profile_id=profile.pk, skill=skill, position=len(seen) - 1))
+    ProfileSkill.objects.bulk_create(profile_skills, batch_size=1000)
+
+    # Endorsements that normalize to the same skill would now collide; keep the oldest
+    kept = set()
+    for endorsement in Endorsement.objects.order_by('created_at', 'pk').iterator(chunk_size=500):
+        skill = get_skill(endorsement.skill or 'general')
+        key = (endorsement.profile_id, endorsement.endorser_id, skill.pk)
+        if key in kept:
+            endorsement.delete()
+            continue
+        kept.add(key)
+        endorsement.skill_ref = skill
+        endorsement.save(update_fields=['skill_ref'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0015_skill_profileskill'),
+    ]
+
+    # Its own migration: on PostgreSQL, altering a table in the same transaction as
+    # the rows just updated fails with "pending trigger events"
+    operations = [
+        migrations.RunPython(populate_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0016_populate_skills'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='endorsement',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='endorsement',
+            name='skill',
+        ),
+        migrations.RenameField(
+            model_name='endorsement',
+            old_name='skill_ref',
+            new_name='skill',
+        ),
+        migrations.AlterField(
+            model_name='endorsement',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='endorsements', to='profiles.skill'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='endorsement',
+            unique_together={('profile', 'endorser', 'skill')},
+        ),
+    ]
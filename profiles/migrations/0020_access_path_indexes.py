@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+# The auto-created UserProfile.following table only has its unique (from, to)
+# index plus single-column FK indexes; "who follows X" reads go the other way.
+FOLLOWERS_INDEX = models.Index(fields=['to_userprofile', 'from_userprofile'], name='following_followers_idx')
+
+
+def add_followers_index(apps, schema_editor):
+    Through = apps.get_model('profiles', 'UserProfile').following.through
+    schema_editor.add_index(Through, FOLLOWERS_INDEX)
+
+
+def remove_followers_index(apps, schema_editor):
+    Through = apps.get_model('profiles', 'UserProfile').following.through
+    schema_editor.remove_index(Through, FOLLOWERS_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0019_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='endorsement',
+            index=models.Index(fields=['profile', '-created_at'], name='endorsement_profile_recent_idx'),
+        ),
+        migrations.RunPython(add_followers_index, remove_followers_index),
+    ]
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+# Kept in sync with profiles/accounts.py (EmailKey): lookups must compile to the same expression
+class EmailKey(models.Func):
+    template = "NULLIF(LOWER(%(expressions)s), '')"
+    output_field = models.CharField()
+
+
+# auth_user belongs to django.contrib.auth, so the constraint is created directly (like 0020's index)
+EMAIL_CONSTRAINT = models.UniqueConstraint(EmailKey('email'), name='auth_user_email_ci_uniq')
+
+
+def add_email_constraint(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='')
+        .values(email_lower=Lower('email'))
+        .annotate(count=models.Count('pk'))
+        .filter(count__gt=1)
+        .values_list('email_lower', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Merge or change the accounts sharing these emails before migrating: " + ", ".join(duplicates)
+        )
+    schema_editor.add_constraint(User, EMAIL_CONSTRAINT)
+
+
+def remove_email_constraint(apps, schema_editor):
+    schema_editor.remove_constraint(apps.get_model('auth', 'User'), EMAIL_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('profiles', '0020_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_email_constraint, remove_email_constraint),
+    ]
@@ -0,0 +1,45 @@
+"""
+Drops the legacy profiles Post/Like/Comment tables, whose rows now live in the
+posts app. A database that still has legacy rows is upgraded with:
+
+    python manage.py migrate posts 0005
+    python manage.py migrate profiles 0021
+    python manage.py merge_legacy_posts
+    python manage.py migrate
+
+merge_legacy_posts writes the posts tables as of posts 0005 and reads the
+legacy tables as they are at profiles 0021. This migration refuses to run
+while any legacy row is left.
+"""
+
+from django.db import migrations
+
+
+def check_legacy_tables_empty(apps, schema_editor):
+    using = schema_editor.connection.alias
+    left = {
+        name: apps.get_model('profiles', name).objects.using(using).count()
+        for name in ('Post', 'Like', 'Comment')
+    }
+    if any(left.values()):
+        raise RuntimeError(
+            "The legacy profiles Post/Like/Comment tables still have rows ("
+            + ", ".join(f"{count} {name.lower()}(s)" for name, count in left.items())
+            + "). Run `manage.py merge_legacy_posts` before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0021_user_email_ci_unique'),
+        # merge_legacy_posts writes the posts tables as of this migration (counters included)
+        ('posts', '0005_trending_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_legacy_tables_empty, migrations.RunPython.noop),
+        migrations.DeleteModel(name='Comment'),
+        migrations.DeleteModel(name='Like'),
+        migrations.DeleteModel(name='Post'),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:41
+
+import profiles.media
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0022_delete_legacy_post_like_comment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='image',
+            field=profiles.media.ContentHashedImageField(default='default.jpg', upload_to='profile_pics'),
+        ),
+    ]
@@ -2,15 +2,18 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .media import ContentHashedImageField
+
 # -------------------------------
 # User Profile
 # -------------------------------
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(max_length=300, blank=True)
-    image = models.ImageField(upload_to='profile_pics', default='default.jpg')
+    image = ContentHashedImageField(upload_to='profile_pics', default='default.jpg')
     location = models.CharField(max_length=100, blank=True)
-    skills = models.TextField(blank=True)  # Comma-separated
+    skills = models.TextField(blank=True)  # Comma-separated (as typed; normalized into skill_tags on save)
+    skill_tags = models.ManyToManyField('Skill', through='ProfileSkill', related_name='profiles', blank=True)
     job_title = models.CharField(max_length=100, blank=True)
     website = models.URLField(max_length=200, blank=True)
     contact = models.CharField(max_length=100, blank=True)
@@ -27,68 +30,171 @@ class UserProfile(models.Model):
 
 
 # -------------------------------
-# Post
+# Skill (normalized vocabulary shared by profiles and endorsements)
 # -------------------------------
-class Post(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
-    content = models.TextField()
-    image = models.ImageField(upload_to='post_images', blank=True, null=True)
-    created_at = models.DateTimeField(default=timezone.now)
+class Skill(models.Model):
+    name = models.CharField(max_length=50)
+    # Lowercased, whitespace-collapsed form used for exact and prefix lookups
+    normalized = models.CharField(max_length=50, unique=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['normalized']
+
+    def __str__(self):
+        return self.name
+
+
+# -------------------------------
+# Profile Skill (through model)
+# -------------------------------
+class ProfileSkill(models.Model):
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='profile_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='profile_skills')
+    position = models.PositiveSmallIntegerField(default=0)  # Order the user listed it in
 
-    def is_liked_by_user(self, user):
-        if not user.is_authenticated:
-            return False
-        return self.likes.filter(user=user).exists()
+    class Meta:
+        ordering = ['position']
+        unique_together = ('profile', 'skill')
+        indexes = [
+            # "Everyone with skill X" walks this index instead of the profiles table
+            models.Index(fields=['skill', 'profile'], name='profileskill_skill_idx'),
+        ]
 
     def __str__(self):
-        return f'Post by {self.user.username} at {self.created_at.strftime("%Y-%m-%d")}'
+        return f'{self.profile} has {self.skill}'
 
 
 # -------------------------------
-# Comment
+# Endorsement
 # -------------------------------
-class Comment(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
-    content = models.TextField()
+class Endorsement(models.Model):
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='endorsements')
+    endorser = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='given_endorsements')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='endorsements')
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['created_at']
+        unique_together = ('profile', 'endorser', 'skill')
+        indexes = [
+            # Most recent endorsements of a profile (profile_detail)
+            models.Index(fields=['profile', '-created_at'], name='endorsement_profile_recent_idx'),
+        ]
 
     def __str__(self):
-        return f'Comment by {self.author.username} on {self.post}'
+        # Lists that print endorsements select_related these (see EndorsementAdmin)
+        return f'{self.endorser.user.username} endorsed {self.profile.user.username} for {self.skill}'
 
 
 # -------------------------------
-# Like
+# People You May Know suggestion
 # -------------------------------
-class Like(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='likes')
-    created_at = models.DateTimeField(default=timezone.now)
+class Suggestion(models.Model):
+    owner = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='suggestions')
+    suggested = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='suggested_to')
+    mutual_count = models.PositiveIntegerField(default=0)
+    shared_skills = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        unique_together = ('post', 'user')
+        ordering = ['-score']
+        unique_together = ('owner', 'suggested')
+        indexes = [
+            models.Index(fields=['owner', '-score'], name='suggestion_owner_score_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.user.username} likes {self.post}'
+        return f'{self.suggested_id} suggested to {self.owner_id} ({self.score:.1f})'
 
 
 # -------------------------------
-# Endorsement
+# Search Document (denormalized copy of the searchable profile fields)
 # -------------------------------
-class Endorsement(models.Model):
-    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='endorsements')
-    endorser = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='given_endorsements')
-    skill = models.CharField(max_length=50)
-    created_at = models.DateTimeField(default=timezone.now)
+class SearchDocument(models.Model):
+    profile = models.OneToOneField(UserProfile, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    username = models.CharField(max_length=150, blank=True)
+    job_title = models.CharField(max_length=100, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    skills = models.TextField(blank=True)
+    bio = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'Search document for {self.username}'
+
+
+# -------------------------------
+# Search Term (inverted index used when no native full-text search exists)
+# -------------------------------
+class SearchTerm(models.Model):
+    term = models.CharField(max_length=64)
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='search_terms')
+    field = models.CharField(max_length=20)
+    weight = models.FloatField()
 
     class Meta:
-        unique_together = ('profile', 'endorser', 'skill')
+        # Leading on `term`, so this also serves the term/prefix lookups
+        unique_together = ('term', 'profile', 'field')
 
     def __str__(self):
-        return f'{self.endorser.user.username} endorsed {self.profile.user.username} for {self.skill}'
+        return f'{self.term} -> {self.profile_id} ({self.field})'
+
+
+# -------------------------------
+# Profile Stats (denormalized header aggregates for profile_detail)
+# -------------------------------
+class ProfileStats(models.Model):
+    # Keyed by user so write paths that only know a user_id can update it directly
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='profile_stats')
+    post_count = models.PositiveIntegerField(default=0)
+    likes_received = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    endorsement_counts = models.JSONField(default=dict, blank=True)  # {skill name: count}
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Profile Stats"
+        verbose_name_plural = "Profile Stats"
+
+    def __str__(self):
+        return f'Stats for user {self.user_id}'
+
+
+# -------------------------------
+# Job (database-backed background task queue, see jobs.py)
+# -------------------------------
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)  # Registered task name
+    payload = models.JSONField(default=dict, blank=True)  # Keyword arguments for the task
+    # Enqueueing the same key twice runs the work only once
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'pk']
+        indexes = [
+            # Workers poll for due pending jobs (and stale running ones) through this index
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,246 @@
+# profiles/profiling.py
+
+"""
+Per-request SQL profiling.
+
+QueryProfilerMiddleware records every query a request runs (on every
+database alias) and reports the query count, total DB time, repeated query
+fingerprints (the signature of an N+1 loop) and the slowest statements:
+
+* as a ``Server-Timing`` response header, visible in the browser dev tools;
+* as one JSON log line per request on the ``profiles.profiling`` logger.
+
+It also reports how the request got its connections: how many it had to
+open (0 while persistent connections are reused), and for pooled databases
+(see linkup/database.py) the pool's size, idle connections, waiting
+requests and cumulative wait time.
+
+Views declare how many queries they may run with @query_budget(n). Going
+over budget logs a warning, or raises QueryBudgetExceeded when
+QUERY_BUDGET_ENFORCE is on (e.g. in tests), so N+1 regressions fail loudly.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Statements listed in the log line, slowest first
+SLOWEST_STATEMENTS = 3
+# Longest SQL text kept per statement in the log line
+SQL_PREVIEW_LENGTH = 300
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a view runs more queries than its declared budget (with QUERY_BUDGET_ENFORCE).
+    """
+
+
+def query_budget(max_queries):
+    """
+    Declares the maximum number of SQL queries a view may run per request.
+    Usage: @query_budget(10) directly above the view function.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def fingerprint(sql):
+    """
+    Normalizes a statement so that the same query with different parameters
+    (or IN lists of different lengths) maps to the same short hash.
+    """
+    normalized = _WHITESPACE_RE.sub(' ', sql).strip()
+    normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    return hashlib.md5(normalized.encode()).hexdigest()[:10], normalized
+
+
+# The recorder of the request running in this context (thread or task)
+_current_recorder = ContextVar('query_recorder', default=None)
+
+
+def _count_connection(sender, connection, **kwargs):
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.connections_opened[connection.alias] += 1
+
+
+connection_created.connect(_count_connection)
+
+
+def pool_stats():
+    """
+    Usage of each connection pool this process has opened, by alias.
+    Counters (wait time, requests, timeouts) are cumulative since the pool started.
+    """
+    stats = {}
+    for connection in connections.all(initialized_only=True):
+        # Only the PostgreSQL backend has `pool`; it is None unless pooling is configured
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            continue
+        counters = pool.get_stats()
+        stats[connection.alias] = {
+            'size': counters.get('pool_size', 0),
+            'max': counters.get('pool_max', 0),
+            'idle': counters.get('pool_available', 0),
+            'waiting': counters.get('requests_waiting', 0),
+            'requests': counters.get('requests_num', 0),
+            'wait_ms': counters.get('requests_wait_ms', 0),
+            'timeouts': counters.get('requests_errors', 0),
+        }
+    return stats
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that times and keeps every statement.
+    """
+
+    def __init__(self):
+        self.queries = []  # (alias, sql, duration in seconds)
+        self.connections_opened = Counter()  # alias -> connections (or pool checkouts) opened
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((context['connection'].alias, sql, time.perf_counter() - start))
+
+    def summary(self):
+        fingerprints = Counter()
+        samples = {}
+        for _, sql, _ in self.queries:
+            key, normalized = fingerprint(sql)
+            fingerprints[key] += 1
+            samples.setdefault(key, normalized)
+
+        repeated = [
+            {'fingerprint': key, 'count': count, 'sql': samples[key][:SQL_PREVIEW_LENGTH]}
+            for key, count in fingerprints.most_common() if count > 1
+        ]
+        slowest = sorted(self.queries, key=lambda query: query[2], reverse=True)[:SLOWEST_STATEMENTS]
+        return {
+            'queries': len(self.queries),
+            'db_ms': round(sum(duration for _, _, duration in self.queries) * 1000, 2),
+            'connections_opened': dict(self.connections_opened),
+            'repeated': repeated,
+            'slowest': [
+                {'alias': alias, 'ms': round(duration * 1000, 2), 'sql': sql[:SQL_PREVIEW_LENGTH]}
+                for alias, sql, duration in slowest
+            ],
+        }
+
+
+class QueryProfilerMiddleware:
+    """
+    Records the SQL run by each request and checks it against the view's budget.
+    Async-capable, so it doesn't force async views back onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.report(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', True):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.report(request, response, recorder, start)
+
+    def report(self, request, response, recorder, start):
+        total_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        summary = recorder.summary()
+        view_name = getattr(request, 'profiled_view', None)
+        budget = getattr(request, 'query_budget', None)
+
+        timing = [
+            f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+            f'app;dur={total_ms}',
+        ]
+        if summary['repeated']:
+            repeated_count = sum(item['count'] for item in summary['repeated'])
+            timing.append(f'db-repeated;desc="{repeated_count} repeated"')
+        opened = sum(summary['connections_opened'].values())
+        if opened:
+            timing.append(f'db-connect;desc="{opened} opened"')
+        pools = pool_stats()
+        for alias, pool in pools.items():
+            in_use = pool['size'] - pool['idle']
+            timing.append(f'db-pool-{alias};desc="{in_use}/{pool["max"]} in use, {pool["waiting"]} waiting"')
+        response['Server-Timing'] = ', '.join(timing)
+
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': total_ms,
+            'budget': budget,
+            **summary,
+            'pools': pools,
+        }))
+
+        if budget is not None and summary['queries'] > budget:
+            message = f"{view_name} ran {summary['queries']} queries (budget {budget}) for {request.path}"
+            if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profiled_view = f'{view_func.__module__}.{view_func.__qualname__}'
+        request.query_budget = getattr(view_func, 'query_budget', None)
@@ -0,0 +1,116 @@
+# profiles/routing.py
+
+"""
+Read-replica routing with read-your-writes stickiness.
+
+Replicas are configured from DATABASE_REPLICA_URLS (see settings) as the
+aliases listed in REPLICA_DATABASES. Only views marked @read_replica send
+their reads there, and only for GET/HEAD requests; everything else (writes,
+auth/session lookups, admin, jobs, management commands) stays on `default`.
+
+A browser that just wrote something (any successful unsafe request, e.g. a
+post, like or follow) gets a short-lived cookie pinning it to the primary
+for REPLICA_PIN_SECONDS, so the page it is redirected to shows its own
+change even while the replicas are still catching up.
+"""
+
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+REPLICA_DATABASES = getattr(settings, 'REPLICA_DATABASES', [])
+# How long a browser reads from the primary after its own write (seconds)
+REPLICA_PIN_SECONDS = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+# Set for the duration of a replica-eligible view; context-local, so safe under threads and async
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def read_replica(view_func):
+    """
+    Marks a read-only view whose queries may be served by a replica.
+    Usage: @read_replica directly above the view function.
+    """
+    view_func.read_replica = True
+    return view_func
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a random replica while a @read_replica view runs, all writes to `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not (REPLICA_DATABASES and _use_replica.get()):
+            return None
+        # Reads inside a write transaction must see that transaction's rows
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enables replica reads for @read_replica views and pins browsers to the primary after a write.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.pinned_to_primary = REPLICA_PIN_COOKIE in request.COOKIES
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        request.pinned_to_primary = REPLICA_PIN_COOKIE in request.COOKIES
+        token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response)
+
+    def pin(self, request, response):
+        if REPLICA_DATABASES and request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            getattr(view_func, 'read_replica', False)
+            and request.method in ('GET', 'HEAD')
+            and not request.pinned_to_primary
+        ):
+            # Load the session and user from the primary first: a session created
+            # moments ago (login, signup) may not have reached the replicas yet
+            if hasattr(request, 'user'):
+                request.user.is_authenticated
+            _use_replica.set(True)
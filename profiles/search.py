@@ -0,0 +1,187 @@
+# profiles/search.py
+
+"""
+Ranked user search.
+
+Every profile has a SearchDocument row (a denormalized copy of its username,
+job title, location, skills and bio) kept current on save. Queries run against
+it with the best engine the database offers:
+
+* PostgreSQL: weighted tsvector + GIN index, ranked with ts_rank.
+* MySQL: FULLTEXT indexes, ranked with MATCH ... AGAINST relevance.
+* Anything else (e.g. SQLite for local runs): a tokenized inverted index
+  (SearchTerm rows) ranked by summed field weights.
+
+All engines AND the query tokens together, treat each token as a prefix and
+return one page of profiles at a time.
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, OuterRef, Subquery, Sum, Q
+from django.db.models.expressions import RawSQL
+
+from .models import UserProfile, SearchDocument, SearchTerm
+
+# Relative importance of a match in each field
+FIELD_WEIGHTS = {
+    'username': 4.0,
+    'job_title': 3.0,
+    'skills': 3.0,
+    'location': 2.0,
+    'bio': 1.0,
+}
+MAX_QUERY_TOKENS = 8
+MAX_TERM_LENGTH = 64
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Must stay identical to the expression indexed in migration 0014
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(username, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(job_title, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'D')"
+)
+# Column lists must match the FULLTEXT indexes created in migration 0014
+MYSQL_ALL_COLUMNS = 'username, job_title, skills, location, bio'
+MYSQL_USERNAME_BOOST = 3
+# Sorts after every character, so [token, token + bound) covers all terms starting with token
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens.
+    """
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or '').lower())]
+
+
+# ===============================
+# Indexing
+# ===============================
+
+def uses_inverted_index():
+    """
+    True when the database has no native full-text engine we support.
+    """
+    return connection.vendor not in ('postgresql', 'mysql')
+
+
+def index_profile(profile):
+    """
+    Refreshes the search document (and inverted index rows, if used) for a profile.
+    """
+    fields = {
+        'username': profile.user.username,
+        'job_title': profile.job_title,
+        'location': profile.location,
+        'skills': profile.skills,
+        'bio': profile.bio,
+    }
+
+    with transaction.atomic():
+        SearchDocument.objects.update_or_create(profile=profile, defaults=fields)
+
+        if uses_inverted_index():
+            SearchTerm.objects.filter(profile=profile).delete()
+            terms = {
+                (term, field)
+                for field, value in fields.items()
+                for term in tokenize(value)
+            }
+            SearchTerm.objects.bulk_create([
+                SearchTerm(term=term, profile=profile, field=field, weight=FIELD_WEIGHTS[field])
+                for term, field in terms
+            ])
+
+
+def rebuild_index():
+    """
+    Re-indexes every profile. Returns the number of profiles indexed.
+    """
+    count = 0
+    for profile in UserProfile.objects.select_related('user').iterator(chunk_size=500):
+        index_profile(profile)
+        count += 1
+    return count
+
+
+# ===============================
+# Querying
+# ===============================
+
+def _ranked_ids_postgresql(tokens, offset, limit):
+    tsquery = ' & '.join(f'{token}:*' for token in tokens)
+    return (
+        SearchDocument.objects.filter(
+            RawSQL(f"({PG_VECTOR_SQL}) @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        )
+        .annotate(rank=RawSQL(f"ts_rank({PG_VECTOR_SQL}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()))
+        .order_by('-rank', 'profile_id')
+        .values_list('profile_id', flat=True)[offset:offset + limit]
+    )
+
+
+def _ranked_ids_mysql(tokens, offset, limit):
+    boolean_query = ' '.join(f'+{token}*' for token in tokens)
+    match_all = f'MATCH({MYSQL_ALL_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)'
+    match_username = 'MATCH(username) AGAINST (%s IN BOOLEAN MODE)'
+    return (
+        SearchDocument.objects.filter(RawSQL(match_all, [boolean_query], output_field=BooleanField()))
+        .annotate(rank=RawSQL(
+            f'{match_all} + {MYSQL_USERNAME_BOOST} * {match_username}',
+            [boolean_query, boolean_query], output_field=FloatField(),
+        ))
+        .order_by('-rank', 'profile_id')
+        .values_list('profile_id', flat=True)[offset:offset + limit]
+    )
+
+
+def _prefix(token):
+    # A range instead of LIKE 'token%' (which SQLite can't serve from an index);
+    # exact under the binary collation the inverted index is used with
+    return Q(term__gte=token, term__lt=token + PREFIX_UPPER_BOUND)
+
+
+def _ranked_ids_inverted(tokens, offset, limit):
+    matches_any_token = Q()
+    profiles = UserProfile.objects.all()
+    for token in tokens:
+        # Every token must prefix-match some indexed term of the profile
+        profiles = profiles.filter(pk__in=SearchTerm.objects.filter(_prefix(token)).values('profile'))
+        matches_any_token |= _prefix(token)
+
+    score = (
+        SearchTerm.objects.filter(matches_any_token, profile=OuterRef('pk'))
+        .values('profile')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    return (
+        profiles.annotate(rank=Subquery(score, output_field=FloatField()))
+        .order_by('-rank', 'pk')
+        .values_list('pk', flat=True)[offset:offset + limit]
+    )
+
+
+def search_profiles(query, offset=0, limit=20):
+    """
+    Returns up to ``limit`` UserProfiles matching ``query``, best match first.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+
+    if connection.vendor == 'postgresql':
+        ranked_ids = _ranked_ids_postgresql(tokens, offset, limit)
+    elif connection.vendor == 'mysql':
+        ranked_ids = _ranked_ids_mysql(tokens, offset, limit)
+    else:
+        ranked_ids = _ranked_ids_inverted(tokens, offset, limit)
+
+    ranked_ids = list(ranked_ids)
+    profiles_by_id = UserProfile.objects.select_related('user').in_bulk(ranked_ids)
+    return [profiles_by_id[pk] for pk in ranked_ids if pk in profiles_by_id]
@@ -1,9 +1,56 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.contrib.auth.models import User
 from django.dispatch import receiver
+from posts.models import Post, Comment
 from .models import UserProfile
+from .caching import bump_version
+from .graph import invalidate_graph
+from .jobs import enqueue
+from .skills import sync_profile_skills
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, update_fields=None, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+    elif (update_fields is None or 'username' in update_fields) and hasattr(instance, 'userprofile'):
+        # Username changes must reach the search index (skips e.g. last_login updates)
+        enqueue('profiles.index_profile', {'profile_id': instance.userprofile.pk})
+
+@receiver(post_save, sender=UserProfile)
+def update_search_index(sender, instance, **kwargs):
+    # Re-indexing runs in the job queue, outside the request
+    enqueue('profiles.index_profile', {'profile_id': instance.pk})
+
+@receiver(post_save, sender=UserProfile)
+def update_profile_skills(sender, instance, created, **kwargs):
+    # A new profile without skills has nothing to sync (signup saves no skills)
+    if created and not instance.skills:
+        return
+    sync_profile_skills(instance)
+
+# ===============================
+# Cache invalidation (see caching.py)
+# ===============================
+
+# Only the object's own namespace: the anonymous feed pages are not bumped on
+# every write, they expire after PAGE_CACHE_TIMEOUT instead.
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_caches(sender, instance, **kwargs):
+    bump_version(f'post:{instance.pk}')
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    # Post cards show comment previews; a like needs nothing, the card key carries like_count
+    bump_version(f'post:{instance.post_id}')
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_caches(sender, instance, **kwargs):
+    bump_version(f'profile:{instance.user_id}')
+
+@receiver(m2m_changed, sender=UserProfile.following.through)
+def invalidate_follow_graph(sender, action, **kwargs):
+    # follow()/unfollow() in graph.py write through to the cache themselves; this
+    # covers .add()/.remove() from elsewhere (e.g. the admin), which are rare
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_graph()
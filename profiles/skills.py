@@ -0,0 +1,112 @@
+# profiles/skills.py
+
+"""
+Normalized skill vocabulary.
+
+UserProfile.skills stays the comma-separated text the user types; on save it
+is parsed into Skill/ProfileSkill rows so that skill lookups, endorsement
+aggregation and autocomplete are index lookups instead of substring scans.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import UserProfile, Skill, ProfileSkill, Endorsement
+from .search import PREFIX_UPPER_BOUND
+
+SKILL_MAX_LENGTH = 50
+
+
+def normalize_skill(name):
+    """
+    Returns the lookup key for a skill name: trimmed, single-spaced, lowercase.
+    """
+    return re.sub(r'\s+', ' ', name or '').strip().lower()[:SKILL_MAX_LENGTH]
+
+
+def parse_skills(text):
+    """
+    Splits a comma-separated skills string into display names, dropping blanks
+    and duplicates (compared by normalized form) while keeping the user's order.
+    """
+    names = {}
+    for raw_name in (text or '').split(','):
+        display = re.sub(r'\s+', ' ', raw_name).strip()[:SKILL_MAX_LENGTH]
+        if display:
+            names.setdefault(normalize_skill(display), display)
+    return list(names.values())
+
+
+def get_or_create_skills(names):
+    """
+    Returns Skill objects for the given display names, creating missing ones.
+    """
+    keys = {normalize_skill(name): name for name in names}
+    existing = {skill.normalized: skill for skill in Skill.objects.filter(normalized__in=keys)}
+    missing = [Skill(name=name, normalized=key) for key, name in keys.items() if key not in existing]
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update({skill.normalized: skill for skill in Skill.objects.filter(normalized__in=keys)})
+    return [existing[normalize_skill(name)] for name in names]
+
+
+def get_or_create_skill(name):
+    """
+    Returns the Skill for a single display name, creating it if needed.
+    """
+    return get_or_create_skills([name])[0]
+
+
+def sync_profile_skills(profile):
+    """
+    Brings a profile's ProfileSkill rows in line with its skills text.
+    Does nothing beyond one read when the skills have not changed.
+    """
+    names = parse_skills(profile.skills)
+    current = list(profile.profile_skills.order_by('position').values_list('skill__normalized', flat=True))
+    if current == [normalize_skill(name) for name in names]:
+        return
+
+    skills = get_or_create_skills(names)
+    with transaction.atomic():
+        profile.profile_skills.all().delete()
+        ProfileSkill.objects.bulk_create([
+            ProfileSkill(profile=profile, skill=skill, position=position)
+            for position, skill in enumerate(skills)
+        ])
+
+
+def profiles_with_skill(name):
+    """
+    Returns every profile that lists the given skill (exact, case-insensitive).
+    """
+    return UserProfile.objects.filter(profile_skills__skill__normalized=normalize_skill(name))
+
+
+def autocomplete_skills(prefix, limit=10):
+    """
+    Returns up to ``limit`` skills whose name starts with ``prefix``, most used first.
+    """
+    key = normalize_skill(prefix)
+    if not key:
+        return Skill.objects.none()
+    # A range rather than LIKE 'key%', so the unique index on normalized serves it (as in search.py)
+    return (
+        Skill.objects.filter(normalized__gte=key, normalized__lt=key + PREFIX_UPPER_BOUND)
+        .annotate(profile_count=Count('profile_skills'))
+        .order_by('-profile_count', 'normalized')[:limit]
+    )
+
+
+def endorsement_counts(profile):
+    """
+    Returns (skill name, endorsement count) pairs for a profile, most endorsed first.
+    """
+    return list(
+        Endorsement.objects.filter(profile=profile)
+        .values_list('skill__name')
+        .annotate(total=Count('pk'))
+        .order_by('-total', 'skill__name')
+    )
@@ -0,0 +1,111 @@
+# profiles/stats.py
+
+"""
+Profile header aggregates (posts, likes received, followers, following and
+endorsements per skill).
+
+The numbers live in one ProfileStats row per user that the like, follow,
+post and endorsement write paths adjust with F() updates, and are served to
+profile_detail from the cache. `manage.py recompute_profile_stats` rebuilds
+them from the source tables.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from posts.models import Post, Like
+
+from .models import UserProfile, Endorsement, ProfileStats
+
+STATS_CACHE_TIMEOUT = 60 * 15
+STATS_FIELDS = ('post_count', 'likes_received', 'followers_count', 'following_count', 'endorsement_counts')
+
+
+def _cache_key(user_id):
+    return f'profile-stats:{user_id}'
+
+
+def _invalidate(user_id):
+    # Once the caller's transaction commits: a reader that refilled the cache
+    # before then would otherwise store the row as it was before the change
+    transaction.on_commit(lambda: cache.delete(_cache_key(user_id)))
+
+
+def compute_stats(user_id):
+    """
+    Computes a user's header aggregates from the source tables.
+    """
+    profile = UserProfile.objects.get(user_id=user_id)
+    endorsements = (
+        Endorsement.objects.filter(profile=profile)
+        .values_list('skill__name')
+        .annotate(total=Count('pk'))
+    )
+    return {
+        'post_count': Post.objects.filter(user_id=user_id).count(),
+        'likes_received': Like.objects.filter(post__user_id=user_id).count(),
+        'followers_count': profile.followers.count(),
+        'following_count': profile.following.count(),
+        'endorsement_counts': dict(endorsements),
+    }
+
+
+def recompute_stats(user_id):
+    """
+    Rebuilds a user's ProfileStats row from scratch and refreshes the cache.
+    """
+    # In a transaction, so a @read_replica view reads the source tables from the primary
+    with transaction.atomic():
+        values = compute_stats(user_id)
+        ProfileStats.objects.update_or_create(user_id=user_id, defaults=values)
+    transaction.on_commit(lambda: cache.set(_cache_key(user_id), values, STATS_CACHE_TIMEOUT))
+    return values
+
+
+def get_stats(user_id):
+    """
+    Returns a user's header aggregates, from the cache when possible.
+    """
+    values = cache.get(_cache_key(user_id))
+    if values is not None:
+        return values
+
+    # From the primary: a lagging replica would cache counts from before the last adjust_stats()
+    values = ProfileStats.objects.using('default').filter(user_id=user_id).values(*STATS_FIELDS).first()
+    if values is None:
+        return recompute_stats(user_id)
+
+    cache.set(_cache_key(user_id), values, STATS_CACHE_TIMEOUT)
+    return values
+
+
+def adjust_stats(user_id, **deltas):
+    """
+    Applies counter deltas (e.g. likes_received=1) to a user's stats row.
+    Missing rows are built from scratch instead, which already includes the change.
+    """
+    updated = ProfileStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        recompute_stats(user_id)
+        return
+    _invalidate(user_id)
+
+
+def adjust_endorsement_count(user_id, skill_name, delta):
+    """
+    Adjusts the endorsement count for one skill on a user's stats row.
+    """
+    with transaction.atomic():
+        stats = ProfileStats.objects.select_for_update().filter(user_id=user_id).first()
+        if stats is None:
+            recompute_stats(user_id)
+            return
+        counts = stats.endorsement_counts
+        counts[skill_name] = max(counts.get(skill_name, 0) + delta, 0)
+        if not counts[skill_name]:
+            del counts[skill_name]
+        stats.save(update_fields=['endorsement_counts', 'updated_at'])
+    _invalidate(user_id)
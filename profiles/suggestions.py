@@ -0,0 +1,200 @@
+# profiles/suggestions.py
+
+"""
+"People You May Know" engine over the UserProfile.following graph.
+
+Candidates are friends-of-friends (profiles followed by the people a user
+follows), ranked by the number of shared connections plus a bonus for
+overlapping skills. Results are precomputed into the Suggestion table and
+refreshed after PYMK_TTL by a background job (the sidebar keeps showing the
+stored list meanwhile); follow/unfollow adjusts the stored rows in place.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import UserProfile, Suggestion
+from .caching import bump_version, versioned_key, FRAGMENT_CACHE_TIMEOUT
+from .jobs import enqueue
+from .skills import normalize_skill, parse_skills
+
+# How long a precomputed suggestion list stays fresh
+PYMK_TTL = getattr(settings, 'PYMK_TTL', timedelta(hours=6))
+# Number of suggestions stored per user (the sidebar shows the top few)
+PYMK_STORE_SIZE = getattr(settings, 'PYMK_STORE_SIZE', 20)
+# Score added per skill shared with the candidate (one mutual connection = 1.0)
+PYMK_SKILL_WEIGHT = getattr(settings, 'PYMK_SKILL_WEIGHT', 0.5)
+# Friends-of-friends considered before skill re-ranking
+PYMK_CANDIDATE_POOL = 100
+
+
+def skill_set(skills):
+    """
+    Parses a comma-separated skills string into a set of normalized names.
+    """
+    return {normalize_skill(name) for name in parse_skills(skills)}
+
+
+def compute_suggestions(profile):
+    """
+    Ranks friends-of-friends for a profile. Returns unsaved Suggestion objects.
+    Falls back to recently joined members when the profile follows nobody yet.
+    """
+    following = profile.following.all()
+    now = timezone.now()
+
+    candidates = (
+        UserProfile.objects.filter(followers__in=following)
+        .exclude(pk=profile.pk)
+        .exclude(pk__in=following.values('pk'))
+        .annotate(mutual_count=Count('followers', filter=Q(followers__in=following)))
+        .order_by('-mutual_count', 'pk')
+        .only('pk', 'skills')[:PYMK_CANDIDATE_POOL]
+    )
+    candidates = list(candidates)
+
+    if not candidates:
+        # Cold start: no graph to walk yet, so suggest the newest members
+        candidates = list(
+            UserProfile.objects.exclude(pk=profile.pk)
+            .exclude(pk__in=following.values('pk'))
+            .order_by('-created_at')
+            .only('pk', 'skills')[:PYMK_STORE_SIZE]
+        )
+        for candidate in candidates:
+            candidate.mutual_count = 0
+
+    own_skills = skill_set(profile.skills)
+    suggestions = []
+    for candidate in candidates:
+        shared = len(own_skills & skill_set(candidate.skills))
+        suggestions.append(Suggestion(
+            owner=profile,
+            suggested_id=candidate.pk,
+            mutual_count=candidate.mutual_count,
+            shared_skills=shared,
+            score=candidate.mutual_count + PYMK_SKILL_WEIGHT * shared,
+            computed_at=now,
+        ))
+
+    suggestions.sort(key=lambda s: s.score, reverse=True)
+    return suggestions[:PYMK_STORE_SIZE]
+
+
+def refresh_suggestions(profile):
+    """
+    Replaces a profile's stored suggestions with a fresh computation.
+    Returns the number of suggestions stored.
+    """
+    # compute_suggestions() inside the transaction reads from the primary, even in a @read_replica view
+    with transaction.atomic():
+        suggestions = compute_suggestions(profile)
+        Suggestion.objects.filter(owner=profile).delete()
+        Suggestion.objects.bulk_create(suggestions)
+    return len(suggestions)
+
+
+def is_stale(profile):
+    """
+    A suggestion list is stale when it is missing or older than PYMK_TTL.
+    """
+    oldest = Suggestion.objects.filter(owner=profile).order_by('computed_at').values_list('computed_at', flat=True).first()
+    return oldest is None or oldest < timezone.now() - PYMK_TTL
+
+
+def schedule_refresh(profile):
+    """
+    Queues one refresh of a profile's suggestions per PYMK_TTL. The job bumps
+    the sidebar's cache version once the new list is stored.
+    """
+    bucket = int(time.time() // PYMK_TTL.total_seconds())
+    enqueue('profiles.refresh_suggestions', {'profile_id': profile.pk}, key=f'suggestions:{profile.pk}:{bucket}')
+
+
+def get_suggested_users(user, limit=5):
+    """
+    Returns up to ``limit`` suggested User objects for the sidebar. An expired
+    list is still served while a job recomputes it, so the page never pays for
+    the friends-of-friends aggregation. The sidebar list is cached until the
+    user's next follow/unfollow or refresh.
+    """
+    key = versioned_key(f'suggestions:{user.pk}', 'sidebar', limit)
+    users = cache.get(key)
+    if users is not None:
+        return users
+
+    profile = user.userprofile
+    if is_stale(profile):
+        schedule_refresh(profile)
+
+    # From the primary: a lagging replica would cache an older list than the one stored
+    suggestions = (
+        Suggestion.objects.using('default').filter(owner=profile)
+        .select_related('suggested__user')
+        .order_by('-score')[:limit]
+    )
+    users = [suggestion.suggested.user for suggestion in suggestions]
+    cache.set(key, users, FRAGMENT_CACHE_TIMEOUT)
+    return users
+
+
+def on_follow(follower, followed):
+    """
+    Incrementally updates stored suggestions after ``follower`` follows ``followed``
+    (both UserProfile instances).
+    """
+    bump_version(f'suggestions:{follower.user_id}')
+
+    # The followed profile is no longer a suggestion for the follower
+    Suggestion.objects.filter(owner=follower, suggested=followed).delete()
+
+    # Everyone the followed profile follows gains a mutual connection for the follower
+    Suggestion.objects.filter(owner=follower, suggested__in=followed.following.all()).update(
+        mutual_count=F('mutual_count') + 1, score=F('score') + 1,
+    )
+
+    # ...and those not yet suggested become new candidates with one mutual connection
+    new_candidates = (
+        followed.following.exclude(pk=follower.pk)
+        .exclude(pk__in=follower.following.values('pk'))
+        .only('pk', 'skills')[:PYMK_CANDIDATE_POOL]
+    )
+    own_skills = skill_set(follower.skills)
+    now = timezone.now()
+    new_rows = []
+    for candidate in new_candidates:
+        shared = len(own_skills & skill_set(candidate.skills))
+        new_rows.append(Suggestion(
+            owner=follower, suggested_id=candidate.pk, mutual_count=1,
+            shared_skills=shared, score=1 + PYMK_SKILL_WEIGHT * shared, computed_at=now,
+        ))
+    Suggestion.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    # The follower's own followers now reach the followed profile through them
+    Suggestion.objects.filter(owner__in=follower.followers.all(), suggested=followed).update(
+        mutual_count=F('mutual_count') + 1, score=F('score') + 1,
+    )
+
+
+def on_unfollow(follower, unfollowed):
+    """
+    Incrementally updates stored suggestions after ``follower`` unfollows ``unfollowed``.
+    """
+    bump_version(f'suggestions:{follower.user_id}')
+
+    Suggestion.objects.filter(
+        owner=follower, suggested__in=unfollowed.following.all(), mutual_count__gt=0,
+    ).update(mutual_count=F('mutual_count') - 1, score=F('score') - 1)
+
+    Suggestion.objects.filter(
+        owner__in=follower.followers.all(), suggested=unfollowed, mutual_count__gt=0,
+    ).update(mutual_count=F('mutual_count') - 1, score=F('score') - 1)
+
+    # Drop friends-of-friends that no longer share any connection or skill
+    Suggestion.objects.filter(owner=follower, mutual_count=0, shared_skills=0).delete()
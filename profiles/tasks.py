@@ -0,0 +1,61 @@
+# profiles/tasks.py
+
+"""
+Background tasks for the profiles app (run by `manage.py run_jobs`, see jobs.py).
+"""
+
+import time
+
+from PIL import UnidentifiedImageError
+
+from .images import DERIVATIVE_QUEUE_TIMEOUT, build_derivatives, forget_derivatives, mark_undecodable
+from .jobs import enqueue, task
+from .models import UserProfile
+from .caching import bump_version
+from .search import index_profile as _index_profile
+from .suggestions import refresh_suggestions as _refresh_suggestions
+
+
+@task('profiles.build_image_derivatives')
+def build_image_derivatives(name, spec):
+    try:
+        build_derivatives(name, spec)
+    except (UnidentifiedImageError, FileNotFoundError):
+        # Retrying won't help: keep serving the original
+        mark_undecodable(name, spec)
+        return
+    forget_derivatives(name, spec)
+
+
+def queue_derivatives(name, spec):
+    """
+    Queues resizing of an image. Repeated calls within DERIVATIVE_QUEUE_TIMEOUT
+    share one job; after that a file whose derivatives went missing (or whose
+    build failed) gets a new one.
+    """
+    bucket = int(time.time() // DERIVATIVE_QUEUE_TIMEOUT)
+    enqueue(
+        'profiles.build_image_derivatives', {'name': name, 'spec': spec},
+        key=f'derivatives:{spec}:{name}:{bucket}',
+    )
+
+
+@task('profiles.index_profile')
+def index_profile(profile_id):
+    profile = UserProfile.objects.select_related('user').filter(pk=profile_id).first()
+    if profile is not None:
+        _index_profile(profile)
+
+
+@task('profiles.index_profiles')
+def index_profiles(profile_ids):
+    for profile in UserProfile.objects.select_related('user').filter(pk__in=profile_ids):
+        _index_profile(profile)
+
+
+@task('profiles.refresh_suggestions')
+def refresh_suggestions(profile_id):
+    profile = UserProfile.objects.filter(pk=profile_id).first()
+    if profile is not None:
+        _refresh_suggestions(profile)
+        bump_version(f'suggestions:{profile.user_id}')  # Drops the cached sidebar
@@ -1,4 +1,11 @@
 from django import template
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from ..caching import attach_post_cache_versions, FRAGMENT_CACHE_TIMEOUT
+from ..forms import CommentForm
+from ..images import IMAGE_SPECS, MIME_TYPES, get_derivatives
 from ..models import UserProfile # Import the UserProfile model
 
 # The necessary line to register this module as a template tag library
@@ -83,4 +90,96 @@ def profile_strength(profile):
     # Calculate percentage
     percentage = int((completed_points / total_points) * 100)
     
-    return percentage
\ No newline at end of file
+    return percentage
+
+
+# ====================================================
+# RESPONSIVE IMAGES
+# ====================================================
+
+def _srcset(candidates):
+    return ', '.join(f'{url} {width}w' for width, url in candidates)
+
+
+@register.simple_tag
+def image_srcset(image, spec, fmt='jpeg'):
+    """
+    Returns a srcset value ("url 480w, url 800w") for one derivative format.
+    Usage: <img srcset="{% image_srcset post.image 'feed' 'webp' %}">
+    """
+    derivatives = get_derivatives(image, spec)
+    if not derivatives or fmt not in derivatives:
+        return ''
+    return _srcset(derivatives[fmt])
+
+
+@register.simple_tag
+def responsive_image(image, spec, alt='', css_class='', style='', default='', sizes=None):
+    """
+    Renders a <picture> with AVIF/WebP sources and a JPEG <img> fallback,
+    sized for the given spec ('avatar' or 'feed'; ``sizes`` overrides the
+    spec's display width). Falls back to the original
+    upload (or ``default``) when no derivatives can be built.
+    Usage: {% responsive_image post.image 'feed' alt="Post image" css_class="img-fluid" %}
+    """
+    derivatives = get_derivatives(image, spec)
+    if not derivatives:
+        src = image.url if image else default
+        return format_html('<img src="{}" class="{}" style="{}" alt="{}" loading="lazy">', src, css_class, style, alt)
+
+    sizes = sizes or IMAGE_SPECS[spec]['sizes']
+    jpeg = derivatives['jpeg']
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], _srcset(candidates), sizes) for fmt, candidates in derivatives.items() if fmt != 'jpeg'),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" class="{}" style="{}" alt="{}" loading="lazy" decoding="async"></picture>',
+        sources, jpeg[0][1], _srcset(jpeg), sizes, css_class, style, alt,
+    )
+
+
+# ====================================================
+# POST CARDS
+# ====================================================
+
+# Stands in for the viewer's CSRF token in cached card markup
+CSRF_PLACEHOLDER = 'CSRF-TOKEN-PLACEHOLDER'
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, show_author=True, show_comments=False):
+    """
+    Renders the shared post card (profiles/_post_card.html). The markup is
+    cached per (post, post/author version, like and comment counts, viewer's
+    like state), so every viewer in the same state reuses one render; the
+    viewer's CSRF token is filled in after the cache lookup.
+    Usage: {% post_card post show_author=False show_comments=True %}
+    """
+    user = context.get('user')
+    authenticated = bool(user and user.is_authenticated)
+    liked = authenticated and bool(getattr(post, 'is_liked', False))
+    if not hasattr(post, 'cache_version'):
+        attach_post_cache_versions([post])
+
+    viewer_state = int(liked) if authenticated else 'anon'
+    key = ':'.join(str(part) for part in (
+        'post_card', post.pk, post.cache_version, post.like_count, post.comment_count,
+        viewer_state, int(show_author), int(show_comments),
+    ))
+    html = cache.get(key)
+    if html is None:
+        html = get_template('profiles/_post_card.html').render({
+            'post': post,
+            'show_author': show_author,
+            'show_comments': show_comments,
+            'authenticated': authenticated,
+            'liked': liked,
+            'comment_form': CommentForm(),
+            'csrf_token': CSRF_PLACEHOLDER,
+        })
+        cache.set(key, html, FRAGMENT_CACHE_TIMEOUT)
+
+    if authenticated:
+        html = html.replace(CSRF_PLACEHOLDER, str(context.get('csrf_token', '')))
+    return mark_safe(html)
@@ -0,0 +1,68 @@
+# profiles/testing.py
+
+"""
+Base class shared by the apps' tests (profiles/tests.py, posts/tests.py).
+"""
+
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .jobs import claim_jobs, run_job
+
+PASSWORD = 'pw12345!x'
+
+
+class LinkUpTestCase(TestCase):
+    """
+    Starts every test with an empty cache and, whatever JOBS_RUN_INLINE says,
+    with background jobs run inline after commit (``jobs_inline = False``
+    leaves them queued as Job rows instead). Subclasses build their data in
+    set_up_data(); the jobs it queues have run by the time a test starts.
+    """
+    jobs_inline = True
+
+    def setUp(self):
+        cache.clear()
+        inline = mock.patch('profiles.jobs.JOBS_RUN_INLINE', self.jobs_inline)
+        inline.start()
+        self.addCleanup(inline.stop)
+        with self.committed():
+            self.set_up_data()
+
+    def set_up_data(self):
+        pass
+
+    def committed(self):
+        """
+        Context manager running the on-commit callbacks (inline jobs, cache
+        write-throughs) of its block when it exits, as a real commit would.
+        TestCase never commits, so they would not run otherwise.
+        """
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def create_users(self, *usernames):
+        return [User.objects.create_user(name, f'{name}@example.com', PASSWORD) for name in usernames]
+
+    def use_temp_media_root(self):
+        """
+        Points MEDIA_ROOT at an empty temporary directory for the rest of the test.
+        """
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        return media.name
+
+    def run_queued_jobs(self, worker='test-worker'):
+        """
+        Runs the due Job rows once, as one poll of a worker would. Returns the jobs run.
+        """
+        jobs = claim_jobs(worker)
+        for job in jobs:
+            run_job(job)
+        return jobs
@@ -1,3 +1,699 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from PIL import Image
+
+from posts.models import Post
+
+from . import graph
+from .accounts import email_taken, provision_users
+from .datasets import DATASETS, FORMATS, export_rows
+from .images import DERIVATIVE_QUEUE_TIMEOUT, IMAGE_SPECS, derivative_name, get_derivatives
+from .jobs import (
+    JOB_LOCK_TIMEOUT, JOB_RETRY_BASE_DELAY, TASKS,
+    enqueue, heartbeat, release_stale_jobs, retry_delay, work,
+)
+from .media import MEDIA_CACHE_MAX_AGE, serve_media
+from .models import Job, Skill, Suggestion, UserProfile
+from .profiling import QueryBudgetExceeded
+from .routing import (
+    REPLICA_PIN_COOKIE, REPLICA_PIN_SECONDS, ReplicaRouter, ReplicaRoutingMiddleware, _use_replica, read_replica,
+)
+from .search import search_profiles
+from .stats import _cache_key as stats_cache_key, adjust_stats, compute_stats, get_stats
+from .suggestions import get_suggested_users, refresh_suggestions
+from .testing import LinkUpTestCase
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTests(LinkUpTestCase):
+    """
+    Renders every @query_budget view on a small network, so a view that
+    goes over its budget (an N+1 regression) fails with QueryBudgetExceeded.
+    """
+
+    def set_up_data(self):
+        self.users = self.create_users('alice', 'bob', 'carol', 'dave')
+        self.client.force_login(self.users[0])
+
+        # Built through the write views, so counters, timelines and stats are what production keeps
+        self.client.post('/edit_profile/', {'bio': 'Backend developer', 'skills': 'Python, Django, SQL'})
+        for other in self.users[1:]:
+            self.client.force_login(other)
+            self.client.post('/edit_profile/', {'bio': f'{other.username} here', 'skills': 'Python, Go'})
+            self.client.post('/posts/create/', {'content': f'Hello from {other.username}'})
+            self.client.post('/posts/create/', {'content': f'Learning Python with {other.username}'})
+            self.client.post('/profile/alice/follow/')
+            self.client.post('/profile/alice/endorse/', {'skill': 'Python'})
+        self.client.force_login(self.users[0])
+        for other in self.users[1:]:
+            self.client.post(f'/profile/{other.username}/follow/')
+        for post in self.users[1].user_posts.all():
+            self.client.post(f'/posts/{post.pk}/like/', {'liked': '1'})
+            self.client.post(f'/posts/{post.pk}/comment/', {'content': 'Nice one'})
+
+    def assertRendersWithinBudget(self, url, **extra):
+        # Twice: cold caches first, then the cached path
+        for _ in range(2):
+            response = self.client.get(url, **extra)
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_signed_in_pages(self):
+        for url in (
+            '/', '/?page=2', '/explore/', '/profile/bob/', '/profile/alice/',
+            '/profile/bob/posts/', '/search/?query=python', '/skills/autocomplete/?q=py',
+        ):
+            with self.subTest(url=url):
+                self.assertRendersWithinBudget(url)
+
+    def test_anonymous_pages(self):
+        self.client.logout()
+        for url in ('/explore/', '/profile/bob/', '/profile/bob/posts/', '/search/?query=python'):
+            with self.subTest(url=url):
+                self.assertRendersWithinBudget(url)
+
+    def test_exceeding_the_budget_raises(self):
+        view = resolve('/search/').func
+        with mock.patch.object(view, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/search/?query=python')
+
+
+class BenchmarkSmokeTests(LinkUpTestCase):
+    """
+    Runs the benchmark on a generated graph: every scenario must answer
+    without a 4xx/5xx (benchmark_views raises CommandError on one).
+    """
+
+    def test_generated_graph_benchmarks_cleanly(self):
+        call_command('generate_social_graph', users=50, stdout=StringIO())
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            # An empty baseline, so the checked-in one can't affect the result
+            call_command('benchmark_views', iterations=2, baseline=os.path.join(tmp, 'baseline.json'), stdout=out)
+        for scenario in ('home', 'explore_posts', 'profile_detail', 'search_users', 'like_post', 'follow_user'):
+            self.assertIn(scenario, out.getvalue())
+
+
+class DerivativeQueueTests(LinkUpTestCase):
+    """
+    A derivative that goes missing after its build job finished is queued again.
+    """
+    jobs_inline = False
+
+    def set_up_data(self):
+        self.use_temp_media_root()
+        buffer = BytesIO()
+        Image.new('RGB', (600, 400), 'teal').save(buffer, format='JPEG')
+        self.name = default_storage.save('post_images/sunset.jpg', ContentFile(buffer.getvalue()))
+        self.image = Post(image=self.name).image
+
+    def test_deleted_derivative_is_requeued(self):
+        self.assertIsNone(get_derivatives(self.image, 'feed'))
+        self.assertEqual(len(self.run_queued_jobs()), 1)
+        derivatives = get_derivatives(self.image, 'feed')
+        self.assertIn('jpeg', derivatives)
+
+        for fmt in derivatives:
+            for width in IMAGE_SPECS['feed']['widths']:
+                name = derivative_name(self.name, 'feed', width, fmt)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+        # The URL set and the queued marker have expired
+        cache.clear()
+
+        with mock.patch('profiles.tasks.time.time', return_value=time.time() + DERIVATIVE_QUEUE_TIMEOUT):
+            self.assertIsNone(get_derivatives(self.image, 'feed'))
+        self.assertEqual(Job.objects.filter(name='profiles.build_image_derivatives').count(), 2)
+        self.assertEqual(len(self.run_queued_jobs()), 1)
+        self.assertIn('jpeg', get_derivatives(self.image, 'feed'))
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    """
+    A job that runs longer than JOB_LOCK_TIMEOUT keeps its lock while its worker is alive.
+    (A TransactionTestCase: the heartbeat thread writes on its own connection.)
+    """
+
+    def test_long_job_is_not_released(self):
+        released = []
+
+        def slow():
+            time.sleep(0.5)  # Well past JOB_LOCK_TIMEOUT, a few heartbeats
+            released.append(release_stale_jobs())
+
+        slow.max_attempts = 1
+        job = Job.objects.create(name='tests.slow', payload={})
+        with mock.patch.dict(TASKS, {'tests.slow': slow}), \
+                mock.patch('profiles.jobs.JOB_LOCK_TIMEOUT', timedelta(milliseconds=200)), \
+                mock.patch('profiles.jobs.JOB_HEARTBEAT_INTERVAL', timedelta(milliseconds=20)):
+            self.assertEqual(work(once=True), 1)
+
+        self.assertEqual(released, [0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 1))
+
+
+class JobQueueTests(LinkUpTestCase):
+    """
+    The Job table: idempotency keys, retries with backoff and stale lock release.
+    """
+    jobs_inline = False
+
+    def set_up_data(self):
+        self.calls = []
+
+        def flaky(fail):
+            self.calls.append(fail)
+            if fail:
+                raise RuntimeError('boom')
+
+        flaky.task_name, flaky.max_attempts = 'tests.flaky', 2
+        tasks = mock.patch.dict(TASKS, {'tests.flaky': flaky})
+        tasks.start()
+        self.addCleanup(tasks.stop)
+
+    def test_idempotency_key(self):
+        first = enqueue('tests.flaky', {'fail': False}, key='once')
+        self.assertEqual(enqueue('tests.flaky', {'fail': False}, key='once'), first)
+        enqueue('tests.flaky', {'fail': False})
+        enqueue('tests.flaky', {'fail': False})
+        self.assertEqual(Job.objects.count(), 3)
+
+        self.run_queued_jobs()
+        self.assertEqual(self.calls, [False] * 3)
+        # A finished job still holds its key
+        self.assertEqual(enqueue('tests.flaky', {'fail': False}, key='once'), first)
+
+    def test_retry_with_backoff_then_fail(self):
+        job = enqueue('tests.flaky', {'fail': True})
+        with self.assertLogs('profiles.jobs', 'WARNING'):
+            self.run_queued_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        # Not due yet
+        self.assertEqual(self.run_queued_jobs(), [])
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('profiles.jobs', 'WARNING'):
+            self.run_queued_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(self.calls, [True, True])
+
+    def test_retry_delay_grows_exponentially(self):
+        delays = [retry_delay(attempt).total_seconds() for attempt in (1, 2, 3)]
+        for attempt, delay in enumerate(delays):
+            base = JOB_RETRY_BASE_DELAY * 2 ** attempt
+            self.assertTrue(base <= delay <= base * 1.2, delays)
+
+    def test_stale_jobs_are_released(self):
+        now = timezone.now()
+        dead = Job.objects.create(
+            name='tests.flaky', payload={'fail': False}, status=Job.RUNNING,
+            locked_by='gone:1', locked_at=now - JOB_LOCK_TIMEOUT - timedelta(minutes=1),
+        )
+        alive = Job.objects.create(
+            name='tests.flaky', payload={'fail': False}, status=Job.RUNNING, locked_by='here:1', locked_at=now,
+        )
+        self.assertEqual(release_stale_jobs(), 1)
+        dead.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((dead.status, dead.locked_by, dead.locked_at), (Job.PENDING, '', None))
+        self.assertEqual(alive.status, Job.RUNNING)
+
+        # The released job runs again; a heartbeat keeps the live one's lock fresh
+        self.assertEqual([job.pk for job in self.run_queued_jobs()], [dead.pk])
+        self.assertEqual(heartbeat('here:1'), 1)
+
+
+class SuggestionTests(LinkUpTestCase):
+    """
+    People You May Know: friends-of-friends ranking and the sidebar's background refresh.
+    """
+
+    def set_up_data(self):
+        users = self.create_users('alice', 'bob', 'carol', 'dave', 'erin')
+        self.alice, self.bob, self.carol, self.dave, self.erin = [user.userprofile for user in users]
+        for profile, skills in ((self.alice, 'Python, Go, SQL'), (self.erin, 'python, SQL, Go'), (self.dave, 'Rust')):
+            profile.skills = skills
+            profile.save()
+        for follower, followed in (
+            (self.alice, self.bob), (self.alice, self.carol),
+            (self.bob, self.dave), (self.bob, self.erin), (self.carol, self.dave),
+        ):
+            graph.follow(follower, followed)
+
+    def suggestions(self, profile):
+        return list(
+            Suggestion.objects.filter(owner=profile).order_by('-score')
+            .values_list('suggested__user__username', 'mutual_count', 'shared_skills')
+        )
+
+    def test_ranking(self):
+        self.assertEqual(refresh_suggestions(self.alice), 2)
+        # erin: one mutual connection plus three shared skills beats dave's two mutual connections
+        self.assertEqual(self.suggestions(self.alice), [('erin', 1, 3), ('dave', 2, 0)])
+
+    def test_follow_updates_stored_suggestions(self):
+        refresh_suggestions(self.alice)
+        self.client.force_login(self.alice.user)
+        with self.committed():
+            self.client.post('/profile/erin/follow/')
+        self.assertEqual(self.suggestions(self.alice), [('dave', 2, 0)])
+
+    def test_sidebar_refreshes_in_the_background(self):
+        with self.committed():
+            # Nothing stored yet: the sidebar is empty rather than computed in the request
+            self.assertEqual(get_suggested_users(self.alice.user), [])
+        users = get_suggested_users(self.alice.user)
+        self.assertEqual([user.username for user in users], ['erin', 'dave'])
+
+
+class SearchTests(LinkUpTestCase):
+    """
+    Ranked user search: field weights, prefix matching and re-indexing.
+    """
+
+    def set_up_data(self):
+        users = self.create_users('pythonista', 'bob', 'carol', 'dave')
+        for user, fields in zip(users, (
+            {'job_title': 'Chef'},
+            {'job_title': 'Python developer'},
+            {'bio': 'I like python and hiking'},
+            {'bio': 'Gardening'},
+        )):
+            UserProfile.objects.filter(pk=user.userprofile.pk).update(**fields)
+            user.userprofile.refresh_from_db()
+            user.userprofile.save()
+        self.dave = users[3]
+
+    def usernames(self, query):
+        return [profile.user.username for profile in search_profiles(query)]
+
+    def test_ranking_by_field_weight(self):
+        self.assertEqual(self.usernames('python'), ['pythonista', 'bob', 'carol'])
+
+    def test_tokens_are_prefixes_and_all_must_match(self):
+        self.assertEqual(self.usernames('PYTH'), ['pythonista', 'bob', 'carol'])
+        self.assertEqual(self.usernames('pyth dev'), ['bob'])
+        self.assertEqual(self.usernames('python chef'), ['pythonista'])
+        self.assertEqual(self.usernames('cobol'), [])
+        self.assertEqual(self.usernames('  !! '), [])
+
+    def test_rename_is_reindexed(self):
+        with self.committed():
+            self.dave.username = 'pythonfan'
+            self.dave.save()
+        self.assertIn('pythonfan', self.usernames('python'))
+
+
+class SkillMigrationTests(TransactionTestCase):
+    """
+    Migration 0016 turns free-text skills into Skill rows, keeping one
+    endorsement per normalized skill.
+    (A TransactionTestCase: it migrates the test database back and forth.)
+    """
+    migrate_from = [('profiles', '0015_skill_profileskill')]
+    migrate_to = [('profiles', '0016_populate_skills')]
+
+    def setUp(self):
+        self.addCleanup(call_command, 'migrate', verbosity=0)
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+
+        User = apps.get_model('auth', 'User')
+        UserProfile = apps.get_model('profiles', 'UserProfile')
+        Endorsement = apps.get_model('profiles', 'Endorsement')
+        alice = UserProfile.objects.create(
+            user=User.objects.create(username='alice'), skills='Python,  Django , python, , Machine   Learning',
+        )
+        bob = UserProfile.objects.create(user=User.objects.create(username='bob'), skills='Go')
+        self.python = Endorsement.objects.create(profile=alice, endorser=bob, skill='Python')
+        Endorsement.objects.create(profile=alice, endorser=bob, skill='python ')
+        self.rust = Endorsement.objects.create(profile=alice, endorser=bob, skill='Rust')
+
+    def test_populate_skills(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        apps = executor.loader.project_state(self.migrate_to).apps
+        Skill = apps.get_model('profiles', 'Skill')
+        ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+        Endorsement = apps.get_model('profiles', 'Endorsement')
+
+        self.assertEqual(
+            sorted(Skill.objects.values_list('normalized', 'name')),
+            [('django', 'Django'), ('go', 'Go'), ('machine learning', 'Machine Learning'),
+             ('python', 'Python'), ('rust', 'Rust')],
+        )
+        self.assertEqual(
+            list(ProfileSkill.objects.filter(profile__user__username='alice')
+                 .order_by('position').values_list('skill__normalized', flat=True)),
+            ['python', 'django', 'machine learning'],
+        )
+        # The two spellings of Python collapse into the older endorsement
+        self.assertEqual(
+            sorted(Endorsement.objects.values_list('pk', 'skill_ref__normalized')),
+            sorted([(self.python.pk, 'python'), (self.rust.pk, 'rust')]),
+        )
+
+
+class ProfileStatsTests(LinkUpTestCase):
+    """
+    The ProfileStats counters follow every write path, and their cache is
+    dropped only once the write commits.
+    """
+
+    def set_up_data(self):
+        self.alice, self.bob = self.create_users('alice', 'bob')
+        self.client.force_login(self.bob)
+        self.client.post('/posts/create/', {'content': 'Hello'})
+        self.post = Post.objects.get(user=self.bob)
+
+    def test_write_paths_adjust_the_counters(self):
+        self.assertEqual(get_stats(self.bob.pk)['post_count'], 1)
+        self.client.force_login(self.alice)
+        with self.committed():
+            self.client.post(f'/posts/{self.post.pk}/like/', {'liked': '1'})
+            self.client.post('/profile/bob/follow/')
+            self.client.post('/profile/bob/endorse/', {'skill': 'Python'})
+
+        stats = get_stats(self.bob.pk)
+        self.assertEqual(stats, compute_stats(self.bob.pk))
+        self.assertEqual(
+            (stats['likes_received'], stats['followers_count'], stats['endorsement_counts']), (1, 1, {'Python': 1}),
+        )
+        self.assertEqual(get_stats(self.alice.pk)['following_count'], 1)
+
+    def test_cache_is_dropped_after_commit(self):
+        before = get_stats(self.bob.pk)
+        with self.committed():
+            adjust_stats(self.bob.pk, likes_received=2)
+            # A concurrent reader refills the cache from the not yet committed row
+            cache.set(stats_cache_key(self.bob.pk), before)
+        self.assertEqual(get_stats(self.bob.pk)['likes_received'], 2)
+
+    def test_rolled_back_change_keeps_the_cache(self):
+        before = get_stats(self.bob.pk)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            adjust_stats(self.bob.pk, likes_received=2)
+            raise RuntimeError
+        self.assertEqual(cache.get(stats_cache_key(self.bob.pk)), before)
+        self.assertEqual(get_stats(self.bob.pk), compute_stats(self.bob.pk))
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Reads go to a replica only inside @read_replica views, and a browser
+    that just wrote is pinned to the primary.
+    """
+
+    def setUp(self):
+        replicas = mock.patch('profiles.routing.REPLICA_DATABASES', ['replica'])
+        replicas.start()
+        self.addCleanup(replicas.stop)
+        self.factory = RequestFactory()
+
+    def route(self, request, view):
+        """
+        Runs ``request`` through the middleware; returns (response, database a read would use).
+        """
+        used = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            used.append(ReplicaRouter().db_for_read(Post) or 'default')
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return response, used[0]
+
+    def test_routing(self):
+        replica_view = read_replica(lambda request: None)
+        plain_view = lambda request: None
+
+        self.assertEqual(self.route(self.factory.get('/'), replica_view)[1], 'replica')
+        self.assertEqual(self.route(self.factory.get('/'), plain_view)[1], 'default')
+        self.assertEqual(self.route(self.factory.post('/'), replica_view)[1], 'default')
+        # Only while the view runs
+        self.assertIsNone(ReplicaRouter().db_for_read(Post))
+
+    def test_write_pins_the_browser_to_the_primary(self):
+        response, _ = self.route(self.factory.post('/'), read_replica(lambda request: None))
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[REPLICA_PIN_COOKIE]['max-age'], REPLICA_PIN_SECONDS)
+
+        request = self.factory.get('/')
+        request.COOKIES[REPLICA_PIN_COOKIE] = '1'
+        response, database = self.route(request, read_replica(lambda request: None))
+        self.assertEqual(database, 'default')
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_reads_in_a_write_transaction_stay_on_the_primary(self):
+        token = _use_replica.set(True)
+        self.addCleanup(_use_replica.reset, token)
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(ReplicaRouter().db_for_read(Post), 'default')
+
+
+class DatasetRoundTripTests(LinkUpTestCase):
+    """
+    export_data followed by import_data into an empty database restores every dataset.
+    """
+
+    def set_up_data(self):
+        self.alice, self.bob = self.create_users('alice', 'bob')
+        self.client.force_login(self.alice)
+        self.client.post('/edit_profile/', {'bio': 'Line one\nLine "two", with a comma', 'skills': 'Python, Go'})
+        self.client.post('/posts/create/', {'content': 'Café, ünïcode and "quotes"'})
+        self.client.force_login(self.bob)
+        self.client.post('/profile/alice/follow/')
+        self.client.post('/profile/alice/endorse/', {'skill': 'Python'})
+        post = Post.objects.get()
+        self.client.post(f'/posts/{post.pk}/like/', {'liked': '1'})
+        self.client.post(f'/posts/{post.pk}/comment/', {'content': 'Nice'})
+
+    def snapshot(self):
+        return {name: list(export_rows(name)) for name in DATASETS}
+
+    def test_round_trip(self):
+        for fmt in FORMATS:
+            with self.subTest(format=fmt), tempfile.TemporaryDirectory() as tmp:
+                before = self.snapshot()
+                self.assertTrue(all(before.values()))
+                call_command('export_data', output=tmp, format=fmt, stdout=StringIO())
+
+                User.objects.all().delete()
+                Skill.objects.all().delete()
+                self.assertFalse(any(self.snapshot().values()))
+
+                call_command('import_data', tmp, stdout=StringIO())
+                self.assertEqual(self.snapshot(), before)
+                self.assertFalse(User.objects.get(username='alice').has_usable_password())
+
+    def test_import_skips_existing_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command('export_data', 'posts', output=tmp, stdout=StringIO())
+            Post.objects.update(content='Edited')
+            call_command('import_data', tmp, stdout=StringIO())
+            self.assertEqual(Post.objects.get().content, 'Edited')
+            call_command('import_data', tmp, on_conflict='update', stdout=StringIO())
+            self.assertEqual(Post.objects.get().content, 'Café, ünïcode and "quotes"')
+
+
+class AccountTests(LinkUpTestCase):
+    """
+    Case-insensitive email uniqueness, single-transaction signup and bulk provisioning.
+    """
+
+    def set_up_data(self):
+        (self.alice,) = self.create_users('alice')
+
+    def signup(self, username, email):
+        return self.client.post('/signup/', {
+            'username': username, 'email': email, 'first_name': '', 'last_name': '',
+            'password1': 'Zebra-Cactus-91', 'password2': 'Zebra-Cactus-91',
+        })
+
+    def test_signup_creates_user_and_profile(self):
+        response = self.signup('bob', 'bob@example.com')
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertTrue(UserProfile.objects.filter(user__username='bob').exists())
+
+    def test_email_is_unique_ignoring_case(self):
+        self.assertTrue(email_taken('ALICE@Example.com'))
+        response = self.signup('bob', 'Alice@EXAMPLE.com')
+        self.assertContains(response, 'This email is already registered.')
+        self.assertFalse(User.objects.filter(username='bob').exists())
+
+        # Enforced by the database too, not only by the form
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('bob', 'aLiCe@example.com')
+        # Blank addresses don't collide
+        User.objects.create_user('nomail1', '')
+        User.objects.create_user('nomail2', '')
+
+    def test_provision_users(self):
+        with self.committed():
+            created, skipped = provision_users([
+                {'username': 'erin', 'email': 'Erin@Example.com', 'job_title': 'Data engineer', 'skills': 'Python, Go'},
+                {'username': 'frank', 'email': 'erin@example.com'},
+                {'username': 'alice', 'email': 'new@example.com'},
+                {'username': 'gina', 'email': 'ALICE@example.com'},
+                {'username': '', 'email': 'nobody@example.com'},
+            ], batch_size=2)
+
+        self.assertEqual(created, ['erin'])
+        self.assertEqual(sorted(skipped), [
+            ('', "no username"),
+            ('alice', "username already exists"),
+            ('frank', "duplicate email in input"),
+            ('gina', "email already registered"),
+        ])
+        erin = UserProfile.objects.get(user__username='erin')
+        self.assertEqual(erin.job_title, 'Data engineer')
+        self.assertEqual(
+            list(erin.profile_skills.order_by('position').values_list('skill__name', flat=True)), ['Python', 'Go'],
+        )
+        self.assertEqual([profile.user.username for profile in search_profiles('data eng')], ['erin'])
+
+
+class FollowGraphCacheTests(LinkUpTestCase):
+    """
+    The cached follow graph: follow/unfollow write through to the cached arrays.
+    """
+
+    def set_up_data(self):
+        users = self.create_users('alice', 'bob', 'carol')
+        self.alice, self.bob, self.carol = [user.userprofile for user in users]
+
+    def test_follow_writes_through(self):
+        # Load (and cache) the arrays first
+        self.assertEqual(list(graph.following_ids(self.alice.user_id)), [])
+        self.assertEqual(graph.counts(self.bob.user_id), (0, 0))
+
+        with self.committed():
+            self.assertTrue(graph.follow(self.alice, self.bob))
+            self.assertFalse(graph.follow(self.alice, self.bob))
+        with self.assertNumQueries(0):
+            self.assertTrue(graph.is_following(self.alice.user_id, self.bob.user_id))
+            self.assertEqual(list(graph.following_ids(self.alice.user_id)), [self.bob.user_id])
+            self.assertEqual(graph.counts(self.bob.user_id), (0, 1))
+
+        with self.committed():
+            self.assertTrue(graph.unfollow(self.alice, self.bob))
+        with self.assertNumQueries(0):
+            self.assertFalse(graph.is_following(self.alice.user_id, self.bob.user_id))
+            self.assertEqual(graph.counts(self.bob.user_id), (0, 0))
+
+    def test_uncached_arrays_are_read_fresh(self):
+        with self.committed():
+            graph.follow(self.alice, self.bob)
+        self.assertTrue(graph.is_following(self.alice.user_id, self.bob.user_id))
+
+    def test_mutual_connections(self):
+        with self.committed():
+            for follower, followed in ((self.alice, self.carol), (self.carol, self.bob), (self.alice, self.bob)):
+                graph.follow(follower, followed)
+        self.assertEqual(graph.mutual_ids(self.alice.user_id, self.bob.user_id), [self.carol.user_id])
+
+    def test_long_lists_cache_only_their_length(self):
+        with mock.patch('profiles.graph.GRAPH_MAX_CACHED_IDS', 1), self.committed():
+            graph.follow(self.alice, self.bob)
+            graph.follow(self.carol, self.bob)
+        with mock.patch('profiles.graph.GRAPH_MAX_CACHED_IDS', 1):
+            self.assertEqual(graph.counts(self.bob.user_id), (0, 2))
+            self.assertEqual(list(graph.follower_ids(self.bob.user_id)), sorted([self.alice.user_id, self.carol.user_id]))
+
+    def test_bulk_changes_invalidate_the_graph(self):
+        self.assertEqual(graph.counts(self.bob.user_id), (0, 0))
+        self.alice.following.add(self.bob)  # Bypasses follow(), like the admin
+        self.assertEqual(graph.counts(self.bob.user_id), (0, 1))
+
+
+class MediaServingTests(LinkUpTestCase):
+    """
+    serve_media: cache headers, conditional requests and byte ranges.
+    """
+    body = bytes(range(100))
+
+    def set_up_data(self):
+        media_root = self.use_temp_media_root()
+        self.name = 'post_images/0123456789abcdef.jpg'
+        os.makedirs(os.path.join(media_root, 'post_images'))
+        with open(os.path.join(media_root, self.name), 'wb') as f:
+            f.write(self.body)
+        self.factory = RequestFactory()
+
+    def get(self, path=None, **headers):
+        response = serve_media(self.factory.get('/', headers=headers), path or self.name)
+        self.addCleanup(response.close)
+        return response
+
+    def content(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_response(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), self.body)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_conditional_get(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(if_none_match='"other"').status_code, 200)
+
+    def test_ranges(self):
+        response = self.get(range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(self.content(response), self.body[10:20])
+
+        response = self.get(range='bytes=-5')
+        self.assertEqual(self.content(response), self.body[-5:])
+
+        response = self.get(range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+        # A stale If-Range gets the whole current file
+        self.assertEqual(self.get(range='bytes=10-19', if_range='"old"').status_code, 200)
+
+    def test_missing_and_unhashed_files(self):
+        with self.assertRaises(Http404):
+            self.get('post_images/missing.jpg')
+        default_storage.save('avatars/me.jpg', ContentFile(self.body))
+        self.assertEqual(self.get('avatars/me.jpg')['Cache-Control'], f'public, max-age={MEDIA_CACHE_MAX_AGE}')
+
+    def test_uploads_are_named_by_content(self):
+        (user,) = self.create_users('bob')
+        first = Post.objects.create(user=user, content='One')
+        second = Post.objects.create(user=user, content='Two')
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'red').save(buffer, format='PNG')
+        first.image.save('Photo.PNG', ContentFile(buffer.getvalue()))
+        second.image.save('other-name.png', ContentFile(buffer.getvalue()))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^post_images/[0-9a-f]{16}\.png$')
@@ -1,16 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Under an ASGI server (ASYNC_VIEWS=True) the read-heavy views are served by their async versions
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'profiles'
 
 urlpatterns = [
     # --- CORE APPLICATION VIEWS ---
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('signup/', views.signup_view, name='signup'),
 
     # --- PROFILE VIEWS ---
     path('edit_profile/', views.edit_profile, name='edit_profile'),
-    path('profile/<str:username>/', views.profile_detail, name='profile_detail'),
+    path('profile/<str:username>/', read_views.profile_detail, name='profile_detail'),
     path('profile/<str:username>/follow/', views.follow_user, name='follow_user'),
     path('profile/<str:username>/endorse/', views.add_endorsement, name='add_endorsement'),
 
@@ -19,6 +23,10 @@ urlpatterns = [
     path('posts/create/', views.create_post, name='create_post'),
 
     # --- DISCOVERY & SEARCH ---
-    path('search/', views.search_users, name='search_users'),
-    path('explore/', views.explore_posts, name='explore_posts'),
+    path('search/', read_views.search_users, name='search_users'),
+    path('explore/', read_views.explore_posts, name='explore_posts'),
+    path('skills/autocomplete/', views.skill_autocomplete, name='skill_autocomplete'),
+
+    # --- STAFF ---
+    path('staff/export/<slug:dataset>/', views.export_data, name='export_data'),
 ]
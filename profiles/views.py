@@ -5,17 +5,34 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
-from django.db import IntegrityError
-from django.db.models import Q, Exists, OuterRef, Value, BooleanField
-from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Value, BooleanField
 from django.utils import timezone 
 from django.contrib import messages 
+from django.http import JsonResponse, StreamingHttpResponse, Http404
+from django.core.handlers.asgi import ASGIRequest
+from django.contrib.admin.views.decorators import staff_member_required
 
 # 🌟 CRITICAL FIX: Import Post, Like, Comment from the 'posts' app
-from posts.models import Post, Like, Comment 
+from posts.models import Post, Like 
+from posts.comments import attach_comment_previews
+from posts.pagination import paginate_posts
+from posts.timeline import timeline_entries, hydrate_page
+from posts.trending import schedule_update, score_new_post, trending_scores
 
 # Import local models
 from .models import UserProfile, Endorsement 
+from .suggestions import get_suggested_users, on_follow, on_unfollow
+from .search import search_profiles
+from .skills import autocomplete_skills
+from .stats import get_stats, adjust_stats, adjust_endorsement_count
+from .caching import cache_anonymous_page, attach_post_cache_versions, get_version
+from .jobs import enqueue
+from .profiling import query_budget
+from .routing import read_replica
+from . import graph
+from .datasets import DATASETS, FORMATS, CONTENT_TYPES, stream_dataset, aiterate
+from .tasks import queue_derivatives
 from .forms import SignupForm, PostForm, ProfileForm, CommentForm, SearchForm, EndorsementForm
 
 
@@ -26,14 +43,17 @@ from .forms import SignupForm, PostForm, ProfileForm, CommentForm, SearchForm, E
 def signup_view(request):
     form = SignupForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
-        user = form.save()
         try:
-            UserProfile.objects.create(user=user)
+            # The user row and (via the post_save signal) its profile row commit together
+            with transaction.atomic():
+                user = form.save()
         except IntegrityError:
-            pass
-        login(request, user)
-        messages.success(request, "Registration successful! Welcome to LinkUp.")
-        return redirect('profiles:home')
+            # A concurrent signup took the username or email after validation
+            form.add_error(None, "That username or email was just registered. Please choose another.")
+        else:
+            login(request, user)
+            messages.success(request, "Registration successful! Welcome to LinkUp.")
+            return redirect('profiles:home')
     return render(request, 'profiles/signup.html', {'form': form})
 
 
@@ -58,6 +78,9 @@ def custom_logout_view(request):
 # Core Views (Feed/Home)
 # ===============================
 
+@cache_anonymous_page('feed')
+@read_replica
+@query_budget(15)
 def home(request):
     post_form = PostForm()
     comment_form = CommentForm()
@@ -66,35 +89,30 @@ def home(request):
     suggested_users = User.objects.none() 
 
     if request.user.is_authenticated:
-        # 1. Filter posts for the authenticated user's feed
-        following_profiles = request.user.userprofile.following.all()
-        posts_queryset = posts_queryset.filter(
-            Q(user__userprofile__in=following_profiles) | Q(user=request.user)
-        )
+        # 1. The feed itself is read from the precomputed timeline (see PAGINATION below)
         
         # 2. ANNOTATION: Determine if the post is liked by the user
         liked_subquery = Like.objects.filter(user=request.user, post=OuterRef('pk'))
         posts_queryset = posts_queryset.annotate(is_liked=Exists(liked_subquery))
         
-        # 3. PYMK LOGIC: Find suggested users
-        followed_user_pks = following_profiles.values_list('user__pk', flat=True)
-        exclude_pks = list(followed_user_pks) + [request.user.pk]
-        
-        suggested_users = User.objects.filter(
-            ~Q(pk__in=exclude_pks)
-        ).select_related('userprofile').order_by('?')[:5]
+        # 3. PYMK LOGIC: Read precomputed friends-of-friends suggestions (see suggestions.py)
+        suggested_users = get_suggested_users(request.user, limit=5)
 
     else:
         # ANNOTATION: For unauthenticated users, is_liked is always False
-        posts_queryset = posts_queryset[:25].annotate(is_liked=Value(False, output_field=BooleanField()))
+        posts_queryset = posts_queryset.annotate(is_liked=Value(False, output_field=BooleanField()))
 
-    # 4. PREFETCHING: Optimize post query 
-    posts_queryset = posts_queryset.select_related('user__userprofile').prefetch_related('likes', 'comments') 
+    # 4. JOINS: Like/comment totals come from the denormalized counters, so no prefetching
+    posts_queryset = posts_queryset.select_related('user__userprofile')
 
-    # 5. PAGINATION: Apply pagination to the full queryset
-    paginator = Paginator(posts_queryset, 50)
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    # 5. PAGINATION: Keyset pagination (falls back to ?page= for old links)
+    if request.user.is_authenticated:
+        # Page through the user's timeline rows, then load only that page's posts
+        posts = paginate_posts(request, timeline_entries(request.user), 50, ordering=('created_at', 'post_id'))
+        hydrate_page(posts, posts_queryset)
+    else:
+        posts = paginate_posts(request, posts_queryset, 25)
+    attach_post_cache_versions(posts)
 
     context = {
         'posts': posts,
@@ -122,6 +140,13 @@ def create_post(request):
         # Ensure the post is linked to the currently logged-in user
         post.user = request.user 
         post.save()
+        adjust_stats(request.user.pk, post_count=1)
+        # Timeline fan-out and image resizing run in the job queue, not in the request
+        enqueue('posts.fan_out_post', {'post_id': post.pk}, key=f'fan-out:{post.pk}')
+        score_new_post(post)  # On explore now, not at the next trending update
+        schedule_update()
+        if post.image:
+            queue_derivatives(post.image.name, 'feed')
         messages.success(request, "Your post has been successfully created!")
         # Redirect to the user's post list/feed after creation
         return redirect('profiles:post_list', username=request.user.username) 
@@ -130,6 +155,8 @@ def create_post(request):
     return render(request, 'profiles/create_post.html', {'form': form})
 
 
+@read_replica
+@query_budget(8)
 def post_list_view(request, username):
     """
     Displays a paginated list of all posts for a specific user.
@@ -148,13 +175,14 @@ def post_list_view(request, username):
     else:
         posts_queryset = posts_queryset.annotate(is_liked=Value(False, output_field=BooleanField()))
         
-    # 4. PREFETCHING: Optimize query
-    posts_queryset = posts_queryset.select_related('user__userprofile').prefetch_related('likes', 'comments') 
+    # 4. JOINS: Like/comment totals come from the denormalized counters
+    posts_queryset = posts_queryset.select_related('user__userprofile')
         
-    # 5. PAGINATION
-    paginator = Paginator(posts_queryset, 10) # Show 10 posts per page
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    # 5. PAGINATION: Keyset pagination (falls back to ?page= for old links)
+    posts = paginate_posts(request, posts_queryset, 10) # Show 10 posts per page
+    # The latest two comments of every post on the page, in one windowed query
+    attach_comment_previews(posts)
+    attach_post_cache_versions(posts)
     
     context = {
         'profile': profile,
@@ -174,43 +202,53 @@ def edit_profile(request):
     profile = request.user.userprofile
     form = ProfileForm(request.POST or None, request.FILES or None, instance=profile)
     if request.method == 'POST' and form.is_valid():
-        form.save()
+        profile = form.save()
+        if 'image' in form.changed_data and profile.image:
+            queue_derivatives(profile.image.name, 'avatar')
         messages.success(request, "Profile updated successfully.")
         return redirect('profiles:profile_detail', username=request.user.username)
     return render(request, 'profiles/edit_profile.html', {'form': form})
 
 
+@read_replica
+@query_budget(22)
 def profile_detail(request, username):
-    user_obj = get_object_or_404(User, username=username)
+    user_obj = get_object_or_404(User.objects.select_related('userprofile'), username=username)
     profile = user_obj.userprofile
     
     # 🌟 CRITICAL FIX: Use the new related_name 'user_posts'
     # Fetch only a few posts for the detail view
     posts_queryset = user_obj.user_posts.all().order_by('-created_at')
     
-    # Calculate total likes received by the profile's posts
-    total_likes_received = Like.objects.filter(post__user=user_obj).count()
+    # Header aggregates (posts, likes received, follows, endorsements) come from
+    # the incrementally maintained, cached ProfileStats row
+    stats = get_stats(user_obj.pk)
     
-    # Determine follow status
+    # Follow status and mutual connections, from the cached follow graph (see graph.py)
     following_profile = False
+    mutual_count = 0
     
     # ANNOTATION: Prepare posts for display with like status
     if request.user.is_authenticated:
         liked_subquery = Like.objects.filter(user=request.user, post=OuterRef('pk'))
         posts_queryset = posts_queryset.annotate(is_liked=Exists(liked_subquery))
         
-        # Determine if the current user is following this profile
-        if request.user.userprofile != profile:
-            following_profile = request.user.userprofile.following.filter(pk=profile.pk).exists()
+        if request.user.pk != user_obj.pk:
+            following_profile = graph.is_following(request.user.pk, user_obj.pk)
+            mutual_count = len(graph.mutual_ids(request.user.pk, user_obj.pk))
     else:
         posts_queryset = posts_queryset.annotate(is_liked=Value(False, output_field=BooleanField()))
             
-    # Standard practice is to use Paginator even for a profile page (showing first page only)
-    paginator = Paginator(posts_queryset, 10)
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    posts = paginate_posts(request, posts_queryset, 10)
+    attach_post_cache_versions(posts)
         
-    endorsements = Endorsement.objects.filter(profile=profile).select_related('endorser__user')
+    # Only the five most recent endorsements are shown; totals per skill come from stats
+    endorsements = Endorsement.objects.filter(profile=profile).select_related('endorser__user', 'skill').order_by('-created_at')[:5]
+    endorsement_counts = stats['endorsement_counts']
+    skills = [
+        (skill, endorsement_counts.get(skill.name, 0))
+        for skill in profile.skill_tags.order_by('profile_skills__position')
+    ]
     endorsement_form = EndorsementForm()
     comment_form = CommentForm()
     
@@ -218,10 +256,13 @@ def profile_detail(request, username):
         'profile': profile,
         'posts': posts,
         'endorsements': endorsements,
+        'skills': skills,
         'endorsement_form': endorsement_form,
         'comment_form': comment_form,
-        'total_likes_received': total_likes_received,
+        'stats': stats,
+        'profile_cache_version': get_version(f'profile:{user_obj.pk}'),
         'following_profile': following_profile,
+        'mutual_count': mutual_count,
     })
 
 
@@ -239,14 +280,24 @@ def follow_user(request, username):
         messages.warning(request, "You cannot follow yourself.")
         return redirect('profiles:profile_detail', username=username)
         
-    is_following = current_profile.following.filter(pk=target_profile.pk).exists()
-
-    if is_following:
-        current_profile.following.remove(target_profile)
+    # The database write decides the toggle (not the cached graph, which may be stale in
+    # this process): delete the follow, or create it if there was none. Side effects run
+    # only for a row that actually changed, so a double submit can't count twice.
+    if graph.unfollow(current_profile, target_profile):
+        enqueue('posts.trim_unfollow', {'follower_id': request.user.pk, 'unfollowed_id': target_user.pk})
+        on_unfollow(current_profile, target_profile)
+        adjust_stats(target_user.pk, followers_count=-1)
+        adjust_stats(request.user.pk, following_count=-1)
         messages.info(request, f"You are no longer following {username}.")
-    else:
-        current_profile.following.add(target_profile)
+    elif graph.follow(current_profile, target_profile):
+        enqueue('posts.backfill_follow', {'follower_id': request.user.pk, 'followed_id': target_user.pk})
+        on_follow(current_profile, target_profile)
+        adjust_stats(target_user.pk, followers_count=1)
+        adjust_stats(request.user.pk, following_count=1)
         messages.success(request, f"You are now following {username}.")
+    else:
+        # A concurrent request created the follow between the delete and the insert
+        messages.info(request, f"You are already following {username}.")
 
     # Safely get HTTP_REFERER for redirect, falling back to profile_detail
     return redirect(request.META.get('HTTP_REFERER', redirect('profiles:profile_detail', username=username).url))
@@ -268,6 +319,7 @@ def add_endorsement(request, username):
             endorsement.profile = profile_to_endorse
             endorsement.endorser = request.user.userprofile
             endorsement.save()
+            adjust_endorsement_count(profile_user.pk, endorsement.skill.name, 1)
             messages.success(request, f"Endorsement added for {username}.")
         except IntegrityError:
             messages.warning(request, f"You have already endorsed {username}.")
@@ -279,28 +331,49 @@ def add_endorsement(request, username):
 # Discovery & Search
 # ===============================
 
+@read_replica
+@query_budget(8)
 def search_users(request):
     form = SearchForm(request.GET)
-    results = UserProfile.objects.none()
-    
+    results = []
+    per_page = 20
+
+    # Page numbers only; ranked results are fetched per_page + 1 at a time, never counted
+    try:
+        page_number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page_number = 1
+
     if form.is_valid():
         query = form.cleaned_data['query']
-        results = UserProfile.objects.filter(
-            Q(user__username__icontains=query) |
-            Q(job_title__icontains=query) | 
-            Q(location__icontains=query) | 
-            Q(bio__icontains=query) |
-            Q(skills__icontains=query)
-        ).select_related('user')
+        results = search_profiles(query, offset=(page_number - 1) * per_page, limit=per_page + 1)
+
+    has_next = len(results) > per_page
+    results = results[:per_page]
         
     return render(request, 'profiles/search_results.html', { 
         'form': form,
-        'results': results
+        'results': results,
+        'page_number': page_number,
+        'has_next': has_next,
+        'has_previous': page_number > 1,
     })
 
 
+@query_budget(3)
+def skill_autocomplete(request):
+    """
+    Returns skills starting with ?q= as JSON, for autocomplete widgets.
+    """
+    skills = autocomplete_skills(request.GET.get('q', ''))
+    return JsonResponse({'skills': [skill.name for skill in skills]})
+
+
+@cache_anonymous_page('feed')
+@read_replica
+@query_budget(8)
 def explore_posts(request):
-    posts_queryset = Post.objects.all().order_by('-created_at')
+    posts_queryset = Post.objects.all()
     comment_form = CommentForm()
     
     # ANNOTATION: Efficiently determine if the post is liked by the current user
@@ -310,15 +383,39 @@ def explore_posts(request):
     else:
         posts_queryset = posts_queryset.annotate(is_liked=Value(False, output_field=BooleanField()))
 
-    # PREFETCHING: Optimize query
-    posts_queryset = posts_queryset.select_related('user__userprofile').prefetch_related('likes', 'comments')
+    # JOINS: Counts come from the denormalized counters
+    posts_queryset = posts_queryset.select_related('user__userprofile')
 
-    # Add Pagination to Explore View for performance
-    paginator = Paginator(posts_queryset, 20) # Show 20 per page
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    # RANKING: Page through the materialized trending scores (see posts/trending.py),
+    # then load only that page's posts. Keyset pagination, ?page= for old links
+    posts = paginate_posts(request, trending_scores(), 20, ordering=('score', 'post_id'))
+    hydrate_page(posts, posts_queryset)
+    # The latest two comments per card, for the whole page in one windowed query
+    attach_comment_previews(posts)
+    attach_post_cache_versions(posts)
 
     return render(request, 'profiles/explore.html', {
         'posts': posts,
         'comment_form': comment_form,
-    })
\ No newline at end of file
+    })
+
+
+# ===============================
+# Staff Data Export
+# ===============================
+
+@staff_member_required
+def export_data(request, dataset):
+    """
+    Streams one dataset (see profiles/datasets.py) as NDJSON, or CSV with ?format=csv.
+    """
+    fmt = request.GET.get('format', 'ndjson')
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404("Unknown dataset or format.")
+
+    lines = stream_dataset(dataset, fmt)
+    if isinstance(request, ASGIRequest):
+        lines = aiterate(lines)
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
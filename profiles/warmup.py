@@ -0,0 +1,67 @@
+# profiles/warmup.py
+
+"""
+Startup warmup for new worker processes.
+
+With the cached template loader, a template is parsed and compiled the first
+time it is rendered, and Django builds its URL resolver on the first reverse().
+warm_up() does both up front, so the first requests after a deploy don't
+pay for them. It runs from linkup/wsgi.py and linkup/asgi.py when
+TEMPLATE_WARMUP is on, and from `manage.py warm_templates`.
+"""
+
+import logging
+import os
+import time
+
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(dirs):
+    """
+    Yields the name (path relative to its template directory) of every template under ``dirs``.
+    """
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """
+    Compiles every project and app template into the cached loaders.
+    Returns (compiled, failed) counts.
+    """
+    compiled = failed = 0
+    for engine in engines.all():
+        dirs = list(engine.dirs) + list(get_app_template_dirs('templates'))
+        for name in dict.fromkeys(template_names(dirs)):  # Overridden templates appear twice
+            try:
+                engine.get_template(name)
+                compiled += 1
+            except Exception:
+                # A broken template should fail its own request, not the worker's startup
+                logger.warning("Could not compile template %s", name, exc_info=True)
+                failed += 1
+    return compiled, failed
+
+
+def warm_up():
+    """
+    Compiles the templates and builds the URL resolver. Returns the template counts.
+    """
+    start = time.perf_counter()
+    get_resolver()._populate()
+    compiled, failed = warm_templates()
+    logger.info(
+        "Warmed up %d template(s) (%d failed) in %.0f ms",
+        compiled, failed, (time.perf_counter() - start) * 1000,
+    )
+    return compiled, failed
@@ -0,0 +1,38 @@
+// static/js/comments.js
+//
+// "Load more comments" links (data-comments-more): fetches the next page of
+// the thread as an HTML fragment from posts:comment_list and puts it in
+// place of the link. The fragment ends with the link to the page after it.
+// Without JavaScript (or if the request fails) the link opens that page.
+
+(function () {
+    document.addEventListener('click', function (event) {
+        var link = event.target.closest && event.target.closest('a[data-comments-more]');
+        if (!link || !window.fetch) {
+            return;
+        }
+        event.preventDefault();
+        if (link.dataset.commentsBusy) {
+            return;
+        }
+        link.dataset.commentsBusy = '1';
+
+        fetch(link.dataset.commentsMore, {
+            headers: {'X-Requested-With': 'XMLHttpRequest'},
+            credentials: 'same-origin',
+        })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error('Comments request failed: ' + response.status);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                link.insertAdjacentHTML('afterend', html);
+                link.remove();
+            })
+            .catch(function () {
+                window.location.href = link.href;  // Fall back to the full page
+            });
+    });
+})();
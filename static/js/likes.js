@@ -0,0 +1,70 @@
+// static/js/likes.js
+//
+// Progressive enhancement for the like forms (forms with data-like-form).
+// Instead of a full page POST + redirect, the form's desired state is sent to
+// the JSON endpoint in data-like-form and the page is updated in place:
+//   data-like-toggle="on classes|off classes"  swapped on the button/icon
+//   data-like-label="on text|off text"         label text
+//   data-like-count="<post id>"                every count for that post
+// Without JavaScript (or if the request fails) the plain form still works.
+
+(function () {
+    function swap(element, spec, liked) {
+        var parts = spec.split('|');
+        var on = parts[0].split(' ').filter(Boolean);
+        var off = parts[1].split(' ').filter(Boolean);
+        element.classList.remove.apply(element.classList, liked ? off : on);
+        element.classList.add.apply(element.classList, liked ? on : off);
+    }
+
+    function render(form, data) {
+        form.querySelector('input[name="liked"]').value = data.liked ? '0' : '1';
+        form.querySelectorAll('[data-like-toggle]').forEach(function (element) {
+            swap(element, element.dataset.likeToggle, data.liked);
+        });
+        form.querySelectorAll('[data-like-label]').forEach(function (element) {
+            var labels = element.dataset.likeLabel.split('|');
+            element.textContent = data.liked ? labels[0] : labels[1];
+        });
+        document.querySelectorAll('[data-like-count="' + data.post + '"]').forEach(function (element) {
+            element.textContent = data.like_count;
+        });
+    }
+
+    document.addEventListener('submit', function (event) {
+        var form = event.target;
+        if (!form.matches || !form.matches('form[data-like-form]') || !window.fetch) {
+            return;
+        }
+        event.preventDefault();
+        if (form.dataset.likeBusy) {
+            return;  // The endpoint is idempotent, but one request per click is enough
+        }
+        form.dataset.likeBusy = '1';
+
+        fetch(form.dataset.likeForm, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: {
+                'X-CSRFToken': form.querySelector('input[name="csrfmiddlewaretoken"]').value,
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+            credentials: 'same-origin',
+        })
+            .then(function (response) {
+                if (!response.ok || response.redirected) {
+                    throw new Error('Like request failed: ' + response.status);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                render(form, data);
+            })
+            .catch(function () {
+                form.submit();  // Fall back to the regular form POST
+            })
+            .finally(function () {
+                delete form.dataset.likeBusy;
+            });
+    });
+})();